@@ -1,9 +1,35 @@
+import heapq
 import time
 
 from ICNFSolver import ICNFSolver
 
 
 class BacktrackingSolver(ICNFSolver):
+    # Cận tổng số bẫy được kiểm tra bằng bộ đếm trong lúc tìm kiếm thay vì mã hóa totalizer
+    native_trap_bounds = True
+
+    # Các chế độ tìm kiếm
+    CHRONOLOGICAL = "chronological"
+    CDCL = "cdcl"
+
+    supports_phases = True
+
+    def __init__(self, clauses, rows, cols, grid=None, mode=CHRONOLOGICAL, restart_base=100, var_decay=0.95,
+                 clause_decay=0.999, checkpoint_path=None, checkpoint_interval=60.0, resume=False):
+        super().__init__(clauses, rows, cols, grid)
+        if mode not in [self.CHRONOLOGICAL, self.CDCL]:
+            raise ValueError(f"Unknown backtracking mode: {mode}")
+        self.mode = mode
+        # Tham số của chế độ CDCL
+        self.restart_base = restart_base
+        self.var_decay = var_decay
+        self.clause_decay = clause_decay
+        # Checkpoint: vết quyết định (chronological) hoặc trạng thái đã học (cdcl) được ghi định kỳ
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.checkpointer = None
+
     def solve(self):
         start_time = time.time()
 
@@ -11,10 +37,98 @@ class BacktrackingSolver(ICNFSolver):
         for clause in self.clauses:
             for var in clause:
                 var_list.add(abs(var))
+        if self.trap_bounds:
+            # Mọi ô được đếm phải được gán, kể cả ô không nằm trong mệnh đề nào
+            var_list.update(self.trap_bounds[2])
 
         var_list = sorted(list(var_list))
         num_vars = len(var_list)
 
+        self.log(f"[Backtracking] Solving with {num_vars} variables and {len(self.clauses)} clauses ({self.mode} mode)...")
+
+        # Trạng thái backtracking
+        stats = {
+            "decisions": 0,
+            "backtracks": 0
+        }
+
+        resume_state = None
+        if self.checkpoint_path:
+            from Checkpoint import Checkpointer, cnf_hash
+            self.checkpointer = Checkpointer(self.checkpoint_path,
+                                             cnf_hash(self.clauses, "backtracking", self.mode, self.restart_base,
+                                                      self.trap_bounds, sorted(self.phases)),
+                                             self.checkpoint_interval, "Backtracking")
+            if self.resume:
+                resume_state = self.checkpointer.load()
+            if resume_state:
+                stats.update(resume_state["stats"])
+
+        success = False
+        interrupted = False
+        assignment = {}
+        try:
+            if self.mode == self.CDCL:
+                success, assignment = self._search_cdcl(var_list, stats, start_time, resume_state)
+            else:
+                success, assignment = self._search_chronological(var_list, stats, start_time, resume_state)
+        except KeyboardInterrupt:
+            interrupted = True
+            self.log("[Backtracking] Interrupted by user")
+            if self.checkpointer and self.checkpointer.save():
+                self.log(f"[Backtracking] Checkpoint saved to {self.checkpoint_path}")
+
+        solving_time = time.time() - start_time
+        stats["solving_time"] = solving_time
+        if self.checkpointer:
+            if not interrupted:
+                # Tìm kiếm đã kết thúc, checkpoint không còn dùng được
+                self.checkpointer.discard()
+            stats.update(self.checkpointer.stats())
+            stats["resumed"] = resume_state is not None
+            stats["interrupted"] = interrupted
+
+        if success:
+            self.log(
+                f"[Backtracking] Found a solution after {stats['decisions']:,} decisions and {stats['backtracks']:,} backtracks")
+            self.log(f"[Backtracking] Solving time: {solving_time:.6f} seconds")
+
+            # Tạo mô hình từ gán giá trị
+            model = []
+            for var in var_list:
+                if var in assignment:
+                    if assignment[var]:
+                        model.append(var)
+                    else:
+                        model.append(-var)
+
+            # Tạo lưới kết quả
+            result_grid = self.create_result_grid(model)
+
+            return True, result_grid, stats
+        else:
+            self.log(
+                f"[Backtracking] No solution found after {stats['decisions']:,} decisions and {stats['backtracks']:,} backtracks")
+            self.log(f"[Backtracking] Solving time: {solving_time:.6f} seconds")
+
+            return False, None, stats
+
+    def _report_progress(self, stats, start_time, state=None):
+        """In tiến độ và ghi checkpoint (nếu đến hạn) sau mỗi 1000 quyết định"""
+        if stats["decisions"] % 1000 == 0:
+            if not self.quiet:
+                elapsed = time.time() - start_time
+                self.log(f"[Backtracking] Decisions: {stats['decisions']:,}, Backtracks: {stats['backtracks']:,} "
+                         f"- {elapsed:.2f} seconds elapsed")
+            if self.checkpointer and state:
+                self.checkpointer.tick(state)
+
+    def _search_chronological(self, var_list, stats, start_time, resume_state=None):
+        """Quay lui theo thứ tự thời gian với thứ tự biến cố định.
+        Tìm kiếm là tất định, nên checkpoint chỉ cần vết quyết định: giá trị đang thử ở mỗi độ sâu.
+        Khi tiếp tục, mỗi độ sâu của vết bắt đầu từ giá trị đã lưu thay vì True, các nhánh trước đó được bỏ qua"""
+        var_list = list(var_list)
+
         # Thống kê số lần xuất hiện của mỗi biến để ưu tiên
         var_count = {var: 0 for var in var_list}
         for clause in self.clauses:
@@ -24,17 +138,19 @@ class BacktrackingSolver(ICNFSolver):
         # Sắp xếp lại biến theo số lần xuất hiện (giảm dần)
         var_list.sort(key=lambda var: var_count[var], reverse=True)
 
-        print(f"[Backtracking] Solving with {num_vars} variables and {len(self.clauses)} clauses...")
-
-        # Trạng thái backtracking
-        stats = {
-            "decisions": 0,
-            "backtracks": 0
-        }
-
         # Mô hình hiện tại (assignment)
         assignment = {}
 
+        # Gợi ý pha đổi thứ tự thử giá trị của biến: biến được gợi ý là đá quý thì thử False trước
+        value_order = {abs(lit): [False, True] for lit in self.phases if lit < 0}
+
+        # path[index]: vị trí giá trị đang thử ở độ sâu index (trong thứ tự thử của biến, mặc định True rồi False)
+        path = []
+        resume_path = resume_state["path"] if resume_state else []
+
+        def state():
+            return {"path": list(path), "stats": dict(stats)}
+
         # Kiểm tra xem một mệnh đề có thỏa mãn không với gán giá trị hiện tại
         def is_clause_satisfied(clause):
             for var in clause:
@@ -58,6 +174,22 @@ class BacktrackingSolver(ICNFSolver):
                 return unassigned[0]  # Trả về biến đơn vị
             return None
 
+        # Cận tổng số bẫy: số bẫy đã gán không vượt cận trên, số bẫy còn có thể đạt cận dưới
+        trap_lower, trap_upper, trap_variables = self.trap_bounds or (None, None, ())
+
+        def within_trap_bounds():
+            traps = 0
+            unassigned = 0
+            for var in trap_variables:
+                value = assignment.get(var)
+                if value is None:
+                    unassigned += 1
+                elif value:
+                    traps += 1
+            if trap_upper is not None and traps > trap_upper:
+                return False
+            return not trap_lower or traps + unassigned >= trap_lower
+
         # Kiểm tra xem một mệnh đề có thể trở thành xung đột không (conflicting clause)
         def is_conflicting_clause(clause):
             for var in clause:
@@ -91,15 +223,12 @@ class BacktrackingSolver(ICNFSolver):
             for clause in self.clauses:
                 if is_conflicting_clause(clause):
                     return False
-            return True
+            return not trap_variables or within_trap_bounds()
 
         def backtrack(index):
             # Kiểm tra tiến độ
             stats["decisions"] += 1
-            if stats["decisions"] % 1000 == 0:
-                elapsed = time.time() - start_time
-                print(
-                    f"[Backtracking] Decisions: {stats['decisions']:,}, Backtracks: {stats['backtracks']:,} - {elapsed:.2f} seconds elapsed")
+            self._report_progress(stats, start_time, state)
 
             # Nếu đã gán giá trị cho tất cả các biến và thỏa mãn tất cả các mệnh đề
             if index == len(var_list):
@@ -108,8 +237,16 @@ class BacktrackingSolver(ICNFSolver):
             # Chọn biến tiếp theo
             var = var_list[index]
 
+            # Lần đầu đến độ sâu này khi tiếp tục từ checkpoint: bỏ qua các giá trị đã thử xong
+            first = 0
+            if index < len(resume_path):
+                first = resume_path[index]
+                resume_path[index] = 0
+
+            path.append(0)
             # Thử các giá trị có thể (True và False)
-            for value in [True, False]:
+            for position, value in list(enumerate(value_order.get(var, [True, False])))[first:]:
+                path[index] = position
                 # Gán giá trị cho biến
                 old_assignment = assignment.copy()
                 assignment[var] = value
@@ -127,50 +264,403 @@ class BacktrackingSolver(ICNFSolver):
                 assignment.clear()
                 assignment.update(old_assignment)
 
+            path.pop()
             return False
 
         success = False
-        try:
-            # Thực hiện unit propagation ban đầu
-            if unit_propagation():
-                # Ghi nhớ các biến đã gán trước khi backtracking
-                assigned_before = set(assignment.keys())
-                # Bắt đầu backtracking
-                success = backtrack(0)
-        except KeyboardInterrupt:
-            print("[Backtracking] Interrupted by user")
+        # Thực hiện unit propagation ban đầu
+        if unit_propagation():
+            # Bắt đầu backtracking
+            success = backtrack(0)
+
+        return success, assignment
+
+    def _search_cdcl(self, var_list, stats, start_time, resume_state=None):
+        """Tìm kiếm CDCL: phân tích xung đột 1-UIP, học mệnh đề, nhảy lui không theo thời gian,
+        thứ tự biến động kiểu VSIDS, lưu pha và khởi động lại theo dãy Luby.
+        Checkpoint lưu mệnh đề học được, literal ở mức 0, độ hoạt động và pha (gồm cả vết quyết định hiện tại);
+        khi tiếp tục, tìm kiếm bắt đầu như sau một lần khởi động lại"""
+        for key in ["conflicts", "learned_clauses", "deleted_clauses", "restarts", "propagations"]:
+            stats.setdefault(key, 0)
+
+        max_var = max(var_list) if var_list else 0
+        # Giá trị của biến: 1 (True), -1 (False), 0 (chưa gán)
+        values = [0] * (max_var + 1)
+        levels = [0] * (max_var + 1)
+        reasons = [None] * (max_var + 1)
+        activity = [0.0] * (max_var + 1)
+        saved_phase = [False] * (max_var + 1)
+        # Pha ban đầu lấy từ gợi ý (lời giải của bài gần giống), sau đó được lưu pha bình thường
+        for lit in self.phases:
+            if abs(lit) <= max_var:
+                saved_phase[abs(lit)] = lit > 0
+        seen = [False] * (max_var + 1)
+
+        # Cận tổng số bẫy: đếm số biến được đếm đang đúng / sai, khi vượt cận thì sinh mệnh đề giải thích
+        trap_lower, trap_upper, trap_variables = self.trap_bounds or (None, None, ())
+        counted = [False] * (max_var + 1)
+        for var in trap_variables:
+            counted[var] = True
+        true_traps = 0
+        false_traps = 0
+        if trap_variables:
+            stats.setdefault("bound_clauses", 0)
+
+        clauses = []  # Tất cả mệnh đề (gốc và học được), None nếu đã bị xóa
+        clause_activity = []
+        learned = []  # Chỉ số của các mệnh đề học được
+        watches = {}
+        trail = []
+        trail_lim = []
+        queue_head = 0
+        var_inc = 1.0
+        clause_inc = 1.0
+
+        def lit_value(lit):
+            value = values[abs(lit)]
+            return value if lit > 0 else -value
+
+        def enqueue(lit, reason):
+            nonlocal true_traps, false_traps
+            var = abs(lit)
+            if counted[var]:
+                if lit > 0:
+                    true_traps += 1
+                else:
+                    false_traps += 1
+            values[var] = 1 if lit > 0 else -1
+            levels[var] = len(trail_lim)
+            reasons[var] = reason
+            trail.append(lit)
+
+        def attach(clause_index):
+            clause = clauses[clause_index]
+            watches.setdefault(-clause[0], []).append(clause_index)
+            watches.setdefault(-clause[1], []).append(clause_index)
+
+        def propagate():
+            """Lan truyền đơn vị bằng hai literal theo dõi, trả về chỉ số mệnh đề xung đột hoặc None"""
+            nonlocal queue_head
+            while queue_head < len(trail):
+                false_lit = -trail[queue_head]
+                queue_head += 1
+                stats["propagations"] += 1
+
+                # Các mệnh đề đang theo dõi literal vừa trở thành sai
+                watch_list = watches.get(trail[queue_head - 1], [])
+                kept = []
+                conflict = None
+                for position, clause_index in enumerate(watch_list):
+                    clause = clauses[clause_index]
+                    if clause is None:
+                        continue
+                    if conflict is not None:
+                        kept.append(clause_index)
+                        continue
 
-        solving_time = time.time() - start_time
+                    # Đảm bảo literal sai nằm ở vị trí thứ hai
+                    if clause[0] == false_lit:
+                        clause[0], clause[1] = clause[1], clause[0]
 
-        if success:
-            print(
-                f"[Backtracking] Found a solution after {stats['decisions']:,} decisions and {stats['backtracks']:,} backtracks")
-            print(f"[Backtracking] Solving time: {solving_time:.6f} seconds")
+                    if lit_value(clause[0]) == 1:
+                        kept.append(clause_index)
+                        continue
 
-            # Tạo mô hình từ gán giá trị
-            model = []
-            for var in var_list:
-                if var in assignment:
-                    if assignment[var]:
-                        model.append(var)
+                    # Tìm literal theo dõi mới
+                    for k in range(2, len(clause)):
+                        if lit_value(clause[k]) != -1:
+                            clause[1], clause[k] = clause[k], clause[1]
+                            watches.setdefault(-clause[1], []).append(clause_index)
+                            break
                     else:
-                        model.append(-var)
+                        kept.append(clause_index)
+                        if lit_value(clause[0]) == -1:
+                            conflict = clause_index
+                        else:
+                            enqueue(clause[0], clause_index)
+
+                watches[trail[queue_head - 1]] = kept
+                if conflict is not None:
+                    return conflict
+            return None
 
-            # Tạo lưới kết quả
-            result_grid = self.create_result_grid(model)
+        def bump_var(var):
+            nonlocal var_inc
+            activity[var] += var_inc
+            if activity[var] > 1e100:
+                # Chuẩn hóa lại để tránh tràn số
+                for v in var_list:
+                    activity[v] *= 1e-100
+                var_inc *= 1e-100
+                heap.clear()
+                for v in var_list:
+                    if values[v] == 0:
+                        heapq.heappush(heap, (-activity[v], v))
+            elif values[var] == 0:
+                heapq.heappush(heap, (-activity[var], var))
+
+        def bump_clause(clause_index):
+            nonlocal clause_inc
+            clause_activity[clause_index] += clause_inc
+            if clause_activity[clause_index] > 1e20:
+                for index in learned:
+                    clause_activity[index] *= 1e-20
+                clause_inc *= 1e-20
+
+        def analyze(conflict):
+            """Phân tích xung đột theo 1-UIP, trả về mệnh đề học được và mức nhảy lui"""
+            learnt = [0]
+            path_count = 0
+            lit = None
+            index = len(trail) - 1
+            clause_index = conflict
+            current_level = len(trail_lim)
 
-            return True, result_grid, {
-                "decisions": stats["decisions"],
-                "backtracks": stats["backtracks"],
-                "solving_time": solving_time
+            while True:
+                if clauses[clause_index] is not None and clause_index in learned_set:
+                    bump_clause(clause_index)
+                for q in clauses[clause_index]:
+                    if lit is not None and q == lit:
+                        continue
+                    var = abs(q)
+                    if not seen[var] and levels[var] > 0:
+                        seen[var] = True
+                        bump_var(var)
+                        if levels[var] >= current_level:
+                            path_count += 1
+                        else:
+                            learnt.append(q)
+
+                # Tìm literal tiếp theo trên trail cần giải thích
+                while not seen[abs(trail[index])]:
+                    index -= 1
+                lit = trail[index]
+                index -= 1
+                clause_index = reasons[abs(lit)]
+                seen[abs(lit)] = False
+                path_count -= 1
+                if path_count == 0:
+                    break
+
+            learnt[0] = -lit
+            for q in learnt[1:]:
+                seen[abs(q)] = False
+
+            if len(learnt) == 1:
+                backjump_level = 0
+            else:
+                # Đưa literal có mức cao nhất (ngoài UIP) lên vị trí thứ hai để theo dõi
+                best = max(range(1, len(learnt)), key=lambda k: levels[abs(learnt[k])])
+                learnt[1], learnt[best] = learnt[best], learnt[1]
+                backjump_level = levels[abs(learnt[1])]
+
+            return learnt, backjump_level
+
+        def cancel_until(level):
+            nonlocal queue_head, true_traps, false_traps
+            if len(trail_lim) <= level:
+                return
+            for k in range(len(trail) - 1, trail_lim[level] - 1, -1):
+                var = abs(trail[k])
+                if counted[var]:
+                    if values[var] > 0:
+                        true_traps -= 1
+                    else:
+                        false_traps -= 1
+                # Lưu pha để lần gán sau dùng lại
+                saved_phase[var] = values[var] > 0
+                values[var] = 0
+                reasons[var] = None
+                heapq.heappush(heap, (-activity[var], var))
+            del trail[trail_lim[level]:]
+            del trail_lim[level:]
+            queue_head = len(trail)
+
+        def trap_bound_conflict():
+            """Nếu số bẫy đã vượt cận trên (hoặc số ô không phải bẫy khiến không thể đạt cận dưới),
+            thêm mệnh đề cấm đúng tập biến đang gán đó và trả về chỉ số của nó như một xung đột thông thường"""
+            if trap_upper is not None and true_traps > trap_upper:
+                clause = [-var for var in trap_variables if values[var] == 1]
+            elif trap_lower and false_traps > len(trap_variables) - trap_lower:
+                clause = [var for var in trap_variables if values[var] == -1]
+            else:
+                return None
+
+            # Theo dõi hai literal có mức cao nhất, như mệnh đề học được
+            clause.sort(key=lambda lit: levels[abs(lit)], reverse=True)
+            clauses.append(clause)
+            clause_activity.append(0.0)
+            attach(len(clauses) - 1)
+            stats["bound_clauses"] += 1
+            return len(clauses) - 1
+
+        def pick_branch_var():
+            while heap:
+                negative_activity, var = heapq.heappop(heap)
+                if values[var] == 0 and -negative_activity == activity[var]:
+                    return var
+            for var in var_list:
+                if values[var] == 0:
+                    return var
+            return None
+
+        def reduce_db():
+            """Xóa một nửa số mệnh đề học được có độ hoạt động thấp nhất"""
+            locked = set(reasons[abs(lit)] for lit in trail)
+            candidates = sorted(learned, key=lambda index: clause_activity[index])
+            limit = len(candidates) // 2
+            removed = set()
+            for index in candidates:
+                if len(removed) >= limit:
+                    break
+                if index in locked or len(clauses[index]) <= 2:
+                    continue
+                clauses[index] = None
+                removed.add(index)
+            learned[:] = [index for index in learned if index not in removed]
+            learned_set.difference_update(removed)
+            stats["deleted_clauses"] += len(removed)
+
+        def state():
+            root_end = trail_lim[0] if trail_lim else len(trail)
+            return {
+                "stats": dict(stats),
+                "units": trail[:root_end],
+                "learned": [list(clauses[index]) for index in learned],
+                # Pha của biến đang được gán là giá trị hiện tại, để lần sau đi lại đúng vết quyết định
+                "phases": [var for var in var_list if (values[var] > 0 if values[var] else saved_phase[var])],
+                "activity": activity,
+                "var_inc": var_inc,
+                "restart_index": restart_index
             }
-        else:
-            print(
-                f"[Backtracking] No solution found after {stats['decisions']:,} decisions and {stats['backtracks']:,} backtracks")
-            print(f"[Backtracking] Solving time: {solving_time:.6f} seconds")
 
-            return False, None, {
-                "decisions": stats["decisions"],
-                "backtracks": stats["backtracks"],
-                "solving_time": solving_time
-            }
\ No newline at end of file
+        def luby(i):
+            """Phần tử thứ i (bắt đầu từ 0) của dãy Luby 1, 1, 2, 1, 1, 2, 4, ..."""
+            size, sequence = 1, 0
+            while size < i + 1:
+                sequence += 1
+                size = 2 * size + 1
+            while size - 1 != i:
+                size = (size - 1) >> 1
+                sequence -= 1
+                i = i % size
+            return 2 ** sequence
+
+        learned_set = set()
+        heap = [(0.0, var) for var in var_list]
+        heapq.heapify(heap)
+
+        # Nạp các mệnh đề gốc
+        for original in self.clauses:
+            clause = list(dict.fromkeys(original))
+            if any(-lit in clause for lit in clause):
+                continue  # Mệnh đề luôn đúng
+            if len(clause) == 0:
+                return False, {}
+            if len(clause) == 1:
+                value = lit_value(clause[0])
+                if value == -1:
+                    return False, {}
+                if value == 0:
+                    enqueue(clause[0], None)
+                continue
+            clauses.append(clause)
+            clause_activity.append(0.0)
+            attach(len(clauses) - 1)
+
+        # Cận 0 hoặc bằng số biến được đếm cố định mọi biến ngay ở mức 0 (mệnh đề giải thích sẽ chỉ có một literal)
+        if trap_variables:
+            if (trap_upper is not None and trap_upper < 0) or (trap_lower or 0) > len(trap_variables):
+                return False, {}
+            forced = []
+            if trap_upper == 0:
+                forced = [-var for var in trap_variables]
+            elif trap_lower == len(trap_variables):
+                forced = list(trap_variables)
+            for lit in forced:
+                if lit_value(lit) == -1:
+                    return False, {}
+                if lit_value(lit) == 0:
+                    enqueue(lit, None)
+
+        max_learned = len(clauses) / 3 + 100
+        restart_index = 0
+
+        if resume_state:
+            for lit in resume_state["units"]:
+                value = lit_value(lit)
+                if value == -1:
+                    return False, {}
+                if value == 0:
+                    enqueue(lit, None)
+            for clause in resume_state["learned"]:
+                clauses.append(clause)
+                clause_activity.append(0.0)
+                learned.append(len(clauses) - 1)
+                learned_set.add(len(clauses) - 1)
+                attach(len(clauses) - 1)
+            activity[:] = resume_state["activity"]
+            var_inc = resume_state["var_inc"]
+            # Pha đã lưu thay cho gợi ý pha ban đầu
+            saved_phase[:] = [False] * (max_var + 1)
+            for var in resume_state["phases"]:
+                saved_phase[var] = True
+            heap = [(-activity[var], var) for var in var_list]
+            heapq.heapify(heap)
+            restart_index = resume_state["restart_index"]
+
+        conflicts_until_restart = luby(restart_index) * self.restart_base
+
+        while True:
+            conflict = propagate()
+            if conflict is None and trap_variables:
+                conflict = trap_bound_conflict()
+            if conflict is not None:
+                stats["conflicts"] += 1
+                conflicts_until_restart -= 1
+                if len(trail_lim) == 0:
+                    return False, {}
+
+                learnt, backjump_level = analyze(conflict)
+                cancel_until(backjump_level)
+                stats["backtracks"] += 1
+
+                if len(learnt) == 1:
+                    enqueue(learnt[0], None)
+                else:
+                    clauses.append(learnt)
+                    clause_activity.append(0.0)
+                    clause_index = len(clauses) - 1
+                    learned.append(clause_index)
+                    learned_set.add(clause_index)
+                    attach(clause_index)
+                    bump_clause(clause_index)
+                    enqueue(learnt[0], clause_index)
+                stats["learned_clauses"] += 1
+
+                var_inc /= self.var_decay
+                clause_inc /= self.clause_decay
+                continue
+
+            if conflicts_until_restart <= 0:
+                # Khởi động lại theo dãy Luby, giữ nguyên mệnh đề học được và pha đã lưu
+                stats["restarts"] += 1
+                restart_index += 1
+                conflicts_until_restart = luby(restart_index) * self.restart_base
+                cancel_until(0)
+                continue
+
+            if len(learned) - len(trail) >= max_learned:
+                reduce_db()
+                max_learned *= 1.1
+
+            var = pick_branch_var()
+            if var is None:
+                break
+
+            stats["decisions"] += 1
+            self._report_progress(stats, start_time, state)
+            trail_lim.append(len(trail))
+            enqueue(var if saved_phase[var] else -var, None)
+
+        return True, {var: values[var] > 0 for var in var_list}
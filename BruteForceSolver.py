@@ -1,9 +1,26 @@
 import time
-from itertools import product
+from itertools import islice, product
 
 from ICNFSolver import ICNFSolver
 
 class BruteForceSolver(ICNFSolver):
+    # Các thứ tự duyệt phép gán
+    PRODUCT = "product"
+    GRAY_CODE = "gray_code"
+
+    def __init__(self, clauses, rows, cols, grid=None, enumeration=PRODUCT, checkpoint_path=None,
+                 checkpoint_interval=60.0, resume=False):
+        super().__init__(clauses, rows, cols, grid)
+        if enumeration not in [self.PRODUCT, self.GRAY_CODE]:
+            raise ValueError(f"Unknown enumeration order: {enumeration}")
+        self.enumeration = enumeration
+        # Checkpoint: chỉ số phép gán tiếp theo được ghi định kỳ vào checkpoint_path
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.checkpointer = None
+        self.interrupted = False
+
     def solve(self):
         start_time = time.time()
 
@@ -15,66 +32,197 @@ class BruteForceSolver(ICNFSolver):
         var_list = sorted(list(var_list))
         num_vars = len(var_list)
 
-        print(f"[Brute Force] Solving with {num_vars} variables and {len(self.clauses)} clauses...")
+        self.log(f"[Brute Force] Solving with {num_vars} variables and {len(self.clauses)} clauses ({self.enumeration} order)...")
 
         total_combinations = 2 ** num_vars
-        checked = 0
 
-        var_to_index = {var: i for i, var in enumerate(var_list)}
+        resume_state = None
+        if self.checkpoint_path:
+            from Checkpoint import Checkpointer, cnf_hash
+            self.checkpointer = Checkpointer(self.checkpoint_path, cnf_hash(self.clauses, "brute_force", self.enumeration),
+                                             self.checkpoint_interval, "Brute Force")
+            if self.resume:
+                resume_state = self.checkpointer.load()
 
-        for values in product([False, True], repeat=num_vars):
-            # Kiểm tra tiến độ
-            checked += 1
-            if checked % 1000 == 0 or checked == total_combinations:
-                progress = (checked / total_combinations) * 100
-                elapsed = time.time() - start_time
-                print(
-                    f"[Brute Force] Checked {checked:,}/{total_combinations:,} combinations ({progress:.2f}%) - {elapsed:.2f} seconds elapsed")
-
-            model = []
-            for i, value in enumerate(values):
-                if value:
-                    model.append(var_list[i])
-                else:
-                    model.append(-var_list[i])
-
-            satisfied = True
-            for clause in self.clauses:
-                clause_satisfied = False
-                for var in clause:
-                    var_index = var_to_index[abs(var)]
-                    var_value = values[var_index]
-
-                    # Nếu biến là dương và giá trị True, hoặc biến là âm và giá trị False
-                    if (var > 0 and var_value) or (var < 0 and not var_value):
-                        clause_satisfied = True
-                        break
+        if self.enumeration == self.GRAY_CODE:
+            model, checked = self._enumerate_gray_code(var_list, start_time, resume_state)
+        else:
+            model, checked = self._enumerate_product(var_list, start_time, resume_state)
 
-                if not clause_satisfied:
-                    satisfied = False
-                    break
+        if self.checkpointer and not self.interrupted:
+            # Tìm kiếm đã kết thúc, checkpoint không còn dùng được
+            self.checkpointer.discard()
 
-            if satisfied:
-                solving_time = time.time() - start_time
-                print(f"[Brute Force] Found a solution after checking {checked:,}/{total_combinations:,} combinations")
-                print(f"[Brute Force] Solving time: {solving_time:.6f} seconds")
+        if model is not None:
+            solving_time = time.time() - start_time
+            self.log(f"[Brute Force] Found a solution after checking {checked:,}/{total_combinations:,} combinations")
+            self.log(f"[Brute Force] Solving time: {solving_time:.6f} seconds")
 
-                # Tạo lưới kết quả
-                result_grid = self.create_result_grid(model)
+            # Tạo lưới kết quả
+            result_grid = self.create_result_grid(model)
 
-                return True, result_grid, {
-                    "checked_combinations": checked,
-                    "total_combinations": total_combinations,
-                    "solving_time": solving_time
-                }
+            return True, result_grid, self._stats(checked, total_combinations, solving_time, resume_state)
 
         # Nếu không tìm thấy nghiệm nào
         solving_time = time.time() - start_time
-        print(f"[Brute Force] No solution found after checking all {total_combinations:,} combinations")
-        print(f"[Brute Force] Solving time: {solving_time:.6f} seconds")
+        if self.interrupted:
+            self.log(f"[Brute Force] Interrupted by user after checking {checked:,}/{total_combinations:,} combinations")
+        else:
+            self.log(f"[Brute Force] No solution found after checking all {total_combinations:,} combinations")
+        self.log(f"[Brute Force] Solving time: {solving_time:.6f} seconds")
+
+        return False, None, self._stats(checked, total_combinations, solving_time, resume_state)
 
-        return False, None, {
+    def _stats(self, checked, total_combinations, solving_time, resume_state):
+        stats = {
             "checked_combinations": checked,
             "total_combinations": total_combinations,
+            "enumeration": self.enumeration,
             "solving_time": solving_time
-        }
\ No newline at end of file
+        }
+        if self.checkpointer:
+            stats.update(self.checkpointer.stats())
+            stats["resumed"] = resume_state is not None
+            stats["interrupted"] = self.interrupted
+        return stats
+
+    def _interrupt(self):
+        """Ghi checkpoint ngay khi người dùng ngắt để lần chạy sau tiếp tục đúng chỗ"""
+        self.interrupted = True
+        if self.checkpointer and self.checkpointer.save():
+            self.log(f"[Brute Force] Checkpoint saved to {self.checkpoint_path}")
+
+    def _report_progress(self, checked, total_combinations, start_time):
+        """In tiến độ duyệt sau mỗi 1000 phép gán"""
+        if not self.quiet and (checked % 1000 == 0 or checked == total_combinations):
+            progress = (checked / total_combinations) * 100
+            elapsed = time.time() - start_time
+            self.log(
+                f"[Brute Force] Checked {checked:,}/{total_combinations:,} combinations ({progress:.2f}%) - {elapsed:.2f} seconds elapsed")
+
+    def _enumerate_product(self, var_list, start_time, resume_state=None):
+        """Duyệt mọi phép gán theo thứ tự itertools.product, kiểm tra lại toàn bộ mệnh đề cho từng phép gán.
+        Checkpoint chỉ cần chỉ số của phép gán đang xét"""
+        num_vars = len(var_list)
+        total_combinations = 2 ** num_vars
+        checked = resume_state["index"] if resume_state else 0
+
+        var_to_index = {var: i for i, var in enumerate(var_list)}
+
+        assignments = product([False, True], repeat=num_vars)
+        if checked:
+            # islice bỏ qua các phép gán đã duyệt ở tốc độ của C, không kiểm tra mệnh đề
+            assignments = islice(assignments, checked, None)
+
+        checkpointer = self.checkpointer
+
+        def state():
+            # Phép gán đang xét có thể chưa được kiểm tra xong, lần sau kiểm tra lại từ chính nó
+            return {"index": checked - 1}
+
+        try:
+            for values in assignments:
+                # Kiểm tra tiến độ
+                checked += 1
+                self._report_progress(checked, total_combinations, start_time)
+                if checkpointer and checked % 1000 == 0:
+                    checkpointer.tick(state)
+
+                satisfied = True
+                for clause in self.clauses:
+                    clause_satisfied = False
+                    for var in clause:
+                        var_index = var_to_index[abs(var)]
+                        var_value = values[var_index]
+
+                        # Nếu biến là dương và giá trị True, hoặc biến là âm và giá trị False
+                        if (var > 0 and var_value) or (var < 0 and not var_value):
+                            clause_satisfied = True
+                            break
+
+                    if not clause_satisfied:
+                        satisfied = False
+                        break
+
+                if satisfied:
+                    model = []
+                    for i, value in enumerate(values):
+                        if value:
+                            model.append(var_list[i])
+                        else:
+                            model.append(-var_list[i])
+                    return model, checked
+        except KeyboardInterrupt:
+            self._interrupt()
+
+        return None, checked
+
+    def _enumerate_gray_code(self, var_list, start_time, resume_state=None):
+        """Duyệt mọi phép gán theo mã Gray: hai phép gán liên tiếp chỉ khác nhau đúng một biến,
+        nên chỉ cần cập nhật bộ đếm của các mệnh đề chứa biến vừa lật.
+        Phép gán thứ k là mã Gray k ^ (k >> 1), nên checkpoint chỉ cần số phép gán đã duyệt"""
+        num_vars = len(var_list)
+        total_combinations = 2 ** num_vars
+        var_to_index = {var: i for i, var in enumerate(var_list)}
+
+        # Danh sách xuất hiện: với mỗi biến, các mệnh đề chứa literal dương và literal âm của nó
+        positive_occurrences = [[] for _ in range(num_vars)]
+        negative_occurrences = [[] for _ in range(num_vars)]
+        for clause_index, clause in enumerate(self.clauses):
+            for var in clause:
+                if var > 0:
+                    positive_occurrences[var_to_index[var]].append(clause_index)
+                else:
+                    negative_occurrences[var_to_index[-var]].append(clause_index)
+
+        # Bắt đầu từ phép gán toàn False (mã Gray 0), hoặc từ phép gán cuối cùng đã duyệt trong checkpoint
+        checked = resume_state["checked"] if resume_state else 1
+        code = (checked - 1) ^ ((checked - 1) >> 1)
+        values = [bool(code >> index & 1) for index in range(num_vars)]
+        satisfied_literals = [sum(1 for var in clause if (var > 0) == values[var_to_index[abs(var)]])
+                              for clause in self.clauses]
+        unsatisfied_clauses = satisfied_literals.count(0)
+
+        self._report_progress(checked, total_combinations, start_time)
+        checkpointer = self.checkpointer
+
+        def state():
+            return {"checked": checked}
+
+        try:
+            while unsatisfied_clauses > 0:
+                if checked == total_combinations:
+                    return None, checked
+
+                # Bit thay đổi ở bước thứ k của mã Gray là bit thấp nhất bằng 1 của k
+                index = (checked & -checked).bit_length() - 1
+                values[index] = not values[index]
+                if values[index]:
+                    became_true = positive_occurrences[index]
+                    became_false = negative_occurrences[index]
+                else:
+                    became_true = negative_occurrences[index]
+                    became_false = positive_occurrences[index]
+
+                # Chỉ cập nhật các mệnh đề chứa biến vừa lật
+                for clause_index in became_true:
+                    if satisfied_literals[clause_index] == 0:
+                        unsatisfied_clauses -= 1
+                    satisfied_literals[clause_index] += 1
+                for clause_index in became_false:
+                    satisfied_literals[clause_index] -= 1
+                    if satisfied_literals[clause_index] == 0:
+                        unsatisfied_clauses += 1
+
+                checked += 1
+                if checked % 1000 == 0 or checked == total_combinations:
+                    self._report_progress(checked, total_combinations, start_time)
+                    if checkpointer:
+                        checkpointer.tick(state)
+        except KeyboardInterrupt:
+            # Phép gán đang lật dở được dựng lại từ số phép gán đã duyệt khi tiếp tục
+            self._interrupt()
+            return None, checked
+
+        model = [var if values[i] else -var for i, var in enumerate(var_list)]
+        return model, checked
@@ -1,6 +1,14 @@
+import gc
+import os
+import time
 from abc import ABC, abstractmethod
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate
 
+from CompactGrid import UNKNOWN_CODE, CompactGrid, encode_cell
 from GemHunterGrid import GemHunterGrid
+from MemoryTracker import memory_phase
 
 
 class CNFGenerator(ABC):
@@ -9,6 +17,11 @@ class CNFGenerator(ABC):
         self.rows = grid.rows
         self.cols = grid.cols
         self.clauses = []
+        self.generation_stats = {}
+        # Chỉ mục cho cập nhật từng ô, chỉ được dựng khi cần (xem build_index)
+        self.indexed = False
+        # Đặt một MemoryTracker vào đây để đo bộ nhớ của từng giai đoạn sinh CNF
+        self.memory_tracker = None
 
     def position_to_variable(self, row, col):
         return row * self.cols + col + 1
@@ -17,26 +30,64 @@ class CNFGenerator(ABC):
     def generate_exactly_n_clauses(self, neighbors, n):
         pass
 
-    def generate_cnf(self):
-        self.clauses = []
-        for i in range(self.rows):
+    def generate_cnf(self, workers=None, band_rows=None):
+        """Sinh CNF cho toàn bộ lưới. workers > 1 thì chia lưới thành các dải hàng và sinh song song,
+        kết quả giống hệt cách sinh tuần tự"""
+        start_time = time.time()
+        if workers and workers > 1 and self.rows > 1:
+            # Bộ nhớ của tiến trình con không được tính, chỉ đo phần ghép kết quả ở tiến trình chính
+            with memory_phase(self.memory_tracker, "encoding"):
+                return self._generate_cnf_parallel(workers, band_rows, start_time)
+
+        with _gc_paused():
+            with memory_phase(self.memory_tracker, "encoding"):
+                self.clauses = self.generate_rows(0, self.rows)
+            with memory_phase(self.memory_tracker, "dedup"):
+                unique_clauses = self.remove_duplicate_clauses()
+        self.generation_stats = {
+            "mode": "serial",
+            "workers": 1,
+            "generation_time": time.time() - start_time
+        }
+        return unique_clauses
+
+    def generate_rows(self, start_row, end_row):
+        """Sinh mệnh đề (chưa loại trùng) cho các ô thuộc hàng start_row..end_row-1, theo thứ tự hàng"""
+        clauses = []
+        if isinstance(self.grid, CompactGrid):
+            # Đọc thẳng mã của từng ô, không giải mã cả lưới thành list các hàng
+            cells = self.grid.cells
+            for i in range(start_row, end_row):
+                base = i * self.cols
+                for j in range(self.cols):
+                    if cells[base + j] != UNKNOWN_CODE:
+                        clauses.extend(self.generate_cell_clauses(i, j))
+            return clauses
+
+        for i in range(start_row, end_row):
             for j in range(self.cols):
-                cell = self.grid.grid[i][j]
+                if self.grid.grid[i][j] != "_":
+                    clauses.extend(self.generate_cell_clauses(i, j))
+
+        return clauses
+
+    def generate_cell_clauses(self, i, j):
+        """Các mệnh đề do riêng ô (i, j) sinh ra"""
+        cell = self.grid.cell(i, j)
 
-                if isinstance(cell, int):
-                    traps = cell
-                    neighbors = self.grid.get_neighbors(i, j)
+        if isinstance(cell, int):
+            traps = cell
+            neighbors = self.grid.get_neighbors(i, j)
 
-                    clauses = self.generate_exactly_n_clauses(neighbors, traps)
-                    self.clauses.extend(clauses)
+            return self.generate_exactly_n_clauses(neighbors, traps)
 
-                elif cell == "T":
-                    self.clauses.append([self.position_to_variable(i, j)])
+        elif cell == "T":
+            return [[self.position_to_variable(i, j)]]
 
-                elif cell == "G":
-                    self.clauses.append([-self.position_to_variable(i, j)])
+        elif cell == "G":
+            return [[-self.position_to_variable(i, j)]]
 
-        return self.remove_duplicate_clauses()
+        return []
 
     def remove_duplicate_clauses(self):
         unique_clauses = []
@@ -48,4 +99,245 @@ class CNFGenerator(ABC):
                 visited.add(clause_tuple)
                 unique_clauses.append(clause)
 
-        return unique_clauses
\ No newline at end of file
+        return unique_clauses
+
+    def build_index(self):
+        """Sinh CNF và dựng chỉ mục ô -> id mệnh đề, biến -> id mệnh đề để về sau chỉ mã hóa lại ô bị thay đổi.
+        Mệnh đề trùng giữa các ô chỉ được lưu một lần và được đếm tham chiếu theo số ô sinh ra nó"""
+        start_time = time.time()
+        self._clauses_by_id = {}
+        self._clause_ids = {}
+        self._clause_refs = {}
+        self._cell_clauses = {}
+        self._variable_clauses = {}
+        self._next_clause_id = 0
+        self.indexed = True
+
+        with _gc_paused(), memory_phase(self.memory_tracker, "encoding"):
+            for i in range(self.rows):
+                for j in range(self.cols):
+                    if self.grid.cell(i, j) != "_":
+                        self._emit_cell(i, j)
+
+        self.clauses = self.current_clauses()
+        self.generation_stats = {
+            "mode": "indexed",
+            "workers": 1,
+            "generation_time": time.time() - start_time
+        }
+        return self.clauses
+
+    def current_clauses(self):
+        """Tập mệnh đề hiện tại theo chỉ mục (đã loại trùng), phản ánh mọi lần update_cell"""
+        return list(self._clauses_by_id.values())
+
+    def clauses_with_variable(self, variable):
+        """Các mệnh đề hiện tại có chứa biến variable"""
+        return [self._clauses_by_id[clause_id] for clause_id in sorted(self._variable_clauses.get(variable, ()))]
+
+    def update_cell(self, i, j, value):
+        """Đổi giá trị ô (i, j) (mở số, cắm cờ T/G, hoặc xóa về '_') và chỉ mã hóa lại các mệnh đề của ô đó.
+        Mệnh đề của các ô số lân cận chỉ phụ thuộc vào giá trị của chính chúng nên được giữ nguyên"""
+        if not (value in ("_", "T", "G") or (isinstance(value, int) and value >= 0)):
+            raise ValueError(f"Invalid cell value: {value}")
+        if not (0 <= i < self.rows and 0 <= j < self.cols):
+            raise ValueError(f"Cell out of range: ({i}, {j})")
+
+        if not self.indexed:
+            self.build_index()
+
+        start_time = time.time()
+        # Sinh mệnh đề mới trước để chỉ mục không bị thay đổi nếu giá trị mới không hợp lệ với ô
+        old_value = self.grid.cell(i, j)
+        self.grid.set_cell(i, j, value)
+        try:
+            clauses = self.generate_cell_clauses(i, j)
+        except Exception:
+            self.grid.set_cell(i, j, old_value)
+            raise
+
+        retracted = self._retract_cell(i, j)
+        added = self._emit_cell(i, j, clauses)
+
+        return {
+            "retracted_clauses": retracted,
+            "added_clauses": added,
+            "clauses": len(self._clauses_by_id),
+            "update_time": time.time() - start_time
+        }
+
+    def _emit_cell(self, i, j, clauses=None):
+        """Thêm mệnh đề của ô (i, j) vào chỉ mục, trả về số mệnh đề mới thực sự được thêm"""
+        if clauses is None:
+            clauses = self.generate_cell_clauses(i, j)
+
+        added = 0
+        clause_ids = []
+        for clause in clauses:
+            key = tuple(sorted(clause))
+            clause_id = self._clause_ids.get(key)
+            if clause_id is None:
+                clause_id = self._next_clause_id
+                self._next_clause_id += 1
+                self._clause_ids[key] = clause_id
+                self._clauses_by_id[clause_id] = clause
+                self._clause_refs[clause_id] = 1
+                for literal in clause:
+                    self._variable_clauses.setdefault(abs(literal), set()).add(clause_id)
+                added += 1
+            else:
+                self._clause_refs[clause_id] += 1
+            clause_ids.append(clause_id)
+
+        if clause_ids:
+            self._cell_clauses[(i, j)] = clause_ids
+        return added
+
+    def _retract_cell(self, i, j):
+        """Gỡ mệnh đề của ô (i, j) khỏi chỉ mục, trả về số mệnh đề bị xóa hẳn (không còn ô nào sinh ra)"""
+        retracted = 0
+        for clause_id in self._cell_clauses.pop((i, j), ()):
+            self._clause_refs[clause_id] -= 1
+            if self._clause_refs[clause_id] > 0:
+                continue
+
+            clause = self._clauses_by_id.pop(clause_id)
+            del self._clause_refs[clause_id]
+            del self._clause_ids[tuple(sorted(clause))]
+            for literal in clause:
+                self._variable_clauses[abs(literal)].discard(clause_id)
+            retracted += 1
+        return retracted
+
+    def _generate_cnf_parallel(self, workers, band_rows, start_time):
+        """Chia lưới thành các dải hàng, mỗi dải được mã hóa trong một tiến trình con.
+        Lưới được chia sẻ qua shared memory, mỗi tiến trình chỉ trả về mảng mệnh đề của dải"""
+        from concurrent.futures import ProcessPoolExecutor
+        from multiprocessing import shared_memory
+
+        workers = min(workers, os.cpu_count() or 1, self.rows)
+        if workers <= 1 and band_rows is None:
+            # Chỉ có một nhân: không đáng tốn chi phí khởi động tiến trình con
+            return self.generate_cnf()
+        if band_rows is None:
+            # Mỗi tiến trình nhận vài dải để cân bằng tải giữa các dải dày và thưa
+            band_rows = max(2, -(-self.rows // (workers * 4)))
+        bands = [(start, min(start + band_rows, self.rows)) for start in range(0, self.rows, band_rows)]
+
+        encoded = encode_grid(self.grid)
+        memory = shared_memory.SharedMemory(create=True, size=max(1, len(encoded)))
+        try:
+            memory.buf[:len(encoded)] = encoded
+            tasks = [(type(self), memory.name, self.rows, self.cols, start, end) for start, end in bands]
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_generate_band, tasks))
+        finally:
+            memory.close()
+            memory.unlink()
+
+        # Ghép các dải theo thứ tự; chỉ mệnh đề nằm trọn ở biên dải mới có thể trùng với dải khác
+        merge_start = time.time()
+        unique_clauses = []
+        visited = set()
+        band_stats = []
+        with _gc_paused():
+            self._merge_bands(results, unique_clauses, visited, band_stats)
+
+        self.clauses = unique_clauses
+        self.generation_stats = {
+            "mode": "parallel",
+            "workers": workers,
+            "bands": band_stats,
+            "boundary_clauses": len(visited),
+            "merge_time": time.time() - merge_start,
+            "generation_time": time.time() - start_time
+        }
+        return unique_clauses
+
+    @staticmethod
+    def _merge_bands(results, unique_clauses, visited, band_stats):
+        """Dựng lại mệnh đề từ mảng của từng dải, bỏ các mệnh đề biên đã xuất hiện ở dải trước"""
+        for literals, lengths, boundary, stats in results:
+            literals = literals.tolist()
+            offsets = list(accumulate(lengths, initial=0))
+            band_clauses = [literals[begin:end] for begin, end in zip(offsets, offsets[1:])]
+
+            duplicates = set()
+            index = boundary.find(1)
+            while index != -1:
+                clause_tuple = tuple(sorted(band_clauses[index]))
+                if clause_tuple in visited:
+                    duplicates.add(index)
+                else:
+                    visited.add(clause_tuple)
+                index = boundary.find(1, index + 1)
+
+            if duplicates:
+                band_clauses = [clause for index, clause in enumerate(band_clauses) if index not in duplicates]
+            unique_clauses.extend(band_clauses)
+            band_stats.append(stats)
+
+
+@contextmanager
+def _gc_paused():
+    """Tạm tắt bộ gom rác vòng khi tạo hàng triệu list nhỏ (không có tham chiếu vòng nào được tạo ra)"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def encode_grid(grid):
+    """Mã hóa lưới thành một byte cho mỗi ô, theo thứ tự hàng"""
+    if isinstance(grid, CompactGrid):
+        return grid.cells
+    encoded = bytearray()
+    for row in grid.grid:
+        encoded.extend(encode_cell(cell) for cell in row)
+    return encoded
+
+
+def _generate_band(task):
+    """Chạy trong tiến trình con: sinh và loại trùng mệnh đề của một dải hàng"""
+    from multiprocessing import shared_memory
+
+    strategy_class, memory_name, rows, cols, start_row, end_row = task
+    start_time = time.time()
+
+    # Bộ nhớ dùng chung đã là dạng gọn của lưới: chỉ sao chép một byte mỗi ô, không giải mã
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        view = CompactGrid(rows, cols, bytearray(memory.buf[:rows * cols]))
+    finally:
+        memory.close()
+
+    with _gc_paused():
+        generator = strategy_class(view)
+        generator.clauses = generator.generate_rows(start_row, end_row)
+        clauses = generator.remove_duplicate_clauses()
+
+    # Mệnh đề của dải chỉ có thể trùng với dải khác khi mọi biến nằm trong hai hàng ở biên trên
+    # (start_row - 1, start_row) hoặc hai hàng ở biên dưới (end_row - 1, end_row)
+    literals = array("i")
+    lengths = array("B")
+    boundary = bytearray()
+    top_limit = (start_row + 1) * cols
+    bottom_limit = (end_row - 1) * cols
+    for clause in clauses:
+        literals.extend(clause)
+        lengths.append(len(clause))
+        variables = list(map(abs, clause))
+        # Mệnh đề rỗng (ô số lớn hơn số ô lân cận) có thể xuất hiện ở mọi dải: coi là mệnh đề biên để chỉ giữ một
+        boundary.append(not variables or max(variables) <= top_limit or min(variables) > bottom_limit)
+
+    stats = {
+        "rows": (start_row, end_row),
+        "pid": os.getpid(),
+        "clauses": len(clauses),
+        "time": time.time() - start_time
+    }
+    return literals, lengths, boundary, stats
@@ -1,59 +1,78 @@
-from itertools import combinations
-
 from CNFGenerator import CNFGenerator
+from ClauseTemplates import get_template, instantiate
 
 
 class CardinalityStrategy(CNFGenerator):
 
+    def neighbor_variables(self, neighbors):
+        """Id biến của các ô lân cận theo đúng thứ tự vị trí trong mẫu"""
+        return [self.position_to_variable(i, j) for i, j in neighbors]
+
     def generate_at_least_n_clauses(self, neighbors, n):
         """Tạo mệnh đề 'ít nhất n bẫy' từ các ô lân cận"""
-        if n == 0:
-            return []  # Không cần ràng buộc nếu n=0
-
-        clauses = []
-        k = len(neighbors)
-
-        # Nếu cần tất cả các ô là bẫy
-        if n == k:
-            for i, j in neighbors:
-                clauses.append([self.position_to_variable(i, j)])
-            return clauses
-
         # Công thức: nếu có ít nhất n bẫy trong k ô,
         # thì không thể có (k-n+1) ô không phải bẫy
-        # Ta tạo mệnh đề cho tất cả các tổ hợp (k-n+1) ô
-        for combo in combinations(neighbors, k - n + 1):
-            # Mệnh đề: "Ít nhất một trong những ô này phải là bẫy"
-            clause = [self.position_to_variable(i, j) for i, j in combo]
-            clauses.append(clause)
-
-        return clauses
+        # Mẫu chứa mệnh đề cho tất cả các tổ hợp (k-n+1) ô
+        return instantiate(get_template("at_least", len(neighbors), n), self.neighbor_variables(neighbors))
 
     def generate_at_most_n_clauses(self, neighbors, n):
         """Tạo mệnh đề 'nhiều nhất n bẫy' từ các ô lân cận"""
-        if n >= len(neighbors):
-            return []  # Không cần ràng buộc nếu n ≥ số lượng hàng xóm
-
-        clauses = []
-
-        # Nếu không được có bẫy nào
-        if n == 0:
-            for i, j in neighbors:
-                clauses.append([-self.position_to_variable(i, j)])
-            return clauses
-
         # Công thức: nếu có nhiều nhất n bẫy trong k ô,
         # thì không thể có (n+1) ô đều là bẫy
-        # Ta tạo mệnh đề cho tất cả các tổ hợp (n+1) ô
-        for combo in combinations(neighbors, n + 1):
-            # Mệnh đề: "Ít nhất một trong những ô này không phải là bẫy"
-            clause = [-self.position_to_variable(i, j) for i, j in combo]
-            clauses.append(clause)
-
-        return clauses
+        # Mẫu chứa mệnh đề cho tất cả các tổ hợp (n+1) ô
+        return instantiate(get_template("at_most", len(neighbors), n), self.neighbor_variables(neighbors))
 
     def generate_exactly_n_clauses(self, neighbors, n):
         """Tạo mệnh đề 'chính xác n bẫy' bằng cách kết hợp 'ít nhất n' và 'nhiều nhất n'"""
-        at_least_clauses = self.generate_at_least_n_clauses(neighbors, n)
-        at_most_clauses = self.generate_at_most_n_clauses(neighbors, n)
-        return at_least_clauses + at_most_clauses
+        # Mẫu cho mỗi cặp (k, n) chỉ được tạo một lần cho cả tiến trình
+        return instantiate(get_template("cardinality", len(neighbors), n), self.neighbor_variables(neighbors))
+
+    def generate_lazy_cnf(self):
+        """Chế độ sinh lười: chỉ sinh phần hạt giống của CNF, phần còn lại được hoãn đến khi bị vi phạm.
+        Hạt giống gồm mệnh đề đơn của ô T/G và các nửa ràng buộc của ô số chỉ gồm mệnh đề một hoặc hai literal
+        ('nhiều nhất 0/1 bẫy', 'ít nhất k-1/k bẫy'). Trả về (seed, deferred), deferred là danh sách
+        [variables, n, các nửa còn hoãn] của từng ô số; trả về None nếu có ô số lớn hơn số ô lân cận"""
+        seed = []
+        deferred = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                cell = self.grid.cell(i, j)
+                if not isinstance(cell, int):
+                    seed.extend(self.generate_cell_clauses(i, j))
+                    continue
+
+                neighbors = self.grid.get_neighbors(i, j)
+                k = len(neighbors)
+                if cell > k:
+                    return None
+
+                pending = set()
+                # Mệnh đề 'nhiều nhất n' có n + 1 literal, mệnh đề 'ít nhất n' có k - n + 1 literal
+                if cell <= 1:
+                    seed.extend(self.generate_at_most_n_clauses(neighbors, cell))
+                elif cell < k:
+                    pending.add("at_most")
+                if cell >= k - 1:
+                    seed.extend(self.generate_at_least_n_clauses(neighbors, cell))
+                elif cell > 0:
+                    pending.add("at_least")
+
+                if pending:
+                    deferred.append([self.neighbor_variables(neighbors), cell, pending])
+
+        return seed, deferred
+
+    def generate_violated_clauses(self, constraint, true_variables):
+        """Mệnh đề của nửa ràng buộc bị mô hình vi phạm (rỗng nếu ô số được thỏa mãn).
+        Nửa đã sinh được bỏ khỏi danh sách hoãn của constraint"""
+        variables, n, pending = constraint
+        count = sum(var in true_variables for var in variables)
+        if count > n and "at_most" in pending:
+            kind = "at_most"
+        elif count < n and "at_least" in pending:
+            kind = "at_least"
+        else:
+            return []
+
+        pending.discard(kind)
+        return instantiate(get_template(kind, len(variables), n), variables)
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import time
+from array import array
+
+CHECKPOINT_VERSION = 1
+
+
+def cnf_hash(clauses, *extra):
+    """Băm SHA-256 của tập mệnh đề (theo đúng thứ tự) và các tham số ảnh hưởng đến thứ tự tìm kiếm"""
+    digest = hashlib.sha256()
+    for clause in clauses:
+        digest.update(array("i", clause).tobytes())
+        digest.update(b"\0\0\0\0")
+    for value in extra:
+        digest.update(str(value).encode())
+        digest.update(b"|")
+    return digest.hexdigest()
+
+
+class Checkpointer:
+    """Ghi định kỳ trạng thái tìm kiếm ra file JSON nhỏ để có thể tiếp tục sau khi bị ngắt.
+    Bộ giải gọi tick(state) thưa (mỗi 1000 bước); đồng hồ chỉ được đọc ở đó, và state() chỉ được gọi
+    khi đã đủ interval giây từ lần ghi trước, nên chi phí khi không ghi gần như bằng 0.
+    File được ghi nguyên tử (file tạm + os.replace) và gắn với mã băm của CNF"""
+
+    def __init__(self, path, cnf_hash, interval=60.0, label="Checkpoint"):
+        self.path = path
+        self.cnf_hash = cnf_hash
+        self.interval = interval
+        self.label = label
+        self.state = None
+        self.last_save = time.time()
+        self.saves = 0
+        self.save_time = 0.0
+
+    def load(self):
+        """Đọc trạng thái đã lưu, None nếu không có file hoặc file thuộc về CNF khác"""
+        if not self.path or not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r') as file:
+                checkpoint = json.load(file)
+        except Exception as e:
+            print(f"[{self.label}] Error loading checkpoint {self.path}: {e}")
+            return None
+
+        if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint.get("cnf_hash") != self.cnf_hash:
+            print(f"[{self.label}] Ignoring checkpoint {self.path}: it was written for a different CNF or solver")
+            return None
+
+        print(f"[{self.label}] Resuming from checkpoint {self.path}")
+        return checkpoint["state"]
+
+    def tick(self, state):
+        """Ghi trạng thái nếu đã đến hạn. state là hàm trả về dict có thể chuyển sang JSON"""
+        self.state = state
+        if time.time() - self.last_save >= self.interval:
+            self.save()
+
+    def save(self, state=None):
+        """Ghi ngay trạng thái (mặc định là hàm state của lần tick gần nhất).
+        Trả về False nếu không có gì để ghi (chưa có trạng thái hoặc không có đường dẫn)"""
+        state = state or self.state
+        if state is None or not self.path:
+            return False
+
+        start_time = time.time()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, 'w') as file:
+            json.dump({
+                "version": CHECKPOINT_VERSION,
+                "cnf_hash": self.cnf_hash,
+                "saved_at": start_time,
+                "state": state()
+            }, file, separators=(",", ":"))
+        os.replace(temporary_path, self.path)
+
+        self.last_save = time.time()
+        self.saves += 1
+        self.save_time += self.last_save - start_time
+        return True
+
+    def discard(self):
+        """Xóa checkpoint khi tìm kiếm đã kết thúc (không còn gì để tiếp tục)"""
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def stats(self):
+        return {
+            "checkpoints_written": self.saves,
+            "checkpoint_time": self.save_time
+        }
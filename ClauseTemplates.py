@@ -0,0 +1,160 @@
+from itertools import combinations
+
+# Bảng mẫu mệnh đề dùng chung cho cả tiến trình, khóa là (loại mẫu, k, n).
+# Mỗi mẫu là một tuple mệnh đề trên các vị trí lân cận 0..k-1: literal s + 1 nghĩa là
+# "ô lân cận thứ s là bẫy", -(s + 1) nghĩa là "ô lân cận thứ s không phải bẫy"
+_TEMPLATES = {}
+
+# Số ô lân cận tối đa của một ô (ô ở giữa lưới)
+MAX_NEIGHBORS = 8
+
+
+def _at_least_template(k, n):
+    """Mẫu 'ít nhất n bẫy' trong k ô: mọi tổ hợp (k-n+1) ô phải có ít nhất một bẫy"""
+    if n == 0:
+        return ()
+    if n == k:
+        return tuple((slot + 1,) for slot in range(k))
+    return tuple(tuple(slot + 1 for slot in combo) for combo in combinations(range(k), k - n + 1))
+
+
+def _at_most_template(k, n):
+    """Mẫu 'nhiều nhất n bẫy' trong k ô: mọi tổ hợp (n+1) ô phải có ít nhất một ô không phải bẫy"""
+    if n >= k:
+        return ()
+    if n == 0:
+        return tuple((-(slot + 1),) for slot in range(k))
+    return tuple(tuple(-(slot + 1) for slot in combo) for combo in combinations(range(k), n + 1))
+
+
+def _cardinality_template(k, n):
+    return _at_least_template(k, n) + _at_most_template(k, n)
+
+
+def _truth_table_rows(k, n):
+    """Các hàng bảng chân trị (bit của vị trí 0 là bit cao nhất) có số bẫy khác n"""
+    return [bits for bits in range(2 ** k) if bin(bits).count("1") != n]
+
+
+def _truth_table_template(k, n):
+    """Mẫu bảng chân trị: mỗi hàng sai sinh một mệnh đề loại trừ đúng hàng đó"""
+    if n == 0:
+        return tuple((-(slot + 1),) for slot in range(k))
+    if n == k:
+        return tuple((slot + 1,) for slot in range(k))
+
+    clauses = []
+    for bits in _truth_table_rows(k, n):
+        clause = []
+        for slot in range(k):
+            # Bit = 1 (là bẫy) thì phủ định là "không phải bẫy" và ngược lại
+            if bits >> (k - 1 - slot) & 1:
+                clause.append(-(slot + 1))
+            else:
+                clause.append(slot + 1)
+        clauses.append(tuple(clause))
+    return tuple(clauses)
+
+
+def _prime_implicants(minterms, k):
+    """Thuật toán Quine-McCluskey: gộp dần các hàng khác nhau đúng một bit.
+    Mỗi implicant là (giá trị, mặt nạ các bit không quan tâm)"""
+    current = {(term, 0) for term in minterms}
+    primes = set()
+
+    while current:
+        merged = set()
+        used = set()
+        for value, mask in current:
+            for position in range(k):
+                bit = 1 << position
+                if not (mask | value) & bit and (value | bit, mask) in current:
+                    merged.add((value, mask | bit))
+                    used.add((value, mask))
+                    used.add((value | bit, mask))
+
+        primes.update(current - used)
+        current = merged
+
+    return primes
+
+
+def _minimized_truth_table_template(k, n):
+    """Mẫu bảng chân trị đã rút gọn: phủ các hàng sai bằng ít implicant nguyên tố nhất (tham lam)"""
+    rows = set(_truth_table_rows(k, n))
+    if not rows:
+        return ()
+
+    primes = _prime_implicants(rows, k)
+    full = (1 << k) - 1
+
+    def covered(implicant):
+        value, mask = implicant
+        return {row for row in rows if row & ~mask & full == value}
+
+    coverage = {implicant: covered(implicant) for implicant in primes}
+    remaining = set(rows)
+    chosen = []
+
+    # Chọn các implicant bắt buộc trước, sau đó chọn tham lam implicant phủ nhiều hàng nhất
+    for row in sorted(rows):
+        covering = [implicant for implicant in primes if row in coverage[implicant]]
+        if len(covering) == 1 and covering[0] not in chosen:
+            chosen.append(covering[0])
+            remaining -= coverage[covering[0]]
+    while remaining:
+        best = max(sorted(primes), key=lambda implicant: len(coverage[implicant] & remaining))
+        chosen.append(best)
+        remaining -= coverage[best]
+
+    clauses = []
+    for value, mask in sorted(chosen, key=lambda implicant: (bin(implicant[1]).count("0"), implicant)):
+        clause = []
+        for slot in range(k):
+            bit = 1 << (k - 1 - slot)
+            if mask & bit:
+                continue
+            clause.append(-(slot + 1) if value & bit else slot + 1)
+        clauses.append(tuple(clause))
+    return tuple(clauses)
+
+
+_BUILDERS = {
+    "at_least": _at_least_template,
+    "at_most": _at_most_template,
+    "cardinality": _cardinality_template,
+    "truth_table": _truth_table_template,
+    "truth_table_minimized": _minimized_truth_table_template
+}
+
+
+def get_template(kind, k, n):
+    """Lấy mẫu mệnh đề cho ô có k lân cận và giá trị n, tạo và lưu lại ở lần đầu tiên"""
+    key = (kind, k, n)
+    template = _TEMPLATES.get(key)
+    if template is None:
+        template = _BUILDERS[kind](k, n)
+        _TEMPLATES[key] = template
+    return template
+
+
+def instantiate(template, variables):
+    """Thay id biến của các ô lân cận vào các vị trí của mẫu"""
+    # Bảng tra 2k + 1 phần tử: table[s] = biến của vị trí s - 1, table[-s] (chỉ số âm của Python) = phủ định của nó,
+    # nên mỗi mệnh đề chỉ là một phép gather theo chỉ số
+    table = [0] + variables + [-var for var in reversed(variables)]
+    gather = table.__getitem__
+    return [list(map(gather, clause)) for clause in template]
+
+
+def precompute_templates(kinds=None):
+    """Tạo sẵn toàn bộ bảng mẫu cho mọi k = 1..8 và n = 0..8"""
+    for kind in kinds or _BUILDERS:
+        for k in range(1, MAX_NEIGHBORS + 1):
+            for n in range(0, MAX_NEIGHBORS + 1):
+                try:
+                    get_template(kind, k, n)
+                except ValueError:
+                    # Giá trị n quá lớn so với k: không có mẫu hợp lệ, để chiến lược tự báo lỗi khi gặp
+                    pass
+    return len(_TEMPLATES)
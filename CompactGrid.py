@@ -0,0 +1,114 @@
+from GemHunterGrid import GemHunterGrid
+
+# Mã hóa một byte cho mỗi ô: giá trị số 0..252 được giữ nguyên
+UNKNOWN_CODE = 255
+TRAP_CODE = 254
+GEM_CODE = 253
+# Mọi mã nhỏ hơn giá trị này là ô số
+MAX_NUMBER_CODE = GEM_CODE - 1
+
+
+def encode_cell(cell):
+    if cell == "_":
+        return UNKNOWN_CODE
+    if cell == "T":
+        return TRAP_CODE
+    if cell == "G":
+        return GEM_CODE
+    return cell
+
+
+def decode_cell(code):
+    if code == UNKNOWN_CODE:
+        return "_"
+    if code == TRAP_CODE:
+        return "T"
+    if code == GEM_CODE:
+        return "G"
+    return code
+
+
+class CompactGrid:
+    """Lưới gọn trong bộ nhớ: một bytearray, mỗi ô một byte theo thứ tự hàng (xem các mã *_CODE).
+    clone() chỉ chia sẻ bộ đệm, bản sao thật chỉ được tạo ở lần ghi đầu tiên (copy-on-write).
+    Thuộc tính grid là khung nhìn list các hàng như GemHunterGrid, chỉ để đọc: mọi thay đổi phải qua set_cell"""
+
+    __slots__ = ("rows", "cols", "cells", "_shared", "_view")
+
+    def __init__(self, rows=0, cols=0, cells=None):
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells if cells is not None else bytearray([UNKNOWN_CODE]) * (rows * cols)
+        if len(self.cells) != rows * cols:
+            raise ValueError(f"Expected {rows * cols} cells, got {len(self.cells)}")
+        # Bộ đệm đang được dùng chung với một bản clone khác
+        self._shared = False
+        self._view = None
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Mã hóa một GemHunterGrid (hoặc list các hàng)"""
+        rows = grid if isinstance(grid, list) else grid.grid
+        cells = bytearray()
+        for row in rows:
+            cells.extend(encode_cell(cell) for cell in row)
+        return cls(len(rows), len(rows[0]) if rows else 0, cells)
+
+    def load_grid_from_file(self, filepath):
+        grid = GemHunterGrid().load_grid_from_file(filepath)
+        compact = CompactGrid.from_grid(grid)
+        self.rows, self.cols, self.cells = compact.rows, compact.cols, compact.cells
+        self._shared = False
+        self._view = None
+        return self
+
+    def save_grid_to_file(self, filepath):
+        self.to_grid().save_grid_to_file(filepath)
+
+    def to_grid(self):
+        """Chuyển về GemHunterGrid (list các hàng, có thể sửa trực tiếp)"""
+        return GemHunterGrid(grid=[row[:] for row in self.grid])
+
+    @property
+    def grid(self):
+        """Khung nhìn list các hàng để tương thích với mã dùng GemHunterGrid, được giải mã một lần
+        và giữ lại cho đến lần ghi tiếp theo"""
+        if self._view is None:
+            cols = self.cols
+            decoded = [decode_cell(code) for code in range(256)]
+            self._view = [[decoded[code] for code in self.cells[row * cols:(row + 1) * cols]]
+                          for row in range(self.rows)]
+        return self._view
+
+    def code(self, row, col):
+        return self.cells[row * self.cols + col]
+
+    def cell(self, row, col):
+        return decode_cell(self.cells[row * self.cols + col])
+
+    def set_cell(self, row, col, value):
+        code = encode_cell(value)
+        if not isinstance(code, int) or code < 0 or (value not in ("_", "T", "G") and code > MAX_NUMBER_CODE):
+            raise ValueError(f"Invalid cell value: {value}")
+        self.set_code(row, col, code)
+
+    def set_code(self, row, col, code):
+        if self._shared:
+            self.cells = bytearray(self.cells)
+            self._shared = False
+        self.cells[row * self.cols + col] = code
+        self._view = None
+
+    def is_number(self, row, col):
+        return self.cells[row * self.cols + col] <= MAX_NUMBER_CODE
+
+    get_neighbors = GemHunterGrid.get_neighbors
+
+    def clone(self):
+        clone = CompactGrid(self.rows, self.cols, self.cells)
+        clone._shared = True
+        self._shared = True
+        return clone
+
+    def __str__(self):
+        return str(self.to_grid())
@@ -0,0 +1,273 @@
+import random
+import time
+from operator import le, sub
+
+from ICNFSolver import ICNFSolver
+
+
+class FrontierDPSolver(ICNFSolver):
+    """Giải trực tiếp trên lưới bằng quy hoạch động theo từng hàng (transfer matrix).
+    Trạng thái là mẫu bẫy của hai hàng gần nhất, chỉ giữ các mẫu thỏa mãn mọi ô số đã được phủ kín.
+    Ô chứa số được coi là đã mở nên không phải bẫy"""
+
+    requires_cnf = False
+
+    def __init__(self, clauses, rows, cols, grid=None):
+        super().__init__(clauses, rows, cols, grid)
+
+        cells = self.grid.grid
+        # Quét theo chiều dài hơn để chiều rộng (số bit của trạng thái) là cạnh hẹp
+        self.transposed = cols > rows
+        if self.transposed:
+            cells = [[cells[i][j] for i in range(rows)] for j in range(cols)]
+        self.height = len(cells)
+        self.width = len(cells[0]) if self.height > 0 else 0
+        self.cells = cells
+
+        self._prepare_rows()
+        self.layers = None
+        self._next_cache = {}
+        self._remaining_cache = {}
+        self._limits_cache = {}
+
+    def _window(self, col):
+        """Mặt nạ các cột col-1..col+1 trong một hàng"""
+        full = (1 << self.width) - 1
+        return (7 << col >> 1) & full
+
+    def _prepare_rows(self):
+        """Tính cho từng hàng: các ô tự do liên quan, ô bẫy cố định và các ô số"""
+        height, width = self.height, self.width
+        self.trap_masks = []
+        self.free_masks = []
+        self.numbers = []
+        self.unconstrained = []
+
+        for r in range(height):
+            trap_mask = 0
+            numbers = []
+            for c in range(width):
+                cell = self.cells[r][c]
+                if isinstance(cell, int):
+                    numbers.append((c, cell))
+                elif cell == "T":
+                    trap_mask |= 1 << c
+            self.trap_masks.append(trap_mask)
+            self.numbers.append(numbers)
+
+        for r in range(height):
+            free_mask = 0
+            unconstrained = []
+            for c in range(width):
+                if self.cells[r][c] != "_":
+                    continue
+                # Ô không kề ô số nào là tự do hoàn toàn, chỉ nhân đôi số lời giải
+                has_number = any(
+                    isinstance(self.cells[nr][nc], int)
+                    for nr in range(max(0, r - 1), min(height, r + 2))
+                    for nc in range(max(0, c - 1), min(width, c + 2)))
+                if has_number:
+                    free_mask |= 1 << c
+                else:
+                    unconstrained.append(c)
+            self.free_masks.append(free_mask)
+            self.unconstrained.append(unconstrained)
+
+    def _numbers(self, r):
+        """Các ô số của hàng r; hàng ảo phía trên và phía dưới lưới không có ô số"""
+        return self.numbers[r] if 0 <= r < self.height else ()
+
+    def _number_windows(self, r):
+        """Hợp các cửa sổ quanh ô số của hàng r: chỉ những bit này của hàng r - 1 còn cần nhớ"""
+        mask = 0
+        for c, _ in self._numbers(r):
+            mask |= self._window(c)
+        return mask
+
+    def _remaining_counts(self, r, prev_mask):
+        """Số bẫy các ô số của hàng r còn cần sau khi đã tính hàng r - 1, None nếu đã vượt quá"""
+        cache_key = (r, prev_mask)
+        if cache_key in self._remaining_cache:
+            return self._remaining_cache[cache_key]
+
+        remaining = tuple(n - (prev_mask & self._window(c)).bit_count() for c, n in self._numbers(r))
+        if remaining and min(remaining) < 0:
+            remaining = None
+        self._remaining_cache[cache_key] = remaining
+        return remaining
+
+    def _next_masks(self, r, key):
+        """Liệt kê các mẫu của hàng r + 1 khớp đúng số bẫy còn thiếu quanh các ô số của hàng r.
+        Mỗi mẫu đi kèm số bẫy nó đóng góp cho các ô số của chính hàng r + 1
+        và phần bit mà các ô số của hàng r + 2 còn nhìn thấy"""
+        cache_key = (r, key)
+        cached = self._next_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        width = self.width
+        if 0 <= r + 1 < self.height:
+            free_mask = self.free_masks[r + 1]
+            trap_mask = self.trap_masks[r + 1]
+        else:
+            # Hàng ảo phía sau hàng cuối cùng không có bẫy
+            free_mask = trap_mask = 0
+
+        # Ràng buộc được kiểm tra ngay khi đã gán xong bit cuối cùng của cửa sổ
+        checks = {}
+        for (c, _), required in zip(self._numbers(r), key):
+            checks.setdefault(min(c + 1, width - 1), []).append((self._window(c), required))
+
+        own_windows = [self._window(c) for c, _ in self._numbers(r + 1)]
+        visible = self._number_windows(r + 2)
+        results = []
+
+        def extend(position, mask):
+            if position == width:
+                used = tuple((mask & window).bit_count() for window in own_windows)
+                results.append((mask, used, mask & visible))
+                return
+            bit = 1 << position
+            if trap_mask & bit:
+                options = (mask | bit,)
+            elif free_mask & bit:
+                options = (mask, mask | bit)
+            else:
+                options = (mask,)
+            for option in options:
+                if all((option & window).bit_count() == required for window, required in checks.get(position, ())):
+                    extend(position + 1, option)
+
+        extend(0, 0)
+        self._next_cache[cache_key] = results
+        return results
+
+    def _transitions(self, t, state):
+        """Các cặp (mẫu đầy đủ của hàng t, trạng thái mới) đi ra từ một trạng thái sau hàng t - 1.
+        Trạng thái chỉ gồm các bit của hàng vừa chọn mà ô số hàng kế tiếp còn nhìn thấy,
+        cùng số bẫy các ô số của hàng đó còn đòi hỏi ở hàng sau"""
+        prev_mask, key = state
+        remaining = self._remaining_counts(t, prev_mask)
+        if remaining is None:
+            return
+        lower, upper = self._limits(t)
+        for mask, used, visible_mask in self._next_masks(t - 1, key):
+            next_key = tuple(map(sub, remaining, used))
+            if all(map(le, lower, next_key)) and all(map(le, next_key, upper)):
+                yield mask, (visible_mask, next_key)
+
+    def _limits(self, r):
+        """Khoảng số bẫy hàng r + 1 có thể đặt trong cửa sổ quanh từng ô số của hàng r"""
+        cached = self._limits_cache.get(r)
+        if cached is not None:
+            return cached
+
+        if 0 <= r + 1 < self.height:
+            trap_mask = self.trap_masks[r + 1]
+            possible = self.free_masks[r + 1] | trap_mask
+        else:
+            trap_mask = possible = 0
+        lower = tuple((self._window(c) & trap_mask).bit_count() for c, _ in self._numbers(r))
+        upper = tuple((self._window(c) & possible).bit_count() for c, _ in self._numbers(r))
+        self._limits_cache[r] = (lower, upper)
+        return lower, upper
+
+    def _forward(self):
+        """Chạy quy hoạch động từ trên xuống, lưu số cách đi tới mỗi trạng thái sau mỗi hàng"""
+        if self.layers is not None:
+            return self.layers
+
+        # Tầng t chứa các trạng thái sau khi đã chọn xong hàng t - 1 (hàng -1 và hàng height là hàng ảo)
+        layers = [{(0, ()): 1}]
+        for t in range(self.height + 1):
+            following = {}
+            for state, count in layers[-1].items():
+                for _, next_state in self._transitions(t, state):
+                    following[next_state] = following.get(next_state, 0) + count
+            layers.append(following)
+
+        self.layers = layers
+        return layers
+
+    def count_solutions(self):
+        """Đếm chính xác số lời giải của lưới"""
+        layers = self._forward()
+        free_cells = sum(len(unconstrained) for unconstrained in self.unconstrained)
+        return sum(layers[-1].values()) * 2 ** free_cells
+
+    def _trace_back(self, rng):
+        """Truy vết mẫu của từng hàng; rng=None lấy lời giải đầu tiên, ngược lại lấy mẫu đều"""
+        layers = self._forward()
+
+        def choose(candidates):
+            if rng is None:
+                return candidates[0][0]
+            target = rng.randrange(sum(count for _, count in candidates))
+            for candidate, count in candidates:
+                if target < count:
+                    return candidate
+                target -= count
+
+        target = choose(list(layers[-1].items()))
+        masks = []
+        for t in range(self.height, -1, -1):
+            # Các cặp (trạng thái trước, mẫu hàng t) dẫn tới trạng thái đã chọn, trọng số là số cách đi tới
+            candidates = []
+            for state, count in layers[t].items():
+                for mask, next_state in self._transitions(t, state):
+                    if next_state == target:
+                        candidates.append(((state, mask), count))
+            target, mask = choose(candidates)
+            if t < self.height:
+                masks.append(mask)
+        masks.reverse()
+        return masks
+
+    def _masks_to_grid(self, masks, rng):
+        """Chuyển các mẫu bẫy theo hàng thành lưới kết quả theo hướng ban đầu"""
+        cells = [row[:] for row in self.cells]
+        for r, mask in enumerate(masks):
+            for c in range(self.width):
+                if cells[r][c] == "_":
+                    cells[r][c] = "T" if mask >> c & 1 else "G"
+            for c in self.unconstrained[r]:
+                # Ô không bị ràng buộc: chọn ngẫu nhiên khi lấy mẫu, mặc định là đá quý
+                cells[r][c] = "T" if rng is not None and rng.random() < 0.5 else "G"
+
+        if self.transposed:
+            cells = [[cells[r][c] for r in range(self.height)] for c in range(self.width)]
+        return cells
+
+    def sample(self, count=1, seed=None):
+        """Lấy mẫu đều count lời giải"""
+        rng = random.Random(seed)
+        if self.count_solutions() == 0:
+            return []
+        return [self._masks_to_grid(self._trace_back(rng), rng) for _ in range(count)]
+
+    def solve(self):
+        start_time = time.time()
+
+        self.log(f"[Frontier DP] Solving {self.rows}x{self.cols} grid row by row "
+                 f"(width {self.width}{', transposed' if self.transposed else ''})...")
+
+        layers = self._forward()
+        success = len(layers[-1]) > 0
+        solving_time = time.time() - start_time
+
+        stats = {
+            "transposed": self.transposed,
+            "dp_width": self.width,
+            "max_states": max(len(layer) for layer in layers),
+            "total_states": sum(len(layer) for layer in layers),
+            "solving_time": solving_time
+        }
+
+        if success:
+            self.log(f"[Frontier DP] Found a solution, at most {stats['max_states']:,} states per row")
+            self.log(f"[Frontier DP] Solving time: {solving_time:.6f} seconds")
+            return True, self._masks_to_grid(self._trace_back(None), None), stats
+
+        self.log(f"[Frontier DP] No solution found")
+        self.log(f"[Frontier DP] Solving time: {solving_time:.6f} seconds")
+        return False, None, stats
@@ -18,7 +18,8 @@ class GemHunterGrid:
                 cells = line.strip().split(",")
                 for cell in cells:
                     cell = cell.strip()
-                    if cell == "_":
+                    # Lưới kết quả đã lưu có thêm ô 'T' (bẫy) và 'G' (đá quý)
+                    if cell in ("_", "T", "G"):
                         row.append(cell)
                     else:
                         row.append(int(cell))
@@ -44,6 +45,17 @@ class GemHunterGrid:
         except Exception as e:
             print(f"Error saving grid to file: {e}")
 
+    def cell(self, row, col):
+        return self.grid[row][col]
+
+    def set_cell(self, row, col, value):
+        self.grid[row][col] = value
+
+    def compact(self):
+        """Bản mã hóa gọn (một byte mỗi ô) của lưới, xem CompactGrid"""
+        from CompactGrid import CompactGrid
+        return CompactGrid.from_grid(self)
+
     def get_neighbors(self, row, col):
         neighbors = []
         for d_row in [-1, 0, 1]:
@@ -1,10 +1,9 @@
+import contextlib
+import io
 import time
 
-from BacktrackingSolver import BacktrackingSolver
-from BruteForceSolver import BruteForceSolver
-from CardinalityStrategy import CardinalityStrategy
-from PySATSolver import PySATSolver
-from TruthTableStrategy import TruthTableStrategy
+from MemoryTracker import memory_phase
+from SolverRegistry import CNF_STRATEGIES, SOLVERS
 
 class GemHunterSolver:
     """Bộ giải cho bài toán Thợ săn đá quý có thể sử dụng nhiều chiến lược CNF và thuật toán giải khác nhau"""
@@ -12,62 +11,305 @@ class GemHunterSolver:
     # Các chiến lược tạo CNF
     TRUTH_TABLE = "truth_table"
     CARDINALITY = "cardinality"
+    TRUTH_TABLE_MINIMIZED = "truth_table_minimized"
 
     # Các thuật toán giải CNF
     BRUTE_FORCE = "brute_force"
     BACKTRACKING = "backtracking"
     PYSAT = "pysat"
+    PYSAT_MINICARD = "pysat_minicard"
+    PYSAT_LAZY = "pysat_lazy"
+    FRONTIER_DP = "frontier_dp"
+    TILED = "tiled"
+    LOCAL_SEARCH = "local_search"
+    LOCAL_SEARCH_NATIVE = "local_search_native"
 
-    def __init__(self, grid, cnf_strategy=CARDINALITY, solver_algorithm=PYSAT):
-        """Khởi tạo bộ giải với một chiến lược CNF và thuật toán giải cụ thể"""
+    # Tự chọn chiến lược và/hoặc thuật toán theo đặc trưng của lưới
+    AUTO = "auto"
+
+    def __init__(self, grid, cnf_strategy=CARDINALITY, solver_algorithm=PYSAT, solver_options=None,
+                 generation_workers=None, track_memory=False, verify=False, trap_bounds=None, totalizer_cap=None,
+                 phase_hint=None, warm_start=False, compare_cold_start=False, quiet=False):
+        """Khởi tạo bộ giải với một chiến lược CNF và thuật toán giải cụ thể.
+        solver_options là các tham số bổ sung truyền thẳng vào hàm khởi tạo của thuật toán giải,
+        generation_workers > 1 thì CNF được sinh song song theo dải hàng,
+        track_memory thì đo đỉnh bộ nhớ của từng giai đoạn (chậm hơn do tracemalloc),
+        verify thì kiểm tra lại lưới kết quả với mọi ô số sau khi giải,
+        trap_bounds = (lower, upper) giới hạn tổng số bẫy (None ở một phía là không giới hạn),
+        totalizer_cap giới hạn số đầu ra của totalizer dùng để mã hóa cận đó (xem Totalizer),
+        phase_hint là lưới kết quả của một bài gần giống, dùng làm pha ưu tiên của các biến,
+        warm_start thì giữ lời giải của mỗi lần giải thành công làm phase_hint cho lần sau,
+        compare_cold_start thì giải lại không có gợi ý để so sánh số quyết định / xung đột,
+        quiet thì không in thông báo nào (kể cả của thuật toán giải)"""
         self.cnf_strategy = None
         self.grid = grid
         self.rows = grid.rows
         self.cols = grid.cols
         self.set_cnf_strategy(cnf_strategy)
         self.solver_algorithm = solver_algorithm
+        self.solver_options = dict(solver_options) if solver_options else {}
+        self.generation_workers = generation_workers
+        self.track_memory = track_memory
+        self.verify = verify
+        # Thống kê của lần liệt kê lời giải gần nhất (xem enumerate_solutions)
+        self.enumeration_stats = {}
+        # Cận tổng số bẫy; totalizer chỉ được mã hóa một lần, đổi cận chỉ đổi assumptions
+        self.trap_bounds = None
+        self.totalizer_cap = totalizer_cap
+        self._totalizer = None
+        if trap_bounds:
+            self.set_trap_bounds(*trap_bounds)
+        # Gợi ý pha từ lời giải của một bài gần giống (ví dụ trạng thái trước của cùng ván chơi)
+        self.phase_hint = phase_hint
+        self.warm_start = warm_start
+        self.compare_cold_start = compare_cold_start
+        self.quiet = quiet
+        # Dạng biên dịch (BDD) của lưới gần nhất, dùng lại khi lưới không đổi
+        self._compiled = None
+
+    def log(self, *values):
+        if not self.quiet:
+            print(*values)
 
     def set_cnf_strategy(self, strategy_name):
         """Thay đổi chiến lược tạo CNF"""
-        if strategy_name == self.TRUTH_TABLE:
-            self.cnf_strategy = TruthTableStrategy(self.grid)
-        elif strategy_name == self.CARDINALITY:
-            self.cnf_strategy = CardinalityStrategy(self.grid)
-        else:
-            raise ValueError(f"Unknown CNF strategy: {strategy_name}")
+        self.auto_cnf_strategy = strategy_name == self.AUTO
+        if self.auto_cnf_strategy:
+            # Chiến lược thực sự được chọn lúc giải, tạm thời dùng cardinality
+            strategy_name = self.CARDINALITY
+        self.cnf_strategy = CNF_STRATEGIES.get(strategy_name)(self.grid)
 
     def set_solver_algorithm(self, solver_name):
         """Thay đổi thuật toán giải CNF"""
         self.solver_algorithm = solver_name
-        if solver_name not in [self.BRUTE_FORCE, self.BACKTRACKING, self.PYSAT]:
+        if solver_name != self.AUTO and solver_name not in SOLVERS:
             raise ValueError(f"Unknown solver algorithm: {solver_name}")
 
+    def set_trap_bounds(self, lower=None, upper=None):
+        """Đặt (hoặc bỏ, nếu cả hai là None) cận dưới / cận trên của tổng số bẫy.
+        Thắt chặt hay nới lỏng cận giữa các lần giải không mã hóa lại CNF hay totalizer"""
+        if lower is not None and upper is not None and lower > upper:
+            raise ValueError(f"Lower trap bound {lower} is greater than upper bound {upper}")
+        if self.totalizer_cap is not None and (lower is not None or upper is not None):
+            # Kiểm tra ngay khi đặt cận thay vì để bộ giải báo lỗi giữa chừng
+            count = len(self.trap_variables())
+            cap = min(self.totalizer_cap, count)
+            if (lower or 0) > cap or (upper is not None and cap <= upper < count):
+                raise ValueError(f"Trap bounds [{lower}, {upper}] need a totalizer cap above {cap}; "
+                                 f"increase totalizer_cap or leave it unset")
+        self.trap_bounds = None if lower is None and upper is None else (lower, upper)
+
+    def phase_literals(self, result_grid=None):
+        """Literal pha ưu tiên cho các ô '_' của lưới hiện tại, lấy từ lưới kết quả của bài trước:
+        ô bẫy là literal dương, ô đá quý hoặc ô số là literal âm"""
+        hint = self.phase_hint if result_grid is None else result_grid
+        rows = hint.grid if hasattr(hint, "grid") else hint
+        if len(rows) != self.rows or any(len(row) != self.cols for row in rows):
+            raise ValueError(f"Phase hint must be a {self.rows}x{self.cols} grid")
+
+        literals = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if self.grid.grid[i][j] == "_" and rows[i][j] != "_":
+                    var = self.cnf_strategy.position_to_variable(i, j)
+                    literals.append(var if rows[i][j] == "T" else -var)
+        return literals
+
+    def trap_variables(self):
+        """Biến của các ô được tính vào tổng số bẫy: mọi ô trừ ô số"""
+        return [self.cnf_strategy.position_to_variable(i, j) for i in range(self.rows) for j in range(self.cols)
+                if not isinstance(self.grid.grid[i][j], int)]
+
+    def numbered_cell_units(self):
+        """Mệnh đề đơn 'ô số không phải bẫy': CNF của các chiến lược không ép điều này, nên khi đếm bẫy
+        phải thêm vào để ô số không bị dùng làm bẫy thỏa ô số lân cận"""
+        return [[-self.cnf_strategy.position_to_variable(i, j)] for i in range(self.rows) for j in range(self.cols)
+                if isinstance(self.grid.grid[i][j], int)]
+
+    def totalizer(self, variables=None):
+        """Totalizer trên các biến được đếm, chỉ dựng lại khi tập biến (hoặc cap) thay đổi"""
+        from Totalizer import Totalizer
+
+        variables = variables if variables is not None else self.trap_variables()
+        totalizer = self._totalizer
+        if totalizer is None or totalizer.variables != variables or \
+                totalizer.cap != (len(variables) if self.totalizer_cap is None
+                                  else min(self.totalizer_cap, len(variables))):
+            # Biến phụ được đánh số sau mọi biến ô
+            totalizer = Totalizer(variables, self.rows * self.cols + 1, self.totalizer_cap)
+            self._totalizer = totalizer
+        return totalizer
+
+    @staticmethod
+    def supports_trap_bounds(solver_class):
+        """Thuật toán tự đếm được số bẫy, hoặc nhận CNF kèm assumptions cho totalizer"""
+        return solver_class.native_trap_bounds or (solver_class.requires_cnf and solver_class.supports_assumptions)
+
+    def _apply_trap_bounds(self, solver_class, cnf_clauses):
+        """Trả về (mệnh đề, assumptions, cận gốc) cho thuật toán giải: thuật toán tự đếm được thì nhận
+        cận gốc, thuật toán nhận assumptions thì nhận thêm mệnh đề totalizer và literal đầu ra của nó"""
+        lower, upper = self.trap_bounds
+        variables = self.trap_variables()
+        # Cận chỉ đếm các ô không phải ô số, nên ô số phải chắc chắn an toàn thì cận mới có nghĩa
+        present = {clause[0] for clause in cnf_clauses if len(clause) == 1}
+        cnf_clauses = cnf_clauses + [unit for unit in self.numbered_cell_units() if unit[0] not in present]
+        if solver_class.native_trap_bounds:
+            return cnf_clauses, (), (lower, upper, variables)
+        if not self.supports_trap_bounds(solver_class):
+            raise ValueError(f"Solver algorithm {solver_class.__name__} does not support trap bounds")
+
+        totalizer = self.totalizer(variables)
+        assumptions = totalizer.bound_assumptions(lower, upper)
+        if assumptions is None:
+            # Khoảng cận rỗng với số ô hiện có: hai giả định mâu thuẫn để bộ giải báo vô nghiệm
+            var = variables[0] if variables else 1
+            assumptions = [var, -var]
+        return cnf_clauses + totalizer.clauses, assumptions, None
+
+    def trap_count_range(self, solver_name='g4'):
+        """Số bẫy ít nhất và nhiều nhất trên các lời giải (trong cận hiện tại, nếu có).
+        Dùng một phiên PySAT duy nhất: mỗi lời giải có k bẫy chỉ làm đổi assumption sang cận k - 1
+        (hoặc k + 1) rồi giải tiếp, mệnh đề học được từ các lần trước được giữ lại.
+        Với totalizer_cap, cận vượt cap không biểu diễn được: khi đó min_traps_at_least / max_traps_at_least
+        là True và min_traps / max_traps chỉ là cận dưới của giá trị thật"""
+        from pysat.solvers import Solver
+
+        start_time = time.time()
+        variables = self.trap_variables()
+        totalizer = self.totalizer(variables)
+        lower, upper = self.trap_bounds or (None, None)
+        solves = 0
+        min_at_least = False
+        max_at_least = False
+
+        def trap_count(model):
+            true_variables = {lit for lit in model if lit > 0}
+            return sum(var in true_variables for var in variables)
+
+        if not totalizer.represents(lower, upper):
+            raise ValueError(f"Trap bounds [{lower}, {upper}] exceed the totalizer cap {totalizer.cap}")
+
+        with Solver(name=solver_name, bootstrap_with=self.cnf_strategy.generate_cnf()) as solver:
+            solver.append_formula(self.numbered_cell_units())
+            solver.append_formula(totalizer.clauses)
+
+            minimum = None
+            bound = upper
+            while True:
+                clamped = not totalizer.represents(lower, bound)
+                if clamped:
+                    # Cận trên từ cap trở lên không biểu diễn được: thử thẳng cap - 1
+                    bound = totalizer.cap - 1
+                assumptions = totalizer.bound_assumptions(lower, bound)
+                solves += 1
+                if assumptions is None or not solver.solve(assumptions=assumptions):
+                    if clamped and minimum > totalizer.cap:
+                        # Không có lời giải ít hơn cap bẫy: giá trị nhỏ nhất nằm trong [cap, minimum]
+                        minimum = totalizer.cap
+                        min_at_least = True
+                    break
+                minimum = trap_count(solver.get_model())
+                bound = minimum - 1
+
+            maximum = None
+            bound = lower
+            while minimum is not None:
+                if not totalizer.represents(bound, upper):
+                    # Cận dưới vượt cap: chỉ biết giá trị lớn nhất ít nhất bằng lời giải vừa tìm được
+                    max_at_least = True
+                    break
+                assumptions = totalizer.bound_assumptions(bound, upper)
+                solves += 1
+                if assumptions is None or not solver.solve(assumptions=assumptions):
+                    break
+                maximum = trap_count(solver.get_model())
+                bound = maximum + 1
+
+        return {
+            "min_traps": minimum,
+            "max_traps": maximum,
+            "min_traps_at_least": min_at_least,
+            "max_traps_at_least": max_at_least,
+            "solves": solves,
+            "totalizer_clauses": len(totalizer.clauses),
+            "total_time": time.time() - start_time
+        }
+
     def solve(self):
         """Giải bài toán Thợ săn đá quý"""
         # Bắt đầu đo thời gian
         start_time = time.time()
 
-        # Tạo CNF bằng chiến lược đã chọn
-        cnf_clauses = self.cnf_strategy.generate_cnf()
+        # Chế độ auto: chọn cặp chiến lược + thuật toán có chi phí dự đoán thấp nhất
+        solver_algorithm = self.solver_algorithm
+        selection = None
+        if self.auto_cnf_strategy or solver_algorithm == self.AUTO:
+            selection = self.select_pipeline()
+            strategy_class = CNF_STRATEGIES.get(selection["cnf_strategy"])
+            if type(self.cnf_strategy) is not strategy_class:
+                self.cnf_strategy = strategy_class(self.grid)
+            solver_algorithm = selection["solver_algorithm"]
+            self.log(f"Auto selected {selection['cnf_strategy']} + {solver_algorithm} "
+                     f"(predicted {selection['predicted_cost']:.6f} seconds)")
+
+        # Chọn thuật toán giải CNF (module của thuật toán chỉ được import lúc này)
+        solver_class = SOLVERS.get(solver_algorithm)
+
+        memory_tracker = None
+        if self.track_memory:
+            from MemoryTracker import MemoryTracker
+            memory_tracker = MemoryTracker()
+            memory_tracker.start()
+        self.cnf_strategy.memory_tracker = memory_tracker
+
+        # Tạo CNF bằng chiến lược đã chọn (bộ giải làm việc trực tiếp trên lưới thì bỏ qua bước này)
+        if solver_class.requires_cnf and self.cnf_strategy.indexed:
+            # Chỉ mục được giữ qua các lần giải, các ô đã đổi được mã hóa lại ngay trong update_cell
+            cnf_clauses = self.cnf_strategy.current_clauses()
+        elif solver_class.requires_cnf:
+            if self.generation_workers:
+                cnf_clauses = self.cnf_strategy.generate_cnf(workers=self.generation_workers)
+            else:
+                cnf_clauses = self.cnf_strategy.generate_cnf()
+        else:
+            cnf_clauses = []
         generation_time = time.time() - start_time
 
-        print(f"Generated {len(cnf_clauses)} CNF clauses in {generation_time:.6f} seconds")
+        assumptions, native_bounds = (), None
+        if self.trap_bounds:
+            cnf_clauses, assumptions, native_bounds = self._apply_trap_bounds(solver_class, cnf_clauses)
+
+        self.log(f"Generated {len(cnf_clauses)} CNF clauses in {generation_time:.6f} seconds")
         clone_grid = self.grid.clone()
-        # Chọn thuật toán giải CNF
-        if self.solver_algorithm == self.BRUTE_FORCE:
-            solver = BruteForceSolver(cnf_clauses, self.rows, self.cols, clone_grid)
-        elif self.solver_algorithm == self.BACKTRACKING:
-            solver = BacktrackingSolver(cnf_clauses, self.rows, self.cols, clone_grid)
-        elif self.solver_algorithm == self.PYSAT:
-            solver = PySATSolver(cnf_clauses, self.rows, self.cols, clone_grid)
-        else:
-            raise ValueError(f"Unknown solver algorithm: {self.solver_algorithm}")
+        with memory_phase(memory_tracker, "solver_load"):
+            solver = solver_class(cnf_clauses, self.rows, self.cols, clone_grid, **self.solver_options)
+        solver.memory_tracker = memory_tracker
+        solver.quiet = self.quiet
+        solver.assumptions = assumptions
+        solver.trap_bounds = native_bounds
+        phases = self.phase_literals() if self.phase_hint is not None and solver_class.supports_phases else ()
+        solver.phases = phases
 
         # Giải CNF
         solving_start_time = time.time()
-        success, result_grid, solver_stats = solver.solve()
+        if solver.reports_memory_phases:
+            success, result_grid, solver_stats = solver.solve()
+        else:
+            with memory_phase(memory_tracker, "search"):
+                success, result_grid, solver_stats = solver.solve()
         solving_time = time.time() - solving_start_time
 
+        cold_stats = None
+        if phases and self.compare_cold_start:
+            # Giải lại cùng CNF với pha mặc định, chỉ để lấy bộ đếm so sánh (không tính vào thời gian giải)
+            cold_solver = solver_class(cnf_clauses, self.rows, self.cols, self.grid.clone(), **self.solver_options)
+            cold_solver.assumptions = assumptions
+            cold_solver.trap_bounds = native_bounds
+            with contextlib.redirect_stdout(io.StringIO()):
+                cold_start_time = time.time()
+                cold_stats = cold_solver.solve()[2] or {}
+                cold_stats["solving_time"] = time.time() - cold_start_time
+
         total_time = time.time() - start_time
 
         # Trả về kết quả
@@ -75,15 +317,198 @@ class GemHunterSolver:
             "success": success,
             "clauses": len(cnf_clauses),
             "cnf_strategy": self.cnf_strategy.__class__.__name__,
-            "solver_algorithm": self.solver_algorithm,
+            "solver_algorithm": solver_algorithm,
             "generation_time": generation_time,
             "solving_time": solving_time,
             "total_time": total_time,
             "result_grid": result_grid
         }
 
+        generation_stats = getattr(self.cnf_strategy, "generation_stats", None)
+        if solver_class.requires_cnf and generation_stats:
+            stats["generation_stats"] = generation_stats
+
+        if self.verify and success:
+            stats.update(self.verify_result(result_grid))
+
+        if memory_tracker:
+            memory_tracker.stop()
+            self.cnf_strategy.memory_tracker = None
+            stats.update(memory_tracker.stats(len(cnf_clauses), self.rows * self.cols))
+
+        if self.trap_bounds:
+            stats["trap_bounds"] = self.trap_bounds
+            if self._totalizer is not None and not native_bounds:
+                stats["totalizer_clauses"] = len(self._totalizer.clauses)
+
+        if phases:
+            stats["phase_hints"] = len(phases)
+
+        if selection:
+            stats["auto_pipeline"] = f"{selection['cnf_strategy']}+{selection['solver_algorithm']}"
+            stats["predicted_cost"] = selection["predicted_cost"]
+            stats["grid_features"] = selection["features"]
+
         # Thêm thông tin từ solver
         if solver_stats:
             stats.update(solver_stats)
 
-        return stats
\ No newline at end of file
+        if cold_stats is not None:
+            for key in ["decisions", "conflicts", "propagations", "backtracks", "solving_time"]:
+                if key in cold_stats:
+                    stats[f"cold_{key}"] = cold_stats[key]
+
+        if self.warm_start and success:
+            self.phase_hint = result_grid
+
+        return stats
+
+    def enumerate_solutions(self, limit=None, time_limit=None, solver_algorithm=None):
+        """Sinh lần lượt từng lưới kết quả từ một phiên PySAT tăng dần, không giữ lại các lời giải đã trả về.
+        Mệnh đề chặn chỉ chứa các ô '_' nằm cạnh một ô số (biên), nên các ô không bị ràng buộc giữ '_'
+        và không làm nhân bản lời giải. Dừng khi đủ limit lời giải hoặc hết time_limit giây;
+        số lời giải và tốc độ liệt kê được cập nhật liên tục trong self.enumeration_stats"""
+        start_time = time.time()
+        solver_algorithm = solver_algorithm or (self.PYSAT if self.solver_algorithm == self.AUTO
+                                                else self.solver_algorithm)
+        solver_class = SOLVERS.get(solver_algorithm)
+        if not hasattr(solver_class, "enumerate_solutions"):
+            raise ValueError(f"Solver algorithm {solver_algorithm} does not support enumeration")
+
+        clauses = list(self.cnf_strategy.generate_cnf()) if solver_class.requires_cnf else []
+        frontier = set()
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if isinstance(self.grid.grid[i][j], int):
+                    # Ô chứa số đã được mở nên chắc chắn không phải bẫy
+                    clauses.append([-self.cnf_strategy.position_to_variable(i, j)])
+                    frontier.update(self.cnf_strategy.position_to_variable(n_row, n_col)
+                                    for n_row, n_col in self.grid.get_neighbors(i, j)
+                                    if self.grid.grid[n_row][n_col] == "_")
+        assumptions, native_bounds = (), None
+        if self.trap_bounds:
+            # Lời giải chiếu lên biên được liệt kê nếu có ít nhất một cách gán phần còn lại thỏa cận
+            clauses, assumptions, native_bounds = self._apply_trap_bounds(solver_class, clauses)
+        generation_time = time.time() - start_time
+
+        self.enumeration_stats = {
+            "clauses": len(clauses),
+            "frontier_variables": len(frontier),
+            "cnf_strategy": self.cnf_strategy.__class__.__name__,
+            "solver_algorithm": solver_algorithm,
+            "generation_time": generation_time
+        }
+        solver = solver_class(clauses, self.rows, self.cols, self.grid.clone())
+        solver.quiet = self.quiet
+        solver.assumptions = assumptions
+        solver.trap_bounds = native_bounds
+        yield from solver.enumerate_solutions(frontier, limit, time_limit, self.enumeration_stats)
+        self.enumeration_stats["total_time"] = time.time() - start_time
+
+    def verify_result(self, result_grid):
+        """Kiểm tra lưới kết quả với lưới đầu vào, trả về thống kê kiểm tra"""
+        from SolutionValidator import SolutionValidator, format_error
+
+        start_time = time.time()
+        # Lưới gọn (CompactGrid) được kiểm tra qua khung nhìn list các hàng
+        result_grid = getattr(result_grid, "grid", result_grid)
+        errors = SolutionValidator().validate(result_grid, self.grid.grid)
+        if errors:
+            self.log(f"[Verify] Result grid violates {len(errors)} constraints, first: {format_error(errors[0])}")
+
+        return {
+            "verified": not errors,
+            "verification_errors": errors,
+            "verification_time": time.time() - start_time
+        }
+
+    def update_cell(self, i, j, value):
+        """Đổi giá trị một ô của lưới (mở số, cắm cờ) giữa các lần giải.
+        Lần đầu gọi sẽ dựng chỉ mục mệnh đề, sau đó chỉ các mệnh đề của ô bị đổi được mã hóa lại"""
+        return self.cnf_strategy.update_cell(i, j, value)
+
+    def select_pipeline(self, cost_model=None):
+        """Tính đặc trưng của lưới và chọn cặp chiến lược + thuật toán theo mô hình chi phí đã hiệu chỉnh.
+        Chỉ những phần được đặt là auto mới được chọn, phần còn lại giữ nguyên lựa chọn của người dùng"""
+        from GridFeatures import compute_grid_features
+        from PipelineCostModel import PipelineCostModel
+
+        if cost_model is None:
+            cost_model = PipelineCostModel.load()
+
+        features = compute_grid_features(self.grid)
+        strategies = None if self.auto_cnf_strategy else [self._strategy_name()]
+        if self.solver_algorithm != self.AUTO:
+            solvers = [self.solver_algorithm]
+        elif self.trap_bounds:
+            # Chỉ xét các thuật toán áp dụng được cận tổng số bẫy
+            solvers = [name for name in cost_model.AUTO_SOLVERS if self.supports_trap_bounds(SOLVERS.get(name))]
+        else:
+            solvers = None
+        strategy, solver_algorithm, cost, costs = cost_model.choose(features, strategies, solvers)
+
+        return {
+            "cnf_strategy": strategy,
+            "solver_algorithm": solver_algorithm,
+            "predicted_cost": cost,
+            "predicted_costs": {f"{name}+{solver}": value for (name, solver), value in costs.items()},
+            "features": features
+        }
+
+    def _strategy_name(self):
+        """Tên đăng ký của chiến lược CNF hiện tại"""
+        for name in CNF_STRATEGIES.names():
+            if CNF_STRATEGIES.get(name) is type(self.cnf_strategy):
+                return name
+        raise ValueError(f"Unknown CNF strategy: {self.cnf_strategy.__class__.__name__}")
+
+    def compile_board(self, cache_dir=None):
+        """Biên dịch ràng buộc của lưới thành BDD một lần để trả lời nhiều truy vấn (đếm lời giải, xác suất bẫy,
+        ô an toàn, giả định cắm cờ) mà không phải giải lại. Kết quả được giữ lại đến khi lưới đổi,
+        và được ghi / đọc trong cache_dir nếu có (xem KnowledgeCompiler)"""
+        from KnowledgeCompiler import board_key, load_or_compile
+
+        if self._compiled is None or self._compiled.key != board_key(self.grid):
+            self._compiled = load_or_compile(self.grid, cache_dir)
+        return self._compiled
+
+    def trap_probabilities(self):
+        """Tính xác suất mỗi ô '_' là bẫy trên toàn bộ các lời giải nhất quán bằng đếm mô hình chính xác"""
+        start_time = time.time()
+
+        clauses = list(self.cnf_strategy.generate_cnf())
+        # Ô chứa số đã được mở nên chắc chắn không phải bẫy
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if isinstance(self.grid.grid[i][j], int):
+                    clauses.append([-self.cnf_strategy.position_to_variable(i, j)])
+
+        from fractions import Fraction
+
+        from ModelCounter import ModelCounter
+
+        variables = range(1, self.rows * self.cols + 1)
+        counter = ModelCounter(clauses, variables)
+        model_count, true_counts = counter.count()
+
+        trap_counts = {}
+        probabilities = {}
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if self.grid.grid[i][j] == "_":
+                    count = true_counts.get(self.cnf_strategy.position_to_variable(i, j), 0)
+                    trap_counts[(i, j)] = count
+                    if model_count > 0:
+                        probabilities[(i, j)] = Fraction(count, model_count)
+
+        stats = {
+            "success": model_count > 0,
+            "model_count": model_count,
+            "trap_counts": trap_counts,
+            "trap_probabilities": probabilities,
+            "cnf_strategy": self.cnf_strategy.__class__.__name__,
+            "total_time": time.time() - start_time
+        }
+        stats.update(counter.stats)
+
+        return stats
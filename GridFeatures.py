@@ -0,0 +1,102 @@
+from math import comb
+
+from ClauseTemplates import get_template
+
+
+def predicted_clause_count(strategy, k, n):
+    """Số mệnh đề chiến lược sinh ra cho một ô số có k ô lân cận và giá trị n (chưa loại trùng)"""
+    if strategy == "truth_table_minimized":
+        # Số implicant sau rút gọn không có công thức đóng, lấy thẳng từ bảng mẫu (mỗi (k, n) chỉ tạo một lần)
+        return len(get_template(strategy, k, n))
+    if n == 0 or n == k:
+        return k
+    if n > k:
+        # Ràng buộc không thể thỏa mãn: chỉ còn các mệnh đề 'ít nhất'/bảng chân trị vô nghĩa
+        return 2 ** k if strategy == "truth_table" else 0
+    if strategy == "truth_table":
+        return 2 ** k - comb(k, n)
+    return comb(k, k - n + 1) + comb(k, n + 1)
+
+
+def compute_grid_features(grid):
+    """Tính nhanh các đặc trưng của lưới dùng để chọn chiến lược và thuật toán giải"""
+    rows, cols = grid.rows, grid.cols
+    cells = grid.grid
+
+    unknown_count = 0
+    numbered_count = 0
+    fixed_count = 0
+    max_neighbor_degree = 0
+    literals = {"cardinality": 0, "truth_table": 0, "truth_table_minimized": 0}
+    clauses = {"cardinality": 0, "truth_table": 0, "truth_table_minimized": 0}
+    # Tổng số ô lân cận của các ô số: kích thước ràng buộc đếm gốc
+    constraint_literals = 0
+    cnf_variables = set()
+
+    # Hợp nhất các ô chưa biết cùng nằm quanh một ô số để đếm thành phần liên thông
+    parent = {}
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for i in range(rows):
+        for j in range(cols):
+            cell = cells[i][j]
+            if cell == "_":
+                unknown_count += 1
+            elif cell in ("T", "G"):
+                fixed_count += 1
+                cnf_variables.add((i, j))
+                for strategy in clauses:
+                    clauses[strategy] += 1
+                    literals[strategy] += 1
+            elif isinstance(cell, int):
+                numbered_count += 1
+                neighbors = grid.get_neighbors(i, j)
+                k = len(neighbors)
+                cnf_variables.update(neighbors)
+                constraint_literals += k
+
+                for strategy in clauses:
+                    count = predicted_clause_count(strategy, k, cell)
+                    clauses[strategy] += count
+                    if strategy == "truth_table_minimized":
+                        literals[strategy] += sum(map(len, get_template(strategy, k, cell)))
+                    elif strategy == "truth_table" or cell == 0 or cell == k:
+                        literals[strategy] += count * (k if 0 < cell < k else 1)
+                    else:
+                        literals[strategy] += comb(k, k - cell + 1) * (k - cell + 1) + comb(k, cell + 1) * (cell + 1)
+
+                unknown_neighbors = [(r, c) for r, c in neighbors if cells[r][c] == "_"]
+                max_neighbor_degree = max(max_neighbor_degree, len(unknown_neighbors))
+                for neighbor in unknown_neighbors:
+                    parent.setdefault(neighbor, neighbor)
+                for neighbor in unknown_neighbors[1:]:
+                    root_a, root_b = find(unknown_neighbors[0]), find(neighbor)
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+
+    frontier_size = len(parent)
+    component_sizes = {}
+    for cell in parent:
+        root = find(cell)
+        component_sizes[root] = component_sizes.get(root, 0) + 1
+
+    return {
+        "rows": rows,
+        "cols": cols,
+        "unknown_count": unknown_count,
+        "numbered_count": numbered_count,
+        "fixed_count": fixed_count,
+        "frontier_size": frontier_size,
+        "component_count": len(component_sizes),
+        "max_component_size": max(component_sizes.values(), default=0),
+        "max_neighbor_degree": max_neighbor_degree,
+        "cnf_variables": len(cnf_variables),
+        "constraint_literals": constraint_literals,
+        "predicted_clauses": clauses,
+        "predicted_literals": literals
+    }
@@ -1,6 +1,27 @@
 from abc import ABC, abstractmethod
 
+from CompactGrid import GEM_CODE, MAX_NUMBER_CODE, TRAP_CODE, CompactGrid
+from MemoryTracker import memory_phase
+
 class ICNFSolver(ABC):
+    # Bộ giải có cần GemHunterSolver sinh CNF trước hay tự làm việc trực tiếp trên lưới
+    requires_cnf = True
+    # Bộ giải tự đo các giai đoạn nạp / tìm kiếm; nếu không, GemHunterSolver đo cả hàm solve là giai đoạn tìm kiếm
+    reports_memory_phases = False
+    # MemoryTracker do GemHunterSolver gán khi cần đo bộ nhớ
+    memory_tracker = None
+    # Bộ giải nhận literal giả định cho lần giải (GemHunterSolver gán vào assumptions)
+    supports_assumptions = False
+    assumptions = ()
+    # Bộ giải tự kiểm tra cận tổng số bẫy; trap_bounds là (lower, upper, các biến được đếm)
+    native_trap_bounds = False
+    trap_bounds = None
+    # Bộ giải dùng được gợi ý pha: phases là các literal nên thử trước (GemHunterSolver gán từ lời giải cũ)
+    supports_phases = False
+    phases = ()
+    # Tắt mọi thông báo của bộ giải (GemHunterSolver gán khi quiet, ví dụ lúc đo thời gian trong benchmark)
+    quiet = False
+
     def __init__(self, clauses, rows, cols, grid=None):
         self.clauses = clauses
         self.rows = rows
@@ -10,6 +31,11 @@ class ICNFSolver(ABC):
     def position_to_var(self, i, j):
         return i * self.cols + j + 1
 
+    def log(self, *values):
+        """In thông báo của bộ giải trừ khi quiet; các giá trị chỉ được chuyển thành chuỗi khi thực sự in"""
+        if not self.quiet:
+            print(*values)
+
     def var_to_position(self, var):
         var = abs(var) - 1
         i = var // self.cols
@@ -20,10 +46,20 @@ class ICNFSolver(ABC):
     def solve(self):
         pass
 
+    def memory_phase(self, name):
+        return memory_phase(self.memory_tracker, name)
+
     def create_result_grid(self, model):
+        with self.memory_phase("decode"):
+            return self._create_result_grid(model)
+
+    def _create_result_grid(self, model):
+        if isinstance(self.grid, CompactGrid):
+            return self._create_compact_result_grid(model)
+
         result_grid = [['_' for _ in range(self.cols)] for _ in range(self.rows)]
-        print("Original grid:", self.grid.grid)
-        print("Result grid:", result_grid)
+        self.log("Original grid:", self.grid.grid)
+        self.log("Result grid:", result_grid)
 
         for var in model:
             i, j = self.var_to_position(var)
@@ -46,4 +82,22 @@ class ICNFSolver(ABC):
                 if result_grid[i][j] == '_':
                     result_grid[i][j] = self.grid.grid[i][j]
 
-        return result_grid
\ No newline at end of file
+        return result_grid
+
+    def _create_compact_result_grid(self, model):
+        """Như _create_result_grid nhưng ghi thẳng mã ô vào bản sao bộ đệm của lưới gọn, trả về CompactGrid"""
+        cells = bytearray(self.grid.cells)
+        cell_count = len(cells)
+
+        for var in model:
+            index = abs(var) - 1
+            if index >= cell_count:
+                continue
+
+            if var > 0:
+                cells[index] = TRAP_CODE
+            elif cells[index] > MAX_NUMBER_CODE:
+                # Ô số giữ nguyên giá trị, các ô còn lại là đá quý
+                cells[index] = GEM_CODE
+
+        return CompactGrid(self.rows, self.cols, cells)
@@ -0,0 +1,425 @@
+import hashlib
+import json
+import os
+import sys
+import time
+from fractions import Fraction
+
+COMPILED_VERSION = 1
+
+# Hai nút hằng của BDD
+FALSE = 0
+TRUE = 1
+
+
+def board_key(grid):
+    """Mã băm SHA-256 của nội dung lưới, dùng làm khóa bộ nhớ đệm của dạng biên dịch"""
+    rows = grid.grid if hasattr(grid, "grid") else grid
+    return hashlib.sha256(json.dumps(rows, separators=(",", ":")).encode()).hexdigest()
+
+
+class _Builder:
+    """Bảng nút duy nhất (mỗi bộ (mức, con thấp, con cao) chỉ có một nút, nên BDD luôn ở dạng rút gọn)
+    và phép AND có ghi nhớ để dựng BDD có thứ tự (mức nhỏ ở gần gốc)"""
+
+    def __init__(self, level_count):
+        self.level_count = level_count
+        # Nút hằng nằm ở mức level_count (sau mọi biến)
+        self.levels = [level_count, level_count]
+        self.lows = [FALSE, TRUE]
+        self.highs = [FALSE, TRUE]
+        self.unique = {}
+
+    def make(self, level, low, high):
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.levels)
+            self.levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.unique[key] = node
+        return node
+
+    def conjoin(self, first, second):
+        memo = {}
+        levels, lows, highs = self.levels, self.lows, self.highs
+
+        def apply(a, b):
+            if a == FALSE or b == FALSE:
+                return FALSE
+            if a == TRUE:
+                return b
+            if b == TRUE or a == b:
+                return a
+            if a > b:
+                a, b = b, a
+            result = memo.get((a, b))
+            if result is not None:
+                return result
+
+            level_a, level_b = levels[a], levels[b]
+            level = min(level_a, level_b)
+            low_a, high_a = (lows[a], highs[a]) if level_a == level else (a, a)
+            low_b, high_b = (lows[b], highs[b]) if level_b == level else (b, b)
+            result = self.make(level, apply(low_a, low_b), apply(high_a, high_b))
+            memo[(a, b)] = result
+            return result
+
+        return apply(first, second)
+
+
+class CompiledBoard:
+    """Ràng buộc của một lưới đã biên dịch thành BDD có thứ tự (OBDD rút gọn).
+    Biến là mọi ô của lưới, xếp theo hàng (theo chiều dài hơn của lưới để chiều rộng của biên là cạnh hẹp);
+    ô số được coi là đã mở nên không phải bẫy, ô T / G giữ nguyên. Mọi truy vấn có điều kiện (evidence là
+    dict (i, j) -> True nếu giả định là bẫy) đều chạy một lượt qua các nút, tức tuyến tính theo kích thước BDD.
+    Nút được đánh số từ dưới lên: 0 / 1 là hai nút hằng, con luôn có chỉ số nhỏ hơn cha, gốc là nút cuối"""
+
+    def __init__(self, rows, cols, cells, levels, lows, highs, key=None, unknown=None):
+        self.rows = rows
+        self.cols = cols
+        # cells[level]: ô ứng với mức level
+        self.cells = cells
+        self.level_of = {cell: level for level, cell in enumerate(cells)}
+        self.levels = levels
+        self.lows = lows
+        self.highs = highs
+        self.key = key
+        # Các ô '_' của lưới gốc (các ô còn lại đã được cố định)
+        self.unknown = unknown if unknown is not None else list(cells)
+        self.stats = {}
+
+    @property
+    def root(self):
+        return len(self.levels) - 1
+
+    @property
+    def size(self):
+        """Số nút (kể cả hai nút hằng)"""
+        return len(self.levels)
+
+    @classmethod
+    def _from_builder(cls, builder, root, rows, cols, cells, key, unknown):
+        """Chỉ giữ các nút đến được từ gốc và đánh số lại từ dưới lên"""
+        reachable = set()
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node in reachable:
+                continue
+            reachable.add(node)
+            if node > TRUE:
+                stack.append(builder.lows[node])
+                stack.append(builder.highs[node])
+
+        inner = sorted((node for node in reachable if node > TRUE), key=lambda node: -builder.levels[node])
+        index = {FALSE: FALSE, TRUE: TRUE}
+        levels = [len(cells), len(cells)]
+        lows = [FALSE, TRUE]
+        highs = [FALSE, TRUE]
+        for node in inner:
+            index[node] = len(levels)
+            levels.append(builder.levels[node])
+            lows.append(index[builder.lows[node]])
+            highs.append(index[builder.highs[node]])
+        if root <= TRUE:
+            # Gốc là nút hằng: thêm một bản sao ở cuối để gốc luôn là nút cuối cùng
+            levels.append(len(cells))
+            lows.append(root)
+            highs.append(root)
+        return cls(rows, cols, cells, levels, lows, highs, key, unknown)
+
+    def _evidence_levels(self, evidence):
+        return {self.level_of[cell]: bool(value) for cell, value in (evidence or {}).items()}
+
+    def _root_node(self):
+        # Gốc là bản sao của nút hằng (BDD hằng) thì dùng chính nút hằng đó
+        root = self.root
+        return self.lows[root] if self.levels[root] == len(self.cells) and root > TRUE else root
+
+    def _free_prefix(self, evidence):
+        """free[level]: số mức tự do (không có trong evidence) đứng trước level"""
+        free = [0] * (len(self.cells) + 1)
+        for level in range(len(self.cells)):
+            free[level + 1] = free[level] + (level not in evidence)
+        return free
+
+    def _up_counts(self, evidence, free):
+        """up[node]: số phép gán các mức từ mức của nút trở xuống đi từ nút tới nút TRUE"""
+        levels, lows, highs = self.levels, self.lows, self.highs
+        up = [0] * len(levels)
+        up[TRUE] = 1
+        for node in range(2, len(levels)):
+            level = levels[node]
+            if level == len(self.cells):
+                up[node] = up[lows[node]]
+                continue
+            value = evidence.get(level)
+            count = 0
+            if value is not True:
+                low = lows[node]
+                count += up[low] << (free[levels[low]] - free[level + 1])
+            if value is not False:
+                high = highs[node]
+                count += up[high] << (free[levels[high]] - free[level + 1])
+            up[node] = count
+        return up
+
+    def model_count(self, evidence=None):
+        """Số lời giải (trên mọi ô) thỏa các giả định"""
+        evidence = self._evidence_levels(evidence)
+        free = self._free_prefix(evidence)
+        root = self._root_node()
+        return self._up_counts(evidence, free)[root] << free[self.levels[root]]
+
+    def is_consistent(self, evidence=None):
+        """Các giả định có cùng thỏa được với lưới không"""
+        evidence = self._evidence_levels(evidence)
+        levels, lows, highs = self.levels, self.lows, self.highs
+        reaches = [False] * len(levels)
+        reaches[TRUE] = True
+        for node in range(2, len(levels)):
+            value = evidence.get(levels[node])
+            reaches[node] = (value is not True and reaches[lows[node]]) or \
+                            (value is not False and reaches[highs[node]])
+        return reaches[self._root_node()]
+
+    def trap_counts(self, evidence=None):
+        """Trả về (số lời giải, {ô: số lời giải có ô đó là bẫy}) thỏa các giả định,
+        bằng một lượt từ dưới lên (số đường tới TRUE) và một lượt từ trên xuống (số đường từ gốc)"""
+        evidence = self._evidence_levels(evidence)
+        level_count = len(self.cells)
+        free = self._free_prefix(evidence)
+        up = self._up_counts(evidence, free)
+        levels, lows, highs = self.levels, self.lows, self.highs
+        root = self._root_node()
+        total = up[root] << free[levels[root]]
+
+        true_counts = [0] * (level_count + 1)
+        # Mảng hiệu: các mức bị bỏ qua trên một cạnh là tự do, đúng bằng nửa số lời giải đi qua cạnh đó
+        skipped = [0] * (level_count + 1)
+
+        def skip(start, end, models):
+            if free[end] - free[start] > 0:
+                skipped[start] += models // 2
+                skipped[end] -= models // 2
+
+        down = [0] * len(levels)
+        down[root] = 1 << free[levels[root]]
+        skip(0, levels[root], total)
+        for node in range(root, 1, -1):
+            if down[node] == 0 or levels[node] == level_count:
+                continue
+            level = levels[node]
+            value = evidence.get(level)
+            for child, is_trap in ((lows[node], False), (highs[node], True)):
+                if value is not None and value != is_trap:
+                    continue
+                paths = down[node] << (free[levels[child]] - free[level + 1])
+                down[child] += paths
+                models = paths * up[child]
+                if is_trap:
+                    true_counts[level] += models
+                skip(level + 1, levels[child], models)
+
+        running = 0
+        counts = {}
+        for level, cell in enumerate(self.cells):
+            running += skipped[level]
+            value = evidence.get(level)
+            counts[cell] = (total if value else 0) if value is not None else true_counts[level] + running
+        return total, counts
+
+    def trap_probabilities(self, evidence=None):
+        """Xác suất mỗi ô '_' là bẫy trên các lời giải thỏa các giả định (rỗng nếu không còn lời giải)"""
+        total, counts = self.trap_counts(evidence)
+        if total == 0:
+            return {}
+        return {cell: Fraction(counts[cell], total) for cell in self.unknown}
+
+    def safe_cells(self, evidence=None):
+        """Các ô '_' chắc chắn không phải bẫy với các giả định đã cho"""
+        total, counts = self.trap_counts(evidence)
+        return [cell for cell in self.unknown if total > 0 and counts[cell] == 0 and cell not in (evidence or {})]
+
+    def condition(self, evidence):
+        """BDD mới với các giả định được cố định vĩnh viễn (ví dụ cờ đã cắm): chép BDD vào bộ dựng
+        rồi AND với literal của từng giả định, mỗi phép AND tuyến tính theo kích thước BDD"""
+        evidence = self._evidence_levels(evidence)
+        builder = _Builder(len(self.cells))
+        mapped = [FALSE, TRUE]
+        for node in range(2, len(self.levels)):
+            if self.levels[node] == len(self.cells):
+                mapped.append(mapped[self.lows[node]])
+            else:
+                mapped.append(builder.make(self.levels[node], mapped[self.lows[node]], mapped[self.highs[node]]))
+
+        root = mapped[-1]
+        for level, value in sorted(evidence.items(), reverse=True):
+            root = builder.conjoin(root, builder.make(level, FALSE, TRUE) if value else builder.make(level, TRUE, FALSE))
+        # Ô bị cố định không còn là ô '_'
+        unknown = [cell for cell in self.unknown if self.level_of[cell] not in evidence]
+        return CompiledBoard._from_builder(builder, root, self.rows, self.cols, self.cells, None, unknown)
+
+    def to_dict(self):
+        return {
+            "version": COMPILED_VERSION,
+            "key": self.key,
+            "rows": self.rows,
+            "cols": self.cols,
+            "cells": self.cells,
+            "unknown": self.unknown,
+            "levels": self.levels,
+            "lows": self.lows,
+            "highs": self.highs
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get("version") != COMPILED_VERSION:
+            raise ValueError(f"Unsupported compiled board version: {data.get('version')}")
+        return cls(data["rows"], data["cols"], [tuple(cell) for cell in data["cells"]], data["levels"],
+                   data["lows"], data["highs"], data["key"], [tuple(cell) for cell in data["unknown"]])
+
+    def save(self, path):
+        """Ghi nguyên tử ra file JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, 'w') as file:
+            json.dump(self.to_dict(), file, separators=(",", ":"))
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as file:
+            return cls.from_dict(json.load(file))
+
+
+def compile_board(grid):
+    """Biên dịch các ràng buộc của lưới thành BDD. Thứ tự biến đi theo hàng của chiều dài hơn để biên là cạnh hẹp.
+    Dựng từ trên xuống như quy hoạch động theo biên: trạng thái ở mỗi mức là số bẫy còn thiếu của các ô số
+    đã có một phần lân cận được gán, hai tiền tố có cùng trạng thái dùng chung một nút con.
+    Nút được tạo qua bảng nút duy nhất từ dưới lên nên kết quả là OBDD rút gọn, không có nút trung gian thừa"""
+    start_time = time.time()
+    rows = grid.grid if hasattr(grid, "grid") else grid
+    row_count = len(rows)
+    col_count = len(rows[0]) if rows else 0
+
+    transposed = col_count > row_count
+    if transposed:
+        cells = [(i, j) for j in range(col_count) for i in range(row_count)]
+    else:
+        cells = [(i, j) for i in range(row_count) for j in range(col_count)]
+    level_of = {cell: level for level, cell in enumerate(cells)}
+    level_count = len(cells)
+
+    print(f"[Compiler] Compiling {row_count}x{col_count} grid into an ordered BDD "
+          f"({'column' if transposed else 'row'}-major order)...")
+
+    # Ràng buộc của từng ô số: giá trị và các mức lân cận (tăng dần)
+    values = []
+    neighbor_levels = []
+    # fixed[level]: giá trị bắt buộc của ô (ô số và G không phải bẫy, T là bẫy)
+    fixed = [None] * level_count
+    satisfiable = True
+    for level, (i, j) in enumerate(cells):
+        value = rows[i][j]
+        if isinstance(value, int):
+            fixed[level] = 0
+            neighbors = sorted(level_of[(i + d_row, j + d_col)] for d_row in (-1, 0, 1) for d_col in (-1, 0, 1)
+                               if (d_row or d_col) and 0 <= i + d_row < row_count and 0 <= j + d_col < col_count)
+            if value > len(neighbors):
+                satisfiable = False
+            elif neighbors:
+                values.append(value)
+                neighbor_levels.append(neighbors)
+        elif value in ("T", "G"):
+            fixed[level] = 1 if value == "T" else 0
+
+    # Kế hoạch chuyển trạng thái của từng mức: trạng thái trước mức là bộ số bẫy còn thiếu của các ô số đang mở
+    entering = [[] for _ in range(level_count)]
+    for number, neighbors in enumerate(neighbor_levels):
+        entering[neighbors[0]].append(number)
+    plans = []
+    active = []
+    for level in range(level_count):
+        working = active + entering[level]
+        # Chỉ các ô số có lân cận ở mức này mới đổi số bẫy còn thiếu hoặc số lân cận chưa gán (giới hạn trên của nó)
+        containing = [(position, sum(neighbor > level for neighbor in neighbor_levels[number]))
+                      for position, number in enumerate(working) if level in neighbor_levels[number]]
+        keep = [position for position, number in enumerate(working) if neighbor_levels[number][-1] > level]
+        plans.append(([values[number] for number in entering[level]], containing, keep))
+        active = [working[position] for position in keep]
+
+    builder = _Builder(level_count)
+    memo = {}
+
+    def build(level, state):
+        if level == level_count:
+            return TRUE
+        key = (level, state)
+        node = memo.get(key)
+        if node is not None:
+            return node
+
+        new_values, containing, keep = plans[level]
+        children = []
+        for is_trap in (0, 1):
+            if fixed[level] is not None and fixed[level] != is_trap:
+                children.append(FALSE)
+                continue
+            residual = list(state) + new_values
+            feasible = True
+            for position, limit in containing:
+                count = residual[position] - is_trap
+                if count < 0 or count > limit:
+                    feasible = False
+                    break
+                residual[position] = count
+            children.append(build(level + 1, tuple(residual[position] for position in keep)) if feasible else FALSE)
+
+        node = builder.make(level, children[0], children[1])
+        memo[key] = node
+        return node
+
+    old_limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(old_limit, 2 * level_count + 1000))
+    try:
+        root = build(0, ()) if satisfiable else FALSE
+    finally:
+        sys.setrecursionlimit(old_limit)
+
+    unknown = [cell for cell in sorted(cells) if rows[cell[0]][cell[1]] == "_"]
+    board = CompiledBoard._from_builder(builder, root, row_count, col_count, cells, board_key(rows), unknown)
+    board.stats = {
+        "bdd_nodes": board.size,
+        "frontier_states": len(memo),
+        "compilation_time": time.time() - start_time
+    }
+    print(f"[Compiler] Compiled into {board.size:,} nodes ({len(memo):,} frontier states) "
+          f"in {board.stats['compilation_time']:.6f} seconds")
+    return board
+
+
+def load_or_compile(grid, cache_dir=None):
+    """Dạng biên dịch của lưới, đọc từ cache_dir nếu đã có (tên file là mã băm của lưới)"""
+    key = board_key(grid)
+    path = os.path.join(cache_dir, f"{key}.bdd.json") if cache_dir else None
+    if path and os.path.exists(path):
+        try:
+            board = CompiledBoard.load(path)
+            if board.key == key:
+                print(f"[Compiler] Loaded compiled board from {path} ({board.size:,} nodes)")
+                return board
+        except (ValueError, KeyError, json.JSONDecodeError) as e:
+            print(f"[Compiler] Ignoring compiled board {path}: {e}")
+
+    board = compile_board(grid)
+    if path:
+        board.save(path)
+    return board
@@ -0,0 +1,330 @@
+import random
+import time
+
+from ICNFSolver import ICNFSolver
+
+# Số lần lật giữa hai lần đọc đồng hồ để kiểm tra time_limit
+TIME_CHECK_INTERVAL = 1024
+
+
+class LocalSearchSolver(ICNFSolver):
+    """Tìm kiếm cục bộ ngẫu nhiên trên CNF: probSAT (chọn biến theo xác suất (1 + break)^-cb)
+    hoặc WalkSAT/SKC (ưu tiên biến không phá mệnh đề nào, nếu không thì đi ngẫu nhiên với xác suất noise).
+    Số mệnh đề bị phá (break) của từng biến được cập nhật tăng dần sau mỗi lần lật, các mệnh đề chưa thỏa
+    nằm trong một danh sách kèm vị trí nên thêm / bớt trong O(1).
+    Không đầy đủ: chỉ tìm được lời giải chứ không chứng minh được vô nghiệm, nên hợp với các lưới chắc chắn
+    có nghiệm (ví dụ lưới sinh bởi PuzzleGenerator). Ô số được coi là đã mở nên không phải bẫy"""
+
+    def __init__(self, clauses, rows, cols, grid=None, algorithm="probsat", noise=0.5, cb=2.5,
+                 max_flips=None, max_restarts=10, time_limit=None, seed=None):
+        super().__init__(clauses, rows, cols, grid)
+        if algorithm not in ("probsat", "walksat"):
+            raise ValueError(f"Unknown local search algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.noise = noise
+        self.cb = cb
+        self.max_flips = max_flips
+        self.max_restarts = max_restarts
+        self.time_limit = time_limit
+        self.random = random.Random(seed)
+        # probSAT: bảng (1 + break)^-cb, break lớn hơn bảng thì dùng phần tử cuối
+        self.break_weights = [(1 + count) ** -cb for count in range(64)]
+
+    def pick(self, candidates, breaks):
+        """Chọn biến cần lật trong các ứng viên của một ràng buộc chưa thỏa, theo số ràng buộc mà mỗi biến phá"""
+        if self.algorithm == "probsat":
+            weights = self.break_weights
+            last = len(weights) - 1
+            return self.random.choices(candidates, [weights[min(count, last)] for count in breaks])[0]
+
+        best = min(breaks)
+        if best > 0 and self.random.random() < self.noise:
+            return self.random.choice(candidates)
+        return self.random.choice([var for var, count in zip(candidates, breaks) if count == best])
+
+    def flip_budget(self, variable_count):
+        return self.max_flips or max(100000, 100 * variable_count)
+
+    def _simplify(self):
+        """Cố định biến của ô số là không phải bẫy và lan truyền mệnh đề đơn.
+        Trả về (các mệnh đề còn lại, dict biến -> giá trị cố định), hoặc None nếu gặp mâu thuẫn"""
+        fixed = {}
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if isinstance(self.grid.grid[i][j], int):
+                    fixed[self.position_to_var(i, j)] = False
+
+        clauses = self.clauses
+        while True:
+            remaining = []
+            units = {}
+            for clause in clauses:
+                literals = []
+                for lit in clause:
+                    value = fixed.get(abs(lit))
+                    if value is None:
+                        literals.append(lit)
+                    elif value == (lit > 0):
+                        break
+                else:
+                    if not literals:
+                        return None
+                    if len(literals) == 1:
+                        lit = literals[0]
+                        if units.setdefault(abs(lit), lit > 0) != (lit > 0):
+                            return None
+                    else:
+                        # Literal lặp lại sẽ làm sai bộ đếm literal đúng của mệnh đề
+                        remaining.append(list(dict.fromkeys(literals)))
+            if not units:
+                return remaining, fixed
+            fixed.update(units)
+            clauses = remaining
+
+    def solve(self):
+        start_time = time.time()
+        simplified = self._simplify()
+        if simplified is None:
+            self.log("[Local Search] The formula is unsatisfiable after fixing numbered cells and unit clauses")
+            return False, None, {"solving_time": time.time() - start_time, "flips": 0}
+
+        clauses, fixed = simplified
+        variables = sorted({abs(lit) for clause in clauses for lit in clause})
+        self.log(f"[Local Search] Solving with {self.algorithm} on {len(variables)} variables and {len(clauses)} clauses "
+                 f"({len(fixed)} fixed)...")
+
+        success, value, stats = self._search(clauses, variables, start_time)
+        solving_time = time.time() - start_time
+        stats["solving_time"] = solving_time
+        stats["flips_per_second"] = stats["flips"] / solving_time if solving_time > 0 else 0.0
+
+        if not success:
+            self.log(f"[Local Search] No solution found after {stats['flips']:,} flips and {stats['restarts']} restarts "
+                     f"(best {stats['min_unsat']} unsatisfied clauses); local search cannot prove unsatisfiability")
+            self.log(f"[Local Search] Solving time: {solving_time:.6f} seconds")
+            return False, None, stats
+
+        self.log(f"[Local Search] Found a solution after {stats['flips']:,} flips "
+                 f"({stats['flips_per_second']:,.0f} flips/second, {stats['restarts']} restarts)")
+        self.log(f"[Local Search] Solving time: {solving_time:.6f} seconds")
+
+        model = []
+        for var in range(1, self.rows * self.cols + 1):
+            is_trap = fixed[var] if var in fixed else var < len(value) and value[var]
+            model.append(var if is_trap else -var)
+        return True, self.create_result_grid(model), stats
+
+    def _search(self, clauses, variables, start_time):
+        """Vòng lặp chính, mỗi lần khởi động lại bắt đầu từ một phép gán ngẫu nhiên mới"""
+        size = (variables[-1] if variables else 0) + 1
+        positive = [[] for _ in range(size)]
+        negative = [[] for _ in range(size)]
+        for index, clause in enumerate(clauses):
+            for lit in clause:
+                (positive if lit > 0 else negative)[abs(lit)].append(index)
+
+        clause_count = len(clauses)
+        max_flips = self.flip_budget(len(variables))
+        deadline = start_time + self.time_limit if self.time_limit else None
+        randrange = self.random.randrange
+        stats = {"flips": 0, "restarts": 0, "min_unsat": clause_count, "algorithm": self.algorithm}
+
+        value = bytearray(size)
+        for restart in range(self.max_restarts + 1):
+            stats["restarts"] = restart
+            for var in variables:
+                value[var] = self.random.getrandbits(1)
+
+            # true_count: số literal đúng; critical: XOR các biến có literal đúng, bằng đúng biến đó khi chỉ còn một
+            true_count = [0] * clause_count
+            critical = [0] * clause_count
+            break_count = [0] * size
+            unsat = []
+            position = [-1] * clause_count
+            for index, clause in enumerate(clauses):
+                for lit in clause:
+                    if value[abs(lit)] == (lit > 0):
+                        true_count[index] += 1
+                        critical[index] ^= abs(lit)
+                if true_count[index] == 0:
+                    position[index] = len(unsat)
+                    unsat.append(index)
+                elif true_count[index] == 1:
+                    break_count[critical[index]] += 1
+
+            for flip in range(max_flips):
+                if len(unsat) < stats["min_unsat"]:
+                    stats["min_unsat"] = len(unsat)
+                if not unsat:
+                    stats["flips"] += flip
+                    return True, value, stats
+                if deadline and flip % TIME_CHECK_INTERVAL == 0 and time.time() > deadline:
+                    stats["flips"] += flip
+                    stats["timed_out"] = True
+                    return False, value, stats
+
+                candidates = [abs(lit) for lit in clauses[unsat[randrange(len(unsat))]]]
+                var = self.pick(candidates, [break_count[candidate] for candidate in candidates])
+
+                new_value = value[var] ^ 1
+                value[var] = new_value
+                if new_value:
+                    became_true, became_false = positive[var], negative[var]
+                else:
+                    became_true, became_false = negative[var], positive[var]
+
+                for index in became_true:
+                    count = true_count[index]
+                    true_count[index] = count + 1
+                    if count == 0:
+                        # Bỏ khỏi danh sách chưa thỏa: đưa phần tử cuối vào chỗ trống
+                        last = unsat.pop()
+                        if last != index:
+                            unsat[position[index]] = last
+                            position[last] = position[index]
+                        position[index] = -1
+                        break_count[var] += 1
+                    elif count == 1:
+                        break_count[critical[index]] -= 1
+                    critical[index] ^= var
+
+                for index in became_false:
+                    count = true_count[index] - 1
+                    true_count[index] = count
+                    critical[index] ^= var
+                    if count == 0:
+                        position[index] = len(unsat)
+                        unsat.append(index)
+                        break_count[var] -= 1
+                    elif count == 1:
+                        break_count[critical[index]] += 1
+
+            stats["flips"] += max_flips
+
+        return False, value, stats
+
+
+class NativeLocalSearchSolver(LocalSearchSolver):
+    """Tìm kiếm cục bộ trực tiếp trên lưới, không cần CNF: ràng buộc là "số bẫy quanh ô số bằng đúng giá trị của nó".
+    Mỗi bước chọn ngẫu nhiên một ô số bị vi phạm, ứng viên là các ô lân cận mà lật sẽ đưa số bẫy về gần giá trị đó;
+    break của ứng viên là số ô số đang thỏa xung quanh nó bị lật làm vi phạm (tính tại chỗ, mỗi ô có tối đa 8 ô số).
+    Chỉ các ô '_' cạnh một ô số là biến; ô '_' khác là đá quý, ô T / G giữ nguyên"""
+
+    requires_cnf = False
+
+    def solve(self):
+        start_time = time.time()
+        cells = self.grid.grid
+        cell_index = {}
+        variables = []
+        targets = []
+        neighbors_of = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if not isinstance(cells[i][j], int):
+                    continue
+                free = []
+                target = cells[i][j]
+                for n_row, n_col in self.grid.get_neighbors(i, j):
+                    cell = cells[n_row][n_col]
+                    if cell == "T":
+                        target -= 1
+                    elif cell == "_":
+                        if (n_row, n_col) not in cell_index:
+                            cell_index[(n_row, n_col)] = len(variables)
+                            variables.append((n_row, n_col))
+                        free.append(cell_index[(n_row, n_col)])
+                if target < 0 or target > len(free):
+                    self.log(f"[Local Search] Numbered cell ({i}, {j}) cannot be satisfied")
+                    return False, None, {"solving_time": time.time() - start_time, "flips": 0}
+                targets.append(target)
+                neighbors_of.append(free)
+
+        numbers_of = [[] for _ in variables]
+        for number, free in enumerate(neighbors_of):
+            for var in free:
+                numbers_of[var].append(number)
+
+        self.log(f"[Local Search] Solving natively with {self.algorithm} on {len(variables)} cells "
+                 f"and {len(targets)} numbered cells...")
+
+        success, value, stats = self._search_native(variables, targets, neighbors_of, numbers_of, start_time)
+        solving_time = time.time() - start_time
+        stats["solving_time"] = solving_time
+        stats["flips_per_second"] = stats["flips"] / solving_time if solving_time > 0 else 0.0
+
+        if not success:
+            self.log(f"[Local Search] No solution found after {stats['flips']:,} flips and {stats['restarts']} restarts "
+                     f"(best {stats['min_unsat']} violated numbered cells); local search cannot prove unsatisfiability")
+            self.log(f"[Local Search] Solving time: {solving_time:.6f} seconds")
+            return False, None, stats
+
+        self.log(f"[Local Search] Found a solution after {stats['flips']:,} flips "
+                 f"({stats['flips_per_second']:,.0f} flips/second, {stats['restarts']} restarts)")
+        self.log(f"[Local Search] Solving time: {solving_time:.6f} seconds")
+
+        traps = {variables[var] for var in range(len(variables)) if value[var]}
+        model = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                var = self.position_to_var(i, j)
+                model.append(var if cells[i][j] == "T" or (i, j) in traps else -var)
+        return True, self.create_result_grid(model), stats
+
+    def _search_native(self, variables, targets, neighbors_of, numbers_of, start_time):
+        number_count = len(targets)
+        max_flips = self.flip_budget(len(variables))
+        deadline = start_time + self.time_limit if self.time_limit else None
+        randrange = self.random.randrange
+        stats = {"flips": 0, "restarts": 0, "min_unsat": number_count, "algorithm": self.algorithm}
+
+        value = bytearray(len(variables))
+        for restart in range(self.max_restarts + 1):
+            stats["restarts"] = restart
+            for var in range(len(variables)):
+                value[var] = self.random.getrandbits(1)
+
+            counts = [sum(value[var] for var in free) for free in neighbors_of]
+            violated = []
+            position = [-1] * number_count
+            for number in range(number_count):
+                if counts[number] != targets[number]:
+                    position[number] = len(violated)
+                    violated.append(number)
+
+            for flip in range(max_flips):
+                if len(violated) < stats["min_unsat"]:
+                    stats["min_unsat"] = len(violated)
+                if not violated:
+                    stats["flips"] += flip
+                    return True, value, stats
+                if deadline and flip % TIME_CHECK_INTERVAL == 0 and time.time() > deadline:
+                    stats["flips"] += flip
+                    stats["timed_out"] = True
+                    return False, value, stats
+
+                number = violated[randrange(len(violated))]
+                # Thừa bẫy thì chỉ lật bẫy thành đá quý, thiếu bẫy thì ngược lại
+                wanted = 1 if counts[number] > targets[number] else 0
+                candidates = [var for var in neighbors_of[number] if value[var] == wanted]
+                breaks = [sum(counts[other] == targets[other] for other in numbers_of[var]) for var in candidates]
+                var = self.pick(candidates, breaks)
+
+                delta = -1 if value[var] else 1
+                value[var] ^= 1
+                for other in numbers_of[var]:
+                    was_satisfied = counts[other] == targets[other]
+                    counts[other] += delta
+                    if was_satisfied:
+                        position[other] = len(violated)
+                        violated.append(other)
+                    elif counts[other] == targets[other]:
+                        last = violated.pop()
+                        if last != other:
+                            violated[position[other]] = last
+                            position[last] = position[other]
+                        position[other] = -1
+
+            stats["flips"] += max_flips
+
+        return False, value, stats
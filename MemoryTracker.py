@@ -0,0 +1,163 @@
+import os
+import sys
+from contextlib import contextmanager, nullcontext
+
+
+def peak_rss_bytes():
+    """Đỉnh RSS của tiến trình từ lúc khởi động (byte), None nếu hệ điều hành không hỗ trợ"""
+    try:
+        import resource
+    except ImportError:
+        # Windows không có module resource, chỉ đo được bằng tracemalloc
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KB, macOS trả về byte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes():
+    """RSS hiện tại của tiến trình (byte) đọc từ /proc/self/statm, None nếu không có /proc (macOS, Windows)"""
+    try:
+        with open("/proc/self/statm") as file:
+            resident_pages = int(file.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def read_rss_high_water_mark():
+    """Đỉnh RSS kể từ lần đặt lại gần nhất (VmHWM trong /proc/self/status, byte), None nếu không đọc được"""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def reset_rss_high_water_mark():
+    """Đặt lại VmHWM về RSS hiện tại (ghi 5 vào /proc/self/clear_refs, Linux 4.0+).
+    Trả về False nếu hệ điều hành không hỗ trợ: khi đó không đo được đỉnh RSS của từng giai đoạn"""
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+    except OSError:
+        return False
+    return True
+
+
+class MemoryTracker:
+    """Đo bộ nhớ theo từng giai đoạn (sinh CNF, loại trùng, nạp bộ giải, tìm kiếm, dựng kết quả).
+    tracemalloc chỉ thấy bộ nhớ do Python cấp phát, còn RSS bao gồm cả phần của thư viện C như PySAT.
+    Trên Linux, đỉnh RSS của từng giai đoạn (rss_peak) đo bằng cách đặt lại VmHWM khi bắt đầu giai đoạn;
+    nơi khác chỉ có mức tăng RSS hiện tại giữa lúc bắt đầu và lúc kết thúc (rss_delta, có thể âm, cũng có trên Linux).
+    Các giai đoạn có thể lồng nhau: đỉnh của giai đoạn con cũng được tính vào giai đoạn cha"""
+
+    def __init__(self):
+        self.phases = {}
+        self._stack = []
+        self._rss_stack = []
+        self._started_tracing = False
+
+    def start(self):
+        # tracemalloc kéo theo nhiều module, chỉ import khi thực sự đo bộ nhớ
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+
+    def stop(self):
+        import tracemalloc
+
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    @contextmanager
+    def phase(self, name):
+        """Đo một giai đoạn: đỉnh bộ nhớ Python vượt trên mức lúc bắt đầu, đỉnh RSS trong giai đoạn
+        (nếu hệ điều hành cho đặt lại VmHWM) và mức tăng RSS hiện tại"""
+        import tracemalloc
+
+        if not tracemalloc.is_tracing():
+            self.start()
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._stack:
+            # Giữ lại đỉnh của giai đoạn cha trước khi giai đoạn con đặt lại bộ đếm
+            self._stack[-1] = max(self._stack[-1], peak)
+        tracemalloc.reset_peak()
+        self._stack.append(0)
+        start_current = current
+        start_rss = current_rss_bytes()
+        # Như tracemalloc: giữ lại đỉnh RSS của giai đoạn cha trước khi giai đoạn con đặt lại VmHWM
+        if self._rss_stack and self._rss_stack[-1] is not None:
+            self._rss_stack[-1] = max(self._rss_stack[-1], read_rss_high_water_mark() or 0)
+        self._rss_stack.append(0 if reset_rss_high_water_mark() else None)
+
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            peak = max(self._stack.pop(), peak)
+            if self._stack:
+                self._stack[-1] = max(self._stack[-1], peak)
+            tracemalloc.reset_peak()
+
+            # Giai đoạn cùng tên được đo nhiều lần (ví dụ nạp bộ giải ở hàm khởi tạo và trong solve) thì gộp lại
+            end_rss = current_rss_bytes()
+            rss_delta = end_rss - start_rss if start_rss is not None and end_rss is not None else None
+            rss_peak = self._rss_stack.pop()
+            if rss_peak is not None:
+                high_water_mark = read_rss_high_water_mark()
+                rss_peak = max(rss_peak, high_water_mark) if high_water_mark is not None else None
+            if self._rss_stack and self._rss_stack[-1] is not None and rss_peak is not None:
+                self._rss_stack[-1] = max(self._rss_stack[-1], rss_peak)
+                reset_rss_high_water_mark()
+
+            previous = self.phases.get(name, {"peak": 0, "retained": 0, "rss_delta": None, "rss_peak": None})
+            if previous["rss_delta"] is not None and rss_delta is not None:
+                rss_delta += previous["rss_delta"]
+            if previous["rss_peak"] is not None and rss_peak is not None:
+                rss_peak = max(rss_peak, previous["rss_peak"])
+            self.phases[name] = {
+                "peak": max(previous["peak"], peak - start_current),
+                "retained": previous["retained"] + current - start_current,
+                "rss_delta": rss_delta,
+                "rss_peak": rss_peak
+            }
+
+    def stats(self, clauses=None, variables=None):
+        """Chuyển kết quả đo thành các khóa phẳng để gộp vào dict thống kê của bộ giải"""
+        stats = {}
+        for name, phase in self.phases.items():
+            stats[f"{name}_memory_peak"] = phase["peak"]
+            stats[f"{name}_memory_retained"] = phase["retained"]
+            stats[f"{name}_rss_delta"] = phase["rss_delta"]
+            if phase["rss_peak"] is not None:
+                stats[f"{name}_rss_peak"] = phase["rss_peak"]
+
+        if self.phases:
+            stats["memory_peak"] = max(phase["peak"] for phase in self.phases.values())
+            # Đặt lại VmHWM cũng hạ ru_maxrss trên Linux, nên lấy thêm đỉnh của các giai đoạn
+            peaks = [peak_rss_bytes() or 0] + [phase["rss_peak"] or 0 for phase in self.phases.values()]
+            stats["rss_peak"] = max(peaks) or None
+
+        # Bộ nhớ còn giữ sau khi sinh CNF chính là bộ nhớ của danh sách mệnh đề
+        encoding = self.phases.get("encoding")
+        if encoding and clauses:
+            retained = encoding["retained"] + self.phases.get("dedup", {}).get("retained", 0)
+            stats["bytes_per_clause"] = retained / clauses
+        if self.phases and variables:
+            stats["bytes_per_variable"] = stats["memory_peak"] / variables
+
+        return stats
+
+
+def memory_phase(tracker, name):
+    """Ngữ cảnh đo giai đoạn name, không làm gì nếu không theo dõi bộ nhớ"""
+    return tracker.phase(name) if tracker is not None else nullcontext()
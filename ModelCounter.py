@@ -0,0 +1,163 @@
+import sys
+import time
+
+
+class ModelCounter:
+    """Đếm chính xác số mô hình của CNF (#SAT) và số mô hình trong đó mỗi biến mang giá trị True,
+    dùng tách thành phần liên thông và bộ nhớ đệm theo công thức còn lại của từng thành phần"""
+
+    def __init__(self, clauses, variables=None):
+        self.clauses = [tuple(sorted(set(clause))) for clause in clauses]
+        if variables is None:
+            variables = {abs(var) for clause in self.clauses for var in clause}
+        self.variables = frozenset(variables)
+        self.cache = {}
+        self.stats = {
+            "decisions": 0,
+            "component_splits": 0,
+            "cache_hits": 0,
+            "cache_misses": 0
+        }
+
+    def count(self):
+        """Trả về (số mô hình, {biến: số mô hình có biến đó bằng True}) trên tập biến đã chọn"""
+        start_time = time.time()
+
+        print(f"[Model Counter] Counting models over {len(self.variables)} variables and {len(self.clauses)} clauses...")
+
+        # Bỏ các mệnh đề luôn đúng, độ sâu đệ quy tối đa tỉ lệ với số biến
+        clauses = tuple(clause for clause in self.clauses if not any(-var in clause for var in clause))
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(old_limit, 10 * len(self.variables) + 1000))
+        try:
+            total, true_counts = self._count(clauses, self.variables)
+        finally:
+            sys.setrecursionlimit(old_limit)
+
+        lookups = self.stats["cache_hits"] + self.stats["cache_misses"]
+        self.stats["cache_hit_rate"] = self.stats["cache_hits"] / lookups if lookups else 0.0
+        self.stats["counting_time"] = time.time() - start_time
+
+        print(f"[Model Counter] Found {total:,} models, cache hit rate {self.stats['cache_hit_rate']:.2%}")
+        print(f"[Model Counter] Counting time: {self.stats['counting_time']:.6f} seconds")
+
+        return total, true_counts
+
+    def _count(self, clauses, variables):
+        """Đếm mô hình của một công thức trên tập biến cho trước"""
+        # Lan truyền đơn vị
+        assigned = {}
+        while True:
+            units = {}
+            residual = []
+            for clause in clauses:
+                remaining = []
+                satisfied = False
+                for var in clause:
+                    value = assigned.get(abs(var))
+                    if value is None:
+                        remaining.append(var)
+                    elif value == (var > 0):
+                        satisfied = True
+                        break
+                if satisfied:
+                    continue
+                if not remaining:
+                    return 0, {}
+                if len(remaining) == 1:
+                    unit = remaining[0]
+                    if units.get(abs(unit), unit > 0) != (unit > 0):
+                        return 0, {}
+                    units[abs(unit)] = unit > 0
+                residual.append(tuple(remaining))
+
+            if not units:
+                break
+            assigned.update(units)
+            clauses = residual
+
+        residual_vars = {abs(var) for clause in residual for var in clause}
+        free_vars = [var for var in variables if var not in assigned and var not in residual_vars]
+
+        # Đếm từng thành phần liên thông độc lập
+        components = self._split_components(residual)
+        if len(components) > 1:
+            self.stats["component_splits"] += 1
+
+        results = [self._count_component(component) for component in components]
+
+        total = 2 ** len(free_vars)
+        for component_count, _ in results:
+            total *= component_count
+
+        true_counts = {}
+        if total == 0:
+            return 0, {var: 0 for var in variables}
+
+        for component_count, component_true_counts in results:
+            # Số cách chọn cho phần còn lại của công thức
+            others = total // component_count
+            for var, count in component_true_counts.items():
+                true_counts[var] = count * others
+
+        for var in free_vars:
+            true_counts[var] = total // 2
+        for var, value in assigned.items():
+            if var in variables:
+                true_counts[var] = total if value else 0
+
+        return total, true_counts
+
+    def _count_component(self, clauses):
+        """Đếm mô hình của một thành phần, có dùng bộ nhớ đệm"""
+        key = tuple(sorted(clauses))
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        self.stats["cache_misses"] += 1
+
+        # Chọn biến xuất hiện nhiều nhất để phân nhánh
+        occurrences = {}
+        for clause in clauses:
+            for var in clause:
+                occurrences[abs(var)] = occurrences.get(abs(var), 0) + 1
+        branch_var = max(occurrences, key=occurrences.get)
+        component_vars = frozenset(occurrences)
+
+        self.stats["decisions"] += 1
+        true_total, true_counts = self._count(clauses + ((branch_var,),), component_vars)
+        false_total, false_counts = self._count(clauses + ((-branch_var,),), component_vars)
+
+        total = true_total + false_total
+        counts = {var: true_counts.get(var, 0) + false_counts.get(var, 0) for var in component_vars}
+
+        self.cache[key] = (total, counts)
+        return total, counts
+
+    @staticmethod
+    def _split_components(clauses):
+        """Tách các mệnh đề thành các nhóm không có biến chung"""
+        parent = {}
+
+        def find(var):
+            while parent[var] != var:
+                parent[var] = parent[parent[var]]
+                var = parent[var]
+            return var
+
+        for clause in clauses:
+            first = abs(clause[0])
+            parent.setdefault(first, first)
+            for var in clause[1:]:
+                var = abs(var)
+                parent.setdefault(var, var)
+                root_a, root_b = find(first), find(var)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+
+        groups = {}
+        for clause in clauses:
+            groups.setdefault(find(abs(clause[0])), []).append(clause)
+
+        return [tuple(group) for group in groups.values()]
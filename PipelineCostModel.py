@@ -0,0 +1,169 @@
+import json
+import os
+
+# File hệ số do run_benchmarks.calibrate_cost_model ghi ra
+DEFAULT_COST_MODEL_PATH = os.path.join("benchmark", "cost_model.json")
+
+
+class PipelineCostModel:
+    """Mô hình chi phí tuyến tính dự đoán thời gian (giây) của từng cặp chiến lược CNF + thuật toán giải
+    từ các đặc trưng của lưới (xem GridFeatures.compute_grid_features)"""
+
+    STRATEGIES = ["cardinality", "truth_table", "truth_table_minimized"]
+    SOLVERS = ["pysat", "backtracking", "brute_force", "pysat_minicard", "pysat_lazy", "frontier_dp", "tiled",
+               "local_search", "local_search_native"]
+    # Thuật toán làm việc trực tiếp trên lưới: không có chi phí sinh CNF, chiến lược không ảnh hưởng
+    NATIVE_SOLVERS = ["pysat_minicard", "pysat_lazy", "frontier_dp", "tiled", "local_search_native"]
+    # Chế độ auto chỉ chọn giữa các thuật toán có cùng ngữ nghĩa với CNF (ô số không bị ép là an toàn):
+    # frontier_dp, tiled và local_search_native coi ô số là an toàn nên có thể cho kết quả khác,
+    # còn tìm kiếm cục bộ không chứng minh được vô nghiệm
+    AUTO_SOLVERS = ["pysat", "backtracking", "brute_force", "pysat_minicard", "pysat_lazy"]
+
+    # Hệ số nhỏ nhất của một đơn vị công việc: hệ số 0 nhân với công việc vô hạn sẽ cho nan
+    MIN_PER_UNIT = 1e-12
+
+    # Hệ số mặc định, đo trên máy phát triển với các test case trong testcases/
+    DEFAULT_COEFFICIENTS = {
+        "generation": {
+            "cardinality": 3.0e-7,
+            "truth_table": 5.5e-7,
+            "truth_table_minimized": 6.0e-7
+        },
+        "solvers": {
+            # Chi phí cố định của PySAT chủ yếu là import thư viện và khởi tạo bộ giải
+            "pysat": {"overhead": 2.5e-2, "per_unit": 7.0e-7},
+            "backtracking": {"overhead": 1.0e-4, "per_unit": 2.3e-6},
+            "brute_force": {"overhead": 1.0e-5, "per_unit": 2.6e-7},
+            "pysat_minicard": {"overhead": 2.5e-2, "per_unit": 4.0e-7},
+            # Chế độ lười tự sinh mệnh đề trong lúc giải nên chi phí sinh CNF nằm trong per_unit
+            "pysat_lazy": {"overhead": 2.5e-2, "per_unit": 6.0e-7},
+            "frontier_dp": {"overhead": 1.0e-4, "per_unit": 1.0e-6},
+            "tiled": {"overhead": 5.0e-2, "per_unit": 1.5e-6},
+            "local_search": {"overhead": 1.0e-4, "per_unit": 1.0e-6},
+            "local_search_native": {"overhead": 1.0e-4, "per_unit": 1.0e-6}
+        }
+    }
+
+    def __init__(self, coefficients=None):
+        self.coefficients = json.loads(json.dumps(self.DEFAULT_COEFFICIENTS))
+        # File hiệu chỉnh cũ có thể thiếu chiến lược / thuật toán mới: giữ hệ số mặc định cho các mục đó
+        for group, values in (coefficients or {}).items():
+            self.coefficients.setdefault(group, {}).update(values)
+
+    @classmethod
+    def load(cls, filepath=DEFAULT_COST_MODEL_PATH):
+        """Đọc hệ số đã hiệu chỉnh, dùng hệ số mặc định nếu chưa có file"""
+        if filepath and os.path.exists(filepath):
+            try:
+                with open(filepath, "r") as file:
+                    return cls(json.load(file))
+            except Exception as e:
+                print(f"Error loading cost model: {e}")
+        return cls()
+
+    def save(self, filepath=DEFAULT_COST_MODEL_PATH):
+        directory = os.path.dirname(filepath)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        with open(filepath, "w") as file:
+            json.dump(self.coefficients, file, indent=2)
+
+    def covers(self, strategy=None, solver=None):
+        """Mô hình có hệ số cho chiến lược / thuật toán này không"""
+        return (strategy is None or strategy in self.coefficients["generation"]) and \
+            (solver is None or solver in self.coefficients["solvers"])
+
+    @staticmethod
+    def solver_work(solver, strategy, features):
+        """Lượng công việc ước lượng của thuật toán giải trên CNF do chiến lược sinh ra"""
+        literals = features["predicted_literals"][strategy]
+        variables = features["cnf_variables"]
+        if solver == "pysat" or solver == "local_search":
+            return literals
+        if solver == "backtracking":
+            # Mỗi lần lan truyền quét lại toàn bộ mệnh đề; số nhánh tăng theo hàm mũ của thành phần lớn nhất,
+            # nhưng chậm hơn nhiều so với 2^n nhờ lan truyền đơn vị
+            exponent = features["max_component_size"] / 4
+            return literals * max(variables, 1) * (2 ** exponent if exponent < 1000 else float("inf"))
+        if solver == "brute_force":
+            # Trường hợp xấu nhất phải duyệt hết 2^n phép gán
+            return float(2 ** variables) if variables < 1000 else float("inf")
+        if solver == "pysat_minicard":
+            # Hai ràng buộc đếm gốc cho mỗi ô số
+            return 2 * features["constraint_literals"]
+        if solver == "pysat_lazy" or solver == "tiled":
+            # Cận trên: CNF cardinality đầy đủ (chế độ lười thường chỉ sinh một phần)
+            return features["predicted_literals"]["cardinality"]
+        if solver == "frontier_dp":
+            # Số trạng thái của mỗi bước tăng theo hàm mũ của chiều rộng lưới (lưới được xoay để hẹp nhất)
+            width = min(features["rows"], features["cols"])
+            return features["rows"] * features["cols"] * float(2 ** width) if width < 1000 else float("inf")
+        if solver == "local_search_native":
+            return features["constraint_literals"]
+        raise ValueError(f"Unknown solver algorithm: {solver}")
+
+    def predict(self, features, strategy, solver):
+        """Thời gian dự đoán (giây) của cặp chiến lược + thuật toán giải"""
+        if not self.covers(strategy, solver):
+            raise ValueError(f"Cost model has no coefficients for {strategy} + {solver}")
+
+        work = self.solver_work(solver, strategy, features)
+        if work == float("inf"):
+            return float("inf")
+
+        generation = 0.0
+        if solver not in self.NATIVE_SOLVERS:
+            generation = self.coefficients["generation"][strategy] * features["predicted_literals"][strategy]
+        solver_coefficients = self.coefficients["solvers"][solver]
+        solving = solver_coefficients["overhead"] + max(solver_coefficients["per_unit"], self.MIN_PER_UNIT) * work
+        return generation + solving
+
+    def choose(self, features, strategies=None, solvers=None):
+        """Chọn cặp có chi phí dự đoán nhỏ nhất, trả về (chiến lược, thuật toán, chi phí, bảng chi phí).
+        Khi không chỉ định, chỉ các chiến lược / thuật toán có hệ số (và được phép chọn tự động) được xét"""
+        strategies = strategies or [name for name in self.STRATEGIES if self.covers(strategy=name)]
+        solvers = solvers or [name for name in self.AUTO_SOLVERS if self.covers(solver=name)]
+        for strategy in strategies:
+            if not self.covers(strategy=strategy):
+                raise ValueError(f"Cost model has no coefficients for CNF strategy {strategy}")
+        for solver in solvers:
+            if not self.covers(solver=solver):
+                raise ValueError(f"Cost model has no coefficients for solver algorithm {solver}")
+
+        costs = {}
+        for strategy in strategies:
+            for solver in solvers:
+                costs[(strategy, solver)] = self.predict(features, strategy, solver)
+
+        (strategy, solver), cost = min(costs.items(), key=lambda item: item[1])
+        return strategy, solver, cost, costs
+
+    def calibrate(self, samples):
+        """Hiệu chỉnh hệ số bằng bình phương tối thiểu từ các lần chạy benchmark.
+        Mỗi mẫu gồm features, cnf_strategy, solver_algorithm, generation_time và solving_time"""
+        for strategy in self.STRATEGIES:
+            points = [(sample["features"]["predicted_literals"][strategy], sample["generation_time"])
+                      for sample in samples
+                      if sample["cnf_strategy"] == strategy and sample["solver_algorithm"] not in self.NATIVE_SOLVERS]
+            denominator = sum(x * x for x, _ in points)
+            if denominator > 0:
+                # Hồi quy qua gốc tọa độ
+                self.coefficients["generation"][strategy] = sum(x * t for x, t in points) / denominator
+
+        for solver in self.SOLVERS:
+            points = [(self.solver_work(solver, sample["cnf_strategy"], sample["features"]), sample["solving_time"])
+                      for sample in samples if sample["solver_algorithm"] == solver]
+            points = [(x, t) for x, t in points if x != float("inf")]
+            if len({x for x, _ in points}) < 2:
+                continue
+
+            # Hồi quy tuyến tính có hệ số tự do, không cho hệ số âm
+            count = len(points)
+            mean_x = sum(x for x, _ in points) / count
+            mean_t = sum(t for _, t in points) / count
+            variance = sum((x - mean_x) ** 2 for x, _ in points)
+            slope = max(sum((x - mean_x) * (t - mean_t) for x, t in points) / variance, self.MIN_PER_UNIT)
+            intercept = max(mean_t - slope * mean_x, 0.0)
+            self.coefficients["solvers"][solver] = {"overhead": intercept, "per_unit": slope}
+
+        return self
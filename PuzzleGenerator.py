@@ -0,0 +1,204 @@
+import os
+import random
+import time
+
+from pysat.solvers import Solver
+
+from ClauseTemplates import get_template, instantiate
+from GemHunterGrid import GemHunterGrid
+
+
+class PuzzleGenerator:
+    """Sinh đề Thợ săn đá quý có đúng một lời giải.
+    Đặt bẫy ngẫu nhiên, sau đó mở dần các ô số cho đến khi lời giải đã đặt là duy nhất.
+    Chỉ dùng một bộ giải SAT tăng dần cho mọi lần kiểm tra: lời giải đã đặt bị chặn vĩnh viễn bằng một mệnh đề,
+    mỗi ô số được gắn một biến chọn và chỉ có hiệu lực khi biến chọn được đưa vào assumptions.
+    Ô số được coi là đã mở nên không phải bẫy"""
+
+    def __init__(self, rows, cols, trap_density=0.2, seed=None, solver_name='g4'):
+        self.rows = rows
+        self.cols = cols
+        self.trap_density = trap_density
+        self.random = random.Random(seed)
+        self.solver_name = solver_name
+        self.grid = GemHunterGrid(rows, cols)
+        # Danh sách lân cận được dùng lại ở mọi lần đếm số bẫy
+        self.neighbors = {(i, j): self.grid.get_neighbors(i, j) for i in range(rows) for j in range(cols)}
+
+    def position_to_variable(self, row, col):
+        return row * self.cols + col + 1
+
+    def plant(self):
+        """Đặt bẫy ngẫu nhiên, trả về tập các ô bẫy"""
+        cells = [(i, j) for i in range(self.rows) for j in range(self.cols)]
+        count = round(len(cells) * self.trap_density)
+        return set(self.random.sample(cells, count))
+
+    def clue_value(self, traps, i, j):
+        return sum(neighbor in traps for neighbor in self.neighbors[(i, j)])
+
+    def generate(self, minimize=True, max_attempts=20):
+        """Sinh một đề có lời giải duy nhất. Trả về (lưới đề, lưới lời giải, thống kê) hoặc None nếu thất bại"""
+        start_time = time.time()
+        checks = 0
+
+        for attempt in range(1, max_attempts + 1):
+            traps = self.plant()
+            result = self._generate_for(traps, minimize)
+            checks += result["checks"]
+            if result["clues"] is None:
+                continue
+
+            puzzle = [['_' for _ in range(self.cols)] for _ in range(self.rows)]
+            solution = [['G' for _ in range(self.cols)] for _ in range(self.rows)]
+            for i, j in traps:
+                solution[i][j] = 'T'
+            for (i, j), value in result["clues"].items():
+                puzzle[i][j] = value
+                solution[i][j] = value
+
+            stats = {
+                "attempts": attempt,
+                "checks": checks,
+                "traps": len(traps),
+                "clues": len(result["clues"]),
+                "greedy_clues": result["greedy_clues"],
+                "removed_clues": result["removed_clues"],
+                "generation_time": time.time() - start_time
+            }
+            return GemHunterGrid(grid=puzzle), GemHunterGrid(grid=solution), stats
+
+        return None
+
+    def _generate_for(self, traps, minimize):
+        """Thêm ô số tham lam cho một cách đặt bẫy cố định, rồi (tùy chọn) bỏ các ô số thừa"""
+        cell_count = self.rows * self.cols
+        planted = {self.position_to_variable(i, j): (i, j) in traps
+                   for i in range(self.rows) for j in range(self.cols)}
+
+        clue_values = {cell: self.clue_value(traps, *cell) for cell in self.neighbors if cell not in traps}
+        selectors = {}
+        active = []
+        checks = 0
+
+        with Solver(name=self.solver_name) as solver:
+            # Chặn vĩnh viễn lời giải đã đặt: mọi mô hình tìm được sau đó là một lời giải thứ hai
+            solver.add_clause([-var if is_trap else var for var, is_trap in planted.items()])
+
+            def activate(cell):
+                """Thêm ràng buộc của ô số, được bảo vệ bởi một biến chọn mới"""
+                i, j = cell
+                selector = cell_count + len(selectors) + 1
+                selectors[cell] = selector
+                variables = [self.position_to_variable(n_row, n_col) for n_row, n_col in self.neighbors[cell]]
+                template = get_template("cardinality", len(variables), clue_values[cell])
+                for clause in instantiate(template, variables):
+                    solver.add_clause(clause + [-selector])
+                # Ô đã mở không phải bẫy
+                solver.add_clause([-self.position_to_variable(i, j), -selector])
+                active.append(cell)
+
+            # Pha tham lam: mỗi lời giải thứ hai tìm được chỉ ra một ô số mới loại bỏ được nó
+            while True:
+                checks += 1
+                if not solver.solve(assumptions=[selectors[cell] for cell in active]):
+                    break
+
+                model = solver.get_model()
+                trap_cells = {self.grid_position(var) for var in model if 0 < var <= cell_count}
+                cells = self._distinguishing_clues(clue_values, traps, trap_cells, set(active))
+                if not cells:
+                    # Có bẫy không thể suy ra từ bất kỳ ô số nào (bị bẫy khác bao kín)
+                    return {"clues": None, "checks": checks}
+                for cell in cells:
+                    activate(cell)
+
+            greedy_clues = len(active)
+
+            # Pha rút gọn: bỏ thử từng ô số, giữ lại nếu bỏ đi làm xuất hiện lời giải thứ hai
+            if minimize:
+                order = active[:]
+                self.random.shuffle(order)
+                kept = set(active)
+                for cell in order:
+                    kept.discard(cell)
+                    checks += 1
+                    if solver.solve(assumptions=[selectors[other] for other in kept]):
+                        kept.add(cell)
+                active = [cell for cell in active if cell in kept]
+
+        return {
+            "clues": {cell: clue_values[cell] for cell in active},
+            "greedy_clues": greedy_clues,
+            "removed_clues": greedy_clues - len(active),
+            "checks": checks
+        }
+
+    def grid_position(self, var):
+        return (var - 1) // self.cols, (var - 1) % self.cols
+
+    def _distinguishing_clues(self, clue_values, traps, other_traps, active):
+        """Chọn ngẫu nhiên các ô an toàn chưa mở mà khi mở sẽ loại được lời giải other_traps:
+        ô đó là bẫy trong other_traps, hoặc số bẫy xung quanh nó khác giữa hai lời giải.
+        Lời giải thứ hai thường khác ở nhiều vùng rời nhau, nên mỗi vòng chọn một ô cho mỗi vùng
+        (các ô được chọn cách nhau quá 2 ô) để giảm số lần gọi bộ giải"""
+        differing = traps ^ other_traps
+        candidates = set()
+        for cell in differing:
+            candidates.add(cell)
+            candidates.update(self.neighbors[cell])
+
+        killers = [cell for cell in candidates
+                   if cell not in traps and cell not in active
+                   and (cell in other_traps or clue_values[cell] != self.clue_value(other_traps, *cell))]
+        killers.sort()
+        self.random.shuffle(killers)
+
+        chosen = []
+        blocked = set()
+        for i, j in killers:
+            if (i, j) in blocked:
+                continue
+            chosen.append((i, j))
+            blocked.update((i + d_row, j + d_col) for d_row in range(-2, 3) for d_col in range(-2, 3))
+        return chosen
+
+
+def _generate_one(task):
+    """Chạy trong tiến trình con: sinh một đề với seed riêng"""
+    rows, cols, trap_density, seed, minimize = task
+    result = PuzzleGenerator(rows, cols, trap_density, seed).generate(minimize)
+    if result is None:
+        return seed, None, None, None
+    puzzle, solution, stats = result
+    return seed, puzzle.grid, solution.grid, stats
+
+
+def generate_puzzles(count, rows, cols, trap_density=0.2, output_dir="testcases", seed=0, minimize=True,
+                     workers=None, save_solutions=False):
+    """Sinh song song count đề và lưu theo định dạng của thư mục testcases
+    (input_gen_<rows>x<cols>_<seed>.txt, lời giải output_gen_... nếu save_solutions)"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = [(rows, cols, trap_density, seed + index, minimize) for index in range(count)]
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for puzzle_seed, puzzle, solution, stats in executor.map(_generate_one, tasks):
+            if puzzle is None:
+                print(f"[Generator] Could not generate a unique puzzle for seed {puzzle_seed}")
+                continue
+
+            name = f"gen_{rows}x{cols}_{puzzle_seed}.txt"
+            input_file = os.path.join(output_dir, f"input_{name}")
+            GemHunterGrid(grid=puzzle).save_grid_to_file(input_file)
+            if save_solutions:
+                GemHunterGrid(grid=solution).save_grid_to_file(os.path.join(output_dir, f"output_{name}"))
+
+            print(f"[Generator] Saved {input_file}: {stats['clues']} clues, {stats['traps']} traps, "
+                  f"{stats['checks']} checks in {stats['generation_time']:.6f} seconds")
+            stats["file"] = input_file
+            results.append(stats)
+
+    return results
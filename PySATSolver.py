@@ -1,43 +1,339 @@
+import threading
 import time
 from pysat.solvers import Solver
 
+from CardinalityStrategy import CardinalityStrategy
+from ClauseTemplates import get_template
 from ICNFSolver import ICNFSolver
 
 
 class PySATSolver(ICNFSolver):
     """Giải CNF bằng thư viện PySAT"""
 
+    # Tên bộ giải bên trong PySAT
+    solver_name = 'g4'
+    # Tiền tố của thông báo
+    label = "PySAT"
+    reports_memory_phases = True
+    supports_assumptions = True
+    supports_phases = True
+
+    def load(self, solver):
+        """Nạp bài toán vào bộ giải, trả về thống kê kích thước của công thức"""
+        for clause in self.clauses:
+            solver.add_clause(clause)
+
+        return {"clauses": len(self.clauses)}
+
+    def describe(self, formula_stats):
+        """Mô tả ngắn kích thước công thức để in ra"""
+        return f"{formula_stats['clauses']} clauses"
+
     def solve(self):
         """Giải CNF và trả về kết quả"""
         start_time = time.time()
 
-        print(f"[PySAT] Solving with {len(self.clauses)} clauses...")
-
-        with Solver(name='g4') as solver:
+        with Solver(name=self.solver_name) as solver:
             # Thêm tất cả các mệnh đề vào bộ giải
-            for clause in self.clauses:
-                solver.add_clause(clause)
+            with self.memory_phase("solver_load"):
+                formula_stats = self.load(solver)
+                if self.phases:
+                    formula_stats["phase_hints_applied"] = self.apply_phases(solver)
+            loading_time = time.time() - start_time
+
+            self.log(f"[{self.label}] Solving with {self.describe(formula_stats)}...")
 
             # Kiểm tra xem có giải pháp không
-            if solver.solve():
+            with self.memory_phase("search"):
+                satisfiable = formula_stats.get("satisfiable", True) and solver.solve(assumptions=list(self.assumptions))
+                while satisfiable and self.refine(solver, solver.get_model()):
+                    satisfiable = solver.solve(assumptions=list(self.assumptions))
+            # Bộ đếm của bộ giải bên trong (quyết định, xung đột, lan truyền, khởi động lại)
+            formula_stats.update(self.search_stats(solver))
+
+            if satisfiable:
                 # Lấy mô hình (các giá trị cho các biến)
                 model = solver.get_model()
 
                 solving_time = time.time() - start_time
-                print(f"[PySAT] Found a solution")
-                print(f"[PySAT] Solving time: {solving_time:.6f} seconds")
+                self.log(f"[{self.label}] Found a solution")
+                self.log(f"[{self.label}] Solving time: {solving_time:.6f} seconds")
 
                 # Tạo lưới kết quả
                 result_grid = self.create_result_grid(model)
 
-                return True, result_grid, {
-                    "solving_time": solving_time
-                }
+                return True, result_grid, self._stats(formula_stats, loading_time, solving_time)
             else:
                 solving_time = time.time() - start_time
-                print(f"[PySAT] No solution found")
-                print(f"[PySAT] Solving time: {solving_time:.6f} seconds")
+                self.log(f"[{self.label}] No solution found")
+                self.log(f"[{self.label}] Solving time: {solving_time:.6f} seconds")
+
+                return False, None, self._stats(formula_stats, loading_time, solving_time)
+
+    def enumerate_solutions(self, projection, limit=None, time_limit=None, stats=None):
+        """Sinh lần lượt các lưới kết quả trong cùng một phiên giải tăng dần.
+        Sau mỗi mô hình chỉ chặn phép gán trên các biến projection, nên hai mô hình chỉ khác nhau
+        ở ô không bị ràng buộc không bị liệt kê lại (các ô đó giữ nguyên '_' trong lưới kết quả).
+        Dừng khi đủ limit lời giải, hết time_limit giây hoặc hết lời giải; tiến độ được ghi vào stats"""
+        start_time = time.time()
+        projection = sorted(set(projection))
+        projected = set(projection)
+        stats = {} if stats is None else stats
+        stats.update({"solutions": 0, "exhausted": False, "stop_reason": None, "blocking_clauses": 0})
+
+        with Solver(name=self.solver_name) as solver:
+            formula_stats = self.load(solver)
+            stats["loading_time"] = time.time() - start_time
+            if not formula_stats.get("satisfiable", True):
+                projection = None
+
+            while projection is not None:
+                if limit is not None and stats["solutions"] >= limit:
+                    stats["stop_reason"] = "limit"
+                    break
+
+                satisfiable = self._solve_within(solver, time_limit, start_time)
+                while satisfiable and self.refine(solver, solver.get_model()):
+                    satisfiable = self._solve_within(solver, time_limit, start_time)
+                if satisfiable is None:
+                    stats["stop_reason"] = "time_limit"
+                    break
+
+                if not satisfiable:
+                    stats["exhausted"] = True
+                    stats["stop_reason"] = "exhausted"
+                    break
+
+                model = solver.get_model()
+                stats.update(self.search_stats(solver))
+                # Biến chưa xuất hiện trong mệnh đề nào có thể vắng mặt trong mô hình, coi là sai
+                values = {abs(lit): lit > 0 for lit in model}
+                if not projection:
+                    # Không còn biến nào bị ràng buộc: chỉ có đúng một lớp lời giải
+                    projection = None
+                else:
+                    solver.add_clause([-var if values.get(var, False) else var for var in projection])
+                    stats["blocking_clauses"] += 1
+
+                stats["solutions"] += 1
+                elapsed = time.time() - start_time
+                stats["enumeration_time"] = elapsed
+                stats["solutions_per_second"] = stats["solutions"] / elapsed if elapsed > 0 else 0.0
+
+                yield self._projected_result_grid(values, projected)
+
+        if projection is None and stats["stop_reason"] is None:
+            stats["exhausted"] = True
+            stats["stop_reason"] = "exhausted"
+        elapsed = time.time() - start_time
+        stats["enumeration_time"] = elapsed
+        stats["solutions_per_second"] = stats["solutions"] / elapsed if elapsed > 0 else 0.0
+
+    def _solve_within(self, solver, time_limit, start_time):
+        """Một lần giải với assumptions hiện tại; trả về None nếu hết time_limit giây tính từ start_time"""
+        if time_limit is None:
+            return solver.solve(assumptions=list(self.assumptions))
+
+        remaining = time_limit - (time.time() - start_time)
+        if remaining <= 0:
+            return None
+        # Ngắt lần giải đang chạy khi hết giờ thay vì chỉ kiểm tra giữa hai mô hình
+        timer = threading.Timer(remaining, solver.interrupt)
+        timer.start()
+        try:
+            satisfiable = solver.solve_limited(assumptions=list(self.assumptions), expect_interrupt=True)
+        finally:
+            timer.cancel()
+        solver.clear_interrupt()
+        return satisfiable
+
+    def refine(self, solver, model):
+        """Kiểm tra mô hình vừa tìm được; trả về số mệnh đề đã thêm vào solver nếu mô hình chưa hợp lệ.
+        Công thức được nạp đầy đủ ngay từ đầu nên mô hình luôn hợp lệ"""
+        return 0
+
+    def apply_phases(self, solver):
+        """Đặt pha ưu tiên của bộ giải theo gợi ý; trả về False nếu bộ giải PySAT không hỗ trợ set_phases"""
+        try:
+            solver.set_phases(literals=list(self.phases))
+        except NotImplementedError:
+            return False
+        return True
+
+    @staticmethod
+    def search_stats(solver):
+        """Bộ đếm tích lũy của bộ giải PySAT, rỗng nếu bộ giải không hỗ trợ accum_stats"""
+        try:
+            return dict(solver.accum_stats() or {})
+        except (AttributeError, NotImplementedError):
+            return {}
+
+    def _projected_result_grid(self, values, projected):
+        """Giải mã phép gán biến -> giá trị như create_result_grid (không in lưới) nhưng ô '_' ngoài projection
+        vẫn giữ '_' vì không bị ràng buộc; biến của projection vắng mặt trong phép gán được coi là sai"""
+        result_grid = [row[:] for row in self.grid.grid]
+        for var in projected:
+            i, j = self.var_to_position(var)
+            if i >= self.rows or result_grid[i][j] != "_":
+                continue
+            result_grid[i][j] = 'T' if values.get(var, False) else 'G'
+        return result_grid
+
+    def _stats(self, formula_stats, loading_time, solving_time):
+        stats = {
+            "solving_time": solving_time,
+            "loading_time": loading_time
+        }
+        stats.update((key, value) for key, value in formula_stats.items() if key != "satisfiable")
+        return stats
+
+
+class MinicardSolver(PySATSolver):
+    """Giải bằng Minicard của PySAT với ràng buộc 'chính xác n bẫy' được nạp dưới dạng ràng buộc đếm gốc.
+    Không cần chiến lược CNF: mỗi ô số chỉ tạo hai ràng buộc at-most thay vì các tổ hợp mệnh đề"""
+
+    requires_cnf = False
+    native_trap_bounds = True
+    solver_name = 'mc'
+    label = "Minicard"
+
+    def cardinality_constraints(self):
+        """Sinh các cặp (literals, bound) nghĩa là 'nhiều nhất bound literal đúng'.
+        Trả về None nếu có ô số lớn hơn số ô lân cận (bài toán chắc chắn vô nghiệm)"""
+        constraints = []
+        for i in range(self.rows):
+            for j in range(self.cols):
+                cell = self.grid.grid[i][j]
+                if not isinstance(cell, int):
+                    continue
+
+                variables = [self.position_to_var(n_row, n_col) for n_row, n_col in self.grid.get_neighbors(i, j)]
+                if cell > len(variables):
+                    return None
+
+                # Chính xác n trong k ô = nhiều nhất n bẫy và nhiều nhất (k - n) ô không phải bẫy
+                constraints.append((variables, cell))
+                constraints.append(([-var for var in variables], len(variables) - cell))
+
+        return constraints
+
+    def load(self, solver):
+        """Nạp ràng buộc đếm gốc của các ô số, mệnh đề đơn của các ô đã biết và các mệnh đề được truyền vào"""
+        for clause in self.clauses:
+            solver.add_clause(clause)
+        clauses = len(self.clauses)
+        for i in range(self.rows):
+            for j in range(self.cols):
+                cell = self.grid.grid[i][j]
+                if cell == "T":
+                    solver.add_clause([self.position_to_var(i, j)])
+                    clauses += 1
+                elif cell == "G":
+                    solver.add_clause([-self.position_to_var(i, j)])
+                    clauses += 1
+
+        constraints = self.cardinality_constraints()
+        if constraints is None:
+            return {"clauses": clauses, "native_constraints": 0, "satisfiable": False}
+
+        if self.trap_bounds:
+            # Cận tổng số bẫy cũng chỉ là hai ràng buộc đếm gốc
+            lower, upper, variables = self.trap_bounds
+            if upper is not None:
+                constraints.append((list(variables), upper))
+            if lower:
+                constraints.append(([-var for var in variables], len(variables) - lower))
+            if (upper is not None and upper < 0) or (lower or 0) > len(variables):
+                return {"clauses": clauses, "native_constraints": 0, "satisfiable": False}
+
+        for literals, bound in constraints:
+            solver.add_atmost(literals, bound)
+
+        return {
+            "clauses": clauses,
+            "native_constraints": len(constraints),
+            "native_literals": sum(len(literals) for literals, _ in constraints)
+        }
+
+    def describe(self, formula_stats):
+        return f"{formula_stats['clauses']} clauses and {formula_stats['native_constraints']} native constraints"
+
+
+class LazyCardinalitySolver(PySATSolver):
+    """Sinh ràng buộc lười theo phản ví dụ cho chiến lược cardinality.
+    Chỉ nạp phần hạt giống (mệnh đề đơn và mệnh đề hai literal), giải bằng một phiên PySAT tăng dần rồi đối chiếu
+    mô hình với các ô số: ô nào bị vi phạm thì chỉ nửa ràng buộc bị vi phạm ('nhiều nhất n' hoặc 'ít nhất n')
+    của ô đó được thêm vào, lặp lại đến khi mô hình hợp lệ. Tập lời giải giống hệt CNF đầy đủ của CardinalityStrategy"""
+
+    requires_cnf = False
+    label = "PySAT-lazy"
+
+    def __init__(self, clauses, rows, cols, grid=None):
+        super().__init__(clauses, rows, cols, grid)
+        self.strategy = None
+        self.deferred = []
+        self.refinement_stats = {}
+
+    def load(self, solver):
+        """Nạp mệnh đề được truyền vào và phần hạt giống; các ràng buộc còn lại được giữ trong self.deferred"""
+        for clause in self.clauses:
+            solver.add_clause(clause)
+
+        self.strategy = CardinalityStrategy(self.grid)
+        lazy_cnf = self.strategy.generate_lazy_cnf()
+        self.refinement_stats = {"refinement_rounds": 0, "refined_cells": 0, "lazy_clauses": 0}
+        if lazy_cnf is None:
+            self.deferred = []
+            return {"clauses": len(self.clauses), "seed_clauses": 0, "satisfiable": False}
+
+        seed, self.deferred = lazy_cnf
+        for clause in seed:
+            solver.add_clause(clause)
+        # Biến của các ô hoãn lại chỉ xuất hiện khi được tinh chỉnh: mệnh đề hằng đúng trên biến lớn nhất
+        # khai báo trước mọi biến của lưới để mô hình luôn phủ đủ các ô
+        top = self.rows * self.cols
+        solver.add_clause([top, -top])
+
+        # Số mệnh đề CNF đầy đủ sẽ có (chưa loại trùng), để so sánh với số mệnh đề thực sự được sinh
+        eager_clauses = len(seed) + sum(len(get_template(kind, len(variables), n))
+                                        for variables, n, pending in self.deferred for kind in pending)
+        return {
+            "clauses": len(self.clauses) + len(seed),
+            "seed_clauses": len(seed),
+            "eager_clauses": eager_clauses,
+            "deferred_cells": len(self.deferred)
+        }
+
+    def refine(self, solver, model):
+        """Thêm nửa ràng buộc bị vi phạm của mọi ô số mà mô hình chưa thỏa mãn"""
+        true_variables = {lit for lit in model if lit > 0}
+        added = 0
+        violated = 0
+        remaining = []
+        for constraint in self.deferred:
+            clauses = self.strategy.generate_violated_clauses(constraint, true_variables)
+            if clauses:
+                violated += 1
+                added += len(clauses)
+                for clause in clauses:
+                    solver.add_clause(clause)
+            if constraint[2]:
+                remaining.append(constraint)
+        self.deferred = remaining
+
+        if added:
+            self.refinement_stats["refinement_rounds"] += 1
+            self.refinement_stats["refined_cells"] += violated
+            self.refinement_stats["lazy_clauses"] += added
+            self.log(f"[{self.label}] Round {self.refinement_stats['refinement_rounds']}: "
+                     f"{violated} violated cells, added {added} clauses")
+        return added
+
+    def describe(self, formula_stats):
+        return f"{formula_stats['clauses']} seed clauses ({formula_stats.get('eager_clauses', 0)} in the full CNF)"
 
-                return False, None, {
-                    "solving_time": solving_time
-                }
\ No newline at end of file
+    def _stats(self, formula_stats, loading_time, solving_time):
+        stats = super()._stats(formula_stats, loading_time, solving_time)
+        stats.update(self.refinement_stats)
+        stats["clauses_generated"] = formula_stats["clauses"] + self.refinement_stats["lazy_clauses"]
+        return stats
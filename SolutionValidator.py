@@ -0,0 +1,110 @@
+class SolutionValidator:
+    """Kiểm tra lưới kết quả có thỏa mãn mọi ô số hay không.
+    Với lưới lớn và có NumPy: số bẫy quanh mọi ô được tính một lần bằng tổng cửa sổ 3x3 rồi so sánh với toàn bộ ô số.
+    Lưới nhỏ (hoặc không có NumPy) được đếm trực tiếp bằng Python, rẻ hơn cả thời gian import NumPy"""
+
+    # Các loại lỗi được báo cáo
+    WRONG_COUNT = "wrong_count"
+    NUMBER_CHANGED = "number_changed"
+    FIXED_CELL_CHANGED = "fixed_cell_changed"
+    SHAPE_MISMATCH = "shape_mismatch"
+
+    # Số ô tối thiểu để dùng NumPy
+    NUMPY_MIN_CELLS = 10000
+
+    def __init__(self, use_numpy=True):
+        self.use_numpy = use_numpy
+        self.np = None
+
+    def _numpy(self):
+        """Import NumPy ở lần đầu cần đến, None nếu không có"""
+        if self.np is None and self.use_numpy:
+            try:
+                import numpy
+                self.np = numpy
+            except ImportError:
+                self.use_numpy = False
+        return self.np
+
+    def validate(self, result_grid, input_grid=None):
+        """Trả về danh sách lỗi (rỗng nếu lưới hợp lệ). Mỗi lỗi là dict gồm row, col, kind, expected, actual.
+        result_grid và input_grid là list các hàng; nếu có input_grid thì ô số lấy từ đầu vào
+        và các ô số / ô T, G đã biết phải được giữ nguyên trong kết quả"""
+        rows = len(result_grid)
+        cols = len(result_grid[0]) if rows > 0 else 0
+        reference = input_grid if input_grid is not None else result_grid
+
+        if len(reference) != rows or any(len(row) != cols for row in reference) \
+                or any(len(row) != cols for row in result_grid):
+            return [{"row": None, "col": None, "kind": self.SHAPE_MISMATCH,
+                     "expected": (len(reference), len(reference[0]) if reference else 0),
+                     "actual": (rows, cols)}]
+
+        errors = []
+        if input_grid is not None:
+            errors.extend(self._check_preserved(result_grid, input_grid))
+
+        if rows * cols >= self.NUMPY_MIN_CELLS and self._numpy() is not None:
+            errors.extend(self._check_counts_numpy(result_grid, reference, rows, cols))
+        else:
+            errors.extend(self._check_counts_python(result_grid, reference, rows, cols))
+
+        return errors
+
+    def is_valid(self, result_grid, input_grid=None):
+        return not self.validate(result_grid, input_grid)
+
+    def _check_preserved(self, result_grid, input_grid):
+        errors = []
+        for i, (result_row, input_row) in enumerate(zip(result_grid, input_grid)):
+            for j, (result_cell, input_cell) in enumerate(zip(result_row, input_row)):
+                if input_cell == "_" or result_cell == input_cell:
+                    continue
+                kind = self.NUMBER_CHANGED if isinstance(input_cell, int) else self.FIXED_CELL_CHANGED
+                errors.append({"row": i, "col": j, "kind": kind, "expected": input_cell, "actual": result_cell})
+        return errors
+
+    def _check_counts_numpy(self, result_grid, reference, rows, cols):
+        np = self.np
+
+        # So sánh trên mảng object chạy trong C, nhanh hơn dựng mặt nạ bằng list comprehension
+        traps = (np.array(result_grid, dtype=object).reshape(rows, cols) == "T").astype(np.int8)
+        numbers = np.array([[cell if isinstance(cell, int) else -1 for cell in row] for row in reference],
+                           dtype=np.int16).reshape(rows, cols)
+
+        # Tổng cửa sổ 3x3 quanh mỗi ô (trừ chính ô đó) bằng 9 phép cộng các lát cắt của mảng đã đệm viền 0
+        padded = np.pad(traps, 1)
+        counts = -traps.astype(np.int16)
+        for d_row in range(3):
+            for d_col in range(3):
+                counts = counts + padded[d_row:d_row + rows, d_col:d_col + cols]
+
+        wrong = np.argwhere((numbers >= 0) & (counts != numbers))
+        return [{"row": int(i), "col": int(j), "kind": self.WRONG_COUNT,
+                 "expected": int(numbers[i, j]), "actual": int(counts[i, j])} for i, j in wrong]
+
+    def _check_counts_python(self, result_grid, reference, rows, cols):
+        errors = []
+        for i in range(rows):
+            for j in range(cols):
+                expected = reference[i][j]
+                if not isinstance(expected, int):
+                    continue
+                actual = sum(result_grid[n_row][n_col] == "T"
+                             for n_row in range(max(0, i - 1), min(rows, i + 2))
+                             for n_col in range(max(0, j - 1), min(cols, j + 2))
+                             if (n_row, n_col) != (i, j))
+                if actual != expected:
+                    errors.append({"row": i, "col": j, "kind": self.WRONG_COUNT,
+                                   "expected": expected, "actual": actual})
+        return errors
+
+
+def format_error(error):
+    """Mô tả ngắn một lỗi để in ra"""
+    if error["kind"] == SolutionValidator.SHAPE_MISMATCH:
+        return f"grid shape {error['actual']} does not match input shape {error['expected']}"
+    position = f"({error['row']}, {error['col']})"
+    if error["kind"] == SolutionValidator.WRONG_COUNT:
+        return f"cell {position} expects {error['expected']} traps but has {error['actual']}"
+    return f"cell {position} should be {error['expected']} but is {error['actual']}"
@@ -0,0 +1,129 @@
+import json
+import os
+import time
+
+METRICS_SCHEMA_VERSION = 1
+
+# Bộ đếm chung của mọi thuật toán giải; thuật toán không có bộ đếm nào thì giá trị là None
+COUNTERS = ["decisions", "conflicts", "propagations", "restarts", "backtracks", "learned_clauses",
+            "checked_combinations", "total_states"]
+# Thời gian của từng giai đoạn (giây), lấy từ các khóa *_time của thống kê
+PHASES = ["generation", "loading", "solving", "verification", "total"]
+
+PROMETHEUS_PREFIX = "gem_hunter"
+
+
+def solver_metrics(stats, input_file=None, revision=None):
+    """Chuẩn hóa dict thống kê của GemHunterSolver.solve về một lược đồ chung cho mọi thuật toán:
+    bộ đếm, tốc độ (trên giây giải) và thời gian từng giai đoạn"""
+    solving_time = stats.get("solving_time") or 0.0
+
+    counters = {}
+    rates = {}
+    for name in COUNTERS:
+        value = stats.get(name)
+        counters[name] = value if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+        rates[f"{name}_per_second"] = counters[name] / solving_time \
+            if counters[name] is not None and solving_time > 0 else None
+
+    return {
+        "schema_version": METRICS_SCHEMA_VERSION,
+        "timestamp": time.time(),
+        "revision": revision,
+        "input": input_file,
+        "solver_algorithm": stats.get("solver_algorithm"),
+        "cnf_strategy": stats.get("cnf_strategy"),
+        "success": bool(stats.get("success")),
+        "clauses": stats.get("clauses"),
+        "counters": counters,
+        "rates": rates,
+        "phases": {phase: stats.get(f"{phase}_time") for phase in PHASES},
+        "memory_peak": stats.get("memory_peak")
+    }
+
+
+def append_jsonl(metrics, path):
+    """Thêm một dòng JSON vào cuối file (mỗi lần chạy một dòng)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'a') as file:
+        file.write(json.dumps(metrics, separators=(",", ":")) + "\n")
+
+
+def read_jsonl(path):
+    """Đọc lại mọi lần chạy đã ghi bằng append_jsonl; bỏ qua dòng trống và dòng khác phiên bản lược đồ"""
+    if not os.path.exists(path):
+        return []
+    metrics_list = []
+    with open(path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            metrics = json.loads(line)
+            if metrics.get("schema_version") == METRICS_SCHEMA_VERSION:
+                metrics_list.append(metrics)
+    return metrics_list
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items()
+                          if value is not None) + "}"
+
+
+def prometheus_text(metrics_list):
+    """Định dạng văn bản của Prometheus (cho textfile collector của node_exporter).
+    Mọi giá trị là gauge của lần chạy gần nhất, phân biệt bằng nhãn solver, strategy, input và revision;
+    nhiều lần chạy trùng nhãn thì chỉ lần sau cùng được giữ lại"""
+    samples = {}
+    latest = {}
+    for metrics in metrics_list:
+        key = (metrics["solver_algorithm"], metrics["cnf_strategy"], metrics["input"], metrics["revision"])
+        latest[key] = metrics
+
+    def add(name, kind, help_text, labels, value):
+        if value is None:
+            return
+        family = samples.setdefault(name, (kind, help_text, []))
+        family[2].append(f"{name}{_labels(labels)} {float(value):.9g}")
+
+    for metrics in latest.values():
+        labels = {
+            "solver": metrics["solver_algorithm"],
+            "strategy": metrics["cnf_strategy"],
+            "input": metrics["input"],
+            "revision": metrics["revision"]
+        }
+        add(f"{PROMETHEUS_PREFIX}_solve_success", "gauge", "1 if the last solve found a solution", labels,
+            int(metrics["success"]))
+        add(f"{PROMETHEUS_PREFIX}_clauses", "gauge", "Number of CNF clauses", labels, metrics["clauses"])
+        for name, value in metrics["counters"].items():
+            add(f"{PROMETHEUS_PREFIX}_{name}", "gauge", f"Solver {name.replace('_', ' ')}", labels, value)
+        for name, value in metrics["rates"].items():
+            add(f"{PROMETHEUS_PREFIX}_{name}", "gauge", f"Solver {name.replace('_', ' ')}", labels, value)
+        for phase, value in metrics["phases"].items():
+            add(f"{PROMETHEUS_PREFIX}_phase_seconds", "gauge", "Time spent in each phase",
+                dict(labels, phase=phase), value)
+        add(f"{PROMETHEUS_PREFIX}_memory_peak_bytes", "gauge", "Peak traced memory", labels, metrics["memory_peak"])
+
+    lines = []
+    for name, (kind, help_text, family) in samples.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(family)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(metrics_list, path):
+    """Ghi nguyên tử file .prom để node_exporter không đọc phải file ghi dở"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, 'w') as file:
+        file.write(prometheus_text(metrics_list))
+    os.replace(temporary_path, path)
@@ -0,0 +1,89 @@
+import importlib
+
+# Nhóm entry point để gói bên ngoài đăng ký thêm chiến lược CNF / thuật toán giải
+CNF_STRATEGY_ENTRY_POINT_GROUP = "gem_hunter.cnf_strategies"
+SOLVER_ENTRY_POINT_GROUP = "gem_hunter.solvers"
+
+
+class SolverRegistry:
+    """Bảng ánh xạ tên -> lớp cài đặt, module chỉ được import khi lớp thực sự được dùng"""
+
+    def __init__(self, kind, entry_point_group):
+        self.kind = kind
+        self.entry_point_group = entry_point_group
+        self._targets = {}
+        self._entry_points_loaded = False
+
+    def register(self, name, target):
+        """Đăng ký một lớp, hoặc chuỗi 'module:Lớp' để import trễ"""
+        self._targets[name] = target
+
+    def names(self):
+        """Danh sách tên đã đăng ký, kể cả plugin khai báo qua entry point"""
+        self._load_entry_points()
+        return list(self._targets)
+
+    def __contains__(self, name):
+        self._load_entry_points()
+        return name in self._targets
+
+    def get(self, name):
+        """Trả về lớp ứng với tên, import module ở lần dùng đầu tiên"""
+        self._load_entry_points()
+        if name not in self._targets:
+            raise ValueError(f"Unknown {self.kind}: {name}")
+
+        target = self._targets[name]
+        if isinstance(target, str):
+            module_name, _, attribute = target.partition(":")
+            target = getattr(importlib.import_module(module_name), attribute)
+        elif hasattr(target, "load") and not isinstance(target, type):
+            # Entry point của plugin
+            target = target.load()
+
+        self._targets[name] = target
+        return target
+
+    def _load_entry_points(self):
+        """Đọc khai báo entry point (chưa import plugin), chỉ làm một lần"""
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+
+        from importlib import metadata
+        try:
+            entry_points = metadata.entry_points(group=self.entry_point_group)
+        except Exception as e:
+            print(f"Error loading {self.kind} plugins: {e}")
+            return
+
+        for entry_point in entry_points:
+            # Tên có sẵn không bị plugin ghi đè
+            self._targets.setdefault(entry_point.name, entry_point)
+
+
+CNF_STRATEGIES = SolverRegistry("CNF strategy", CNF_STRATEGY_ENTRY_POINT_GROUP)
+CNF_STRATEGIES.register("truth_table", "TruthTableStrategy:TruthTableStrategy")
+CNF_STRATEGIES.register("cardinality", "CardinalityStrategy:CardinalityStrategy")
+CNF_STRATEGIES.register("truth_table_minimized", "TruthTableStrategy:MinimizedTruthTableStrategy")
+
+SOLVERS = SolverRegistry("solver algorithm", SOLVER_ENTRY_POINT_GROUP)
+SOLVERS.register("brute_force", "BruteForceSolver:BruteForceSolver")
+SOLVERS.register("backtracking", "BacktrackingSolver:BacktrackingSolver")
+SOLVERS.register("pysat", "PySATSolver:PySATSolver")
+SOLVERS.register("pysat_minicard", "PySATSolver:MinicardSolver")
+SOLVERS.register("pysat_lazy", "PySATSolver:LazyCardinalitySolver")
+SOLVERS.register("frontier_dp", "FrontierDPSolver:FrontierDPSolver")
+SOLVERS.register("tiled", "TiledSolver:TiledSolver")
+SOLVERS.register("local_search", "LocalSearchSolver:LocalSearchSolver")
+SOLVERS.register("local_search_native", "LocalSearchSolver:NativeLocalSearchSolver")
+
+
+def register_cnf_strategy(name, target):
+    """Đăng ký thêm một chiến lược tạo CNF (lớp con của CNFGenerator)"""
+    CNF_STRATEGIES.register(name, target)
+
+
+def register_solver(name, target):
+    """Đăng ký thêm một thuật toán giải (lớp con của ICNFSolver)"""
+    SOLVERS.register(name, target)
@@ -0,0 +1,212 @@
+import time
+
+from pysat.solvers import Solver
+
+from ClauseTemplates import get_template, instantiate
+from ICNFSolver import ICNFSolver
+
+# Trạng thái của ô trong bảng gán của toàn lưới
+GEM = 0
+TRAP = 1
+UNDECIDED = 2
+
+# Độ rộng vùng chồng lấn quanh lõi của một ô lưới con: ô số cách lõi 1 ô có lân cận cách lõi 2 ô
+HALO = 2
+
+
+def _cells_of(rects):
+    for r0, r1, c0, c1 in rects:
+        for i in range(r0, r1):
+            for j in range(c0, c1):
+                yield i, j
+
+
+def _solve_tile(task):
+    """Chạy trong tiến trình con (hoặc tại chỗ khi sửa xung đột): giải phần lõi của một ô lưới con.
+    task gồm các hình chữ nhật lõi, giá trị của mọi ô trong vùng (lõi + HALO), các ô đã được quyết định
+    ở ô lưới con khác (đưa vào dưới dạng assumptions), loại mẫu mệnh đề và tên bộ giải PySAT.
+    Trả về (True, danh sách ô bẫy của lõi, số mệnh đề) hoặc (False, các ô assumption gây mâu thuẫn, số mệnh đề)"""
+    rects, cells, fixed, template_kind, solver_name = task
+    core = set(_cells_of(rects))
+
+    variables = {cell: index + 1 for index, cell in enumerate(cells)}
+    clauses = []
+    for (i, j), value in cells.items():
+        if isinstance(value, int):
+            neighbors = [(i + d_row, j + d_col) for d_row in (-1, 0, 1) for d_col in (-1, 0, 1)
+                         if (d_row or d_col) and (i + d_row, j + d_col) in cells]
+            # Chỉ ô số có lân cận nằm trong lõi mới ràng buộc lõi; mọi lân cận của nó đều nằm trong vùng
+            if (i, j) in core or any(neighbor in core for neighbor in neighbors):
+                if value > len(neighbors):
+                    # Ô số lớn hơn số ô lân cận: vô nghiệm bất kể các ô đã cố định
+                    return False, [], len(clauses)
+                template = get_template(template_kind, len(neighbors), value)
+                clauses.extend(instantiate(template, [variables[neighbor] for neighbor in neighbors]))
+                # Ô số đã được mở nên không phải bẫy
+                clauses.append([-variables[(i, j)]])
+        elif (i, j) in core and value == "T":
+            clauses.append([variables[(i, j)]])
+        elif (i, j) in core and value == "G":
+            clauses.append([-variables[(i, j)]])
+
+    assumptions = [variables[cell] if is_trap else -variables[cell] for cell, is_trap in fixed.items()]
+
+    with Solver(name=solver_name, bootstrap_with=clauses) as solver:
+        if solver.solve(assumptions=assumptions):
+            # Biến không xuất hiện trong mệnh đề nào có thể vắng mặt trong mô hình, coi là không phải bẫy
+            true_variables = {lit for lit in solver.get_model() if lit > 0}
+            traps = [cell for cell in core if variables[cell] in true_variables]
+            return True, traps, len(clauses)
+
+        positions = {index: cell for cell, index in variables.items()}
+        conflict = [positions[abs(lit)] for lit in solver.get_core() or []]
+        return False, conflict, len(clauses)
+
+
+class TiledSolver(ICNFSolver):
+    """Chia lưới thành các ô lưới con tile_size x tile_size và chỉ giải phần lõi của từng ô lưới con.
+    Mỗi ô lưới con mang theo vùng chồng lấn HALO ô quanh lõi; các ô trong vùng này đã được ô lưới con khác
+    quyết định thì được cố định bằng assumptions, nên CNF và bộ nhớ chỉ tỉ lệ với kích thước ô lưới con.
+    Các ô lưới con được tô 4 màu theo (hàng chẵn/lẻ, cột chẵn/lẻ): cùng màu thì không có ô số chung,
+    nên mỗi màu được giải song song trên một process pool, màu sau dùng kết quả của các màu trước.
+    Khi một ô lưới con vô nghiệm với các giá trị đã cố định, lõi UNSAT chỉ ra các ô lưới con lân cận gây xung đột;
+    chỉ cặp (hoặc nhóm) ô lưới con đó được giải lại cùng nhau, mở rộng dần đến khi có nghiệm.
+    Ô số được coi là đã mở nên không phải bẫy"""
+
+    requires_cnf = False
+
+    def __init__(self, clauses, rows, cols, grid=None, tile_size=64, workers=None, template_kind="cardinality",
+                 solver_name="g4"):
+        super().__init__(clauses, rows, cols, grid)
+        if tile_size < 3:
+            # Hai ô lưới con cùng màu phải cách nhau đủ xa để không có ô số chung
+            raise ValueError(f"Tile size must be at least 3, got {tile_size}")
+        self.tile_size = tile_size
+        self.workers = workers
+        self.template_kind = template_kind
+        self.solver_name = solver_name
+        self.tile_rows = -(-rows // tile_size)
+        self.tile_cols = -(-cols // tile_size)
+        self.assignment = None
+
+    def tile_rect(self, tile):
+        tile_row, tile_col = tile
+        r0, c0 = tile_row * self.tile_size, tile_col * self.tile_size
+        return r0, min(r0 + self.tile_size, self.rows), c0, min(c0 + self.tile_size, self.cols)
+
+    def tile_of(self, cell):
+        return cell[0] // self.tile_size, cell[1] // self.tile_size
+
+    def build_task(self, tiles):
+        """Dữ liệu cần cho một lần giải: chỉ các ô trong lõi của tiles và vùng chồng lấn quanh chúng"""
+        rects = [self.tile_rect(tile) for tile in tiles]
+        cells = {}
+        fixed = {}
+        for r0, r1, c0, c1 in rects:
+            for i in range(max(0, r0 - HALO), min(self.rows, r1 + HALO)):
+                for j in range(max(0, c0 - HALO), min(self.cols, c1 + HALO)):
+                    if (i, j) in cells:
+                        continue
+                    cells[(i, j)] = self.grid.cell(i, j)
+                    state = self.assignment[i * self.cols + j]
+                    if state != UNDECIDED:
+                        fixed[(i, j)] = state == TRAP
+        # Lõi của các ô lưới con đang giải không bao giờ bị cố định
+        for cell in _cells_of(rects):
+            fixed.pop(cell, None)
+        return rects, cells, fixed, self.template_kind, self.solver_name
+
+    def apply(self, tiles, traps):
+        for i, j in _cells_of(self.tile_rect(tile) for tile in tiles):
+            self.assignment[i * self.cols + j] = GEM
+        for i, j in traps:
+            self.assignment[i * self.cols + j] = TRAP
+
+    def release(self, tiles):
+        for i, j in _cells_of(self.tile_rect(tile) for tile in tiles):
+            self.assignment[i * self.cols + j] = UNDECIDED
+
+    def repair(self, tile, conflict, stats):
+        """Giải lại ô lưới con cùng các ô lưới con lân cận có ô nằm trong lõi UNSAT.
+        Trả về False nếu xung đột không còn phụ thuộc vào ô nào được cố định (bài toán vô nghiệm)"""
+        group = {tile}
+        while True:
+            owners = {self.tile_of(cell) for cell in conflict} - group
+            if not owners:
+                return False
+
+            group |= owners
+            self.release(owners)
+            stats["repairs"] += 1
+            stats["max_repair_tiles"] = max(stats["max_repair_tiles"], len(group))
+
+            tiles = sorted(group)
+            success, cells, clause_count = _solve_tile(self.build_task(tiles))
+            stats["max_tile_clauses"] = max(stats["max_tile_clauses"], clause_count)
+            if success:
+                self.apply(tiles, cells)
+                return True
+            conflict = cells
+
+    def solve_phase(self, tiles, executor, stats):
+        """Giải mọi ô lưới con cùng màu (song song nếu có executor), sau đó sửa xung đột tuần tự"""
+        tasks = [self.build_task([tile]) for tile in tiles]
+        results = executor.map(_solve_tile, tasks) if executor else map(_solve_tile, tasks)
+
+        conflicts = []
+        for tile, (success, cells, clause_count) in zip(tiles, results):
+            stats["max_tile_clauses"] = max(stats["max_tile_clauses"], clause_count)
+            if success:
+                self.apply([tile], cells)
+            else:
+                conflicts.append((tile, cells))
+
+        for tile, conflict in conflicts:
+            if not self.repair(tile, conflict, stats):
+                return False
+        return True
+
+    def solve(self):
+        start_time = time.time()
+        tiles = [(tile_row, tile_col) for tile_row in range(self.tile_rows) for tile_col in range(self.tile_cols)]
+        self.log(f"[Tiled] Solving {self.rows}x{self.cols} grid as {len(tiles)} tiles of {self.tile_size}x{self.tile_size}...")
+
+        self.assignment = bytearray([UNDECIDED]) * (self.rows * self.cols)
+        stats = {
+            "tiles": len(tiles),
+            "tile_size": self.tile_size,
+            "repairs": 0,
+            "max_repair_tiles": 1,
+            "max_tile_clauses": 0
+        }
+
+        executor = None
+        if self.workers and self.workers > 1 and len(tiles) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        success = True
+        try:
+            for color in [(0, 0), (0, 1), (1, 0), (1, 1)]:
+                phase = [tile for tile in tiles if (tile[0] % 2, tile[1] % 2) == color]
+                if phase and not self.solve_phase(phase, executor, stats):
+                    success = False
+                    break
+        finally:
+            if executor:
+                executor.shutdown()
+
+        solving_time = time.time() - start_time
+        stats["solving_time"] = solving_time
+
+        if not success:
+            self.log(f"[Tiled] No solution found ({stats['repairs']} repairs)")
+            self.log(f"[Tiled] Solving time: {solving_time:.6f} seconds")
+            return False, None, stats
+
+        self.log(f"[Tiled] Found a solution with {stats['repairs']} repairs "
+                 f"(largest tile CNF {stats['max_tile_clauses']:,} clauses)")
+        self.log(f"[Tiled] Solving time: {solving_time:.6f} seconds")
+
+        model = [index + 1 if state == TRAP else -(index + 1) for index, state in enumerate(self.assignment)]
+        return True, self.create_result_grid(model), stats
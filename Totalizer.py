@@ -0,0 +1,79 @@
+class Totalizer:
+    """Mã hóa totalizer hai chiều cho 'số biến đúng trong variables'.
+    outputs[k - 1] đúng khi và chỉ khi có ít nhất k biến đúng (k = 1..cap), nên mọi cận dưới / cận trên
+    trong khoảng 0..cap chỉ là một literal assumption: thắt chặt hay nới lỏng cận không cần mã hóa lại.
+    cap giới hạn số đầu ra của mỗi nút (totalizer rút gọn): số mệnh đề giảm từ O(n^2) xuống O(n * cap)
+    nhưng chỉ biểu diễn được cận dưới <= cap và cận trên < cap"""
+
+    def __init__(self, variables, next_variable, cap=None):
+        self.variables = list(variables)
+        self.cap = len(self.variables) if cap is None else min(cap, len(self.variables))
+        self.next_variable = next_variable
+        self.clauses = []
+        self.outputs = self._build(self.variables) if self.variables else []
+
+    def _new_variables(self, count):
+        start = self.next_variable
+        self.next_variable += count
+        return list(range(start, start + count))
+
+    def _build(self, variables):
+        """Dựng cây gộp cân bằng, trả về các đầu ra một ngôi của nút gốc"""
+        if len(variables) == 1:
+            return list(variables)
+
+        middle = len(variables) // 2
+        left = self._build(variables[:middle])
+        right = self._build(variables[middle:])
+        outputs = self._new_variables(min(len(left) + len(right), self.cap))
+        self._merge(left, right, outputs)
+        return outputs
+
+    def _merge(self, left, right, outputs):
+        size = len(outputs)
+        for i in range(len(left) + 1):
+            for j in range(len(right) + 1):
+                # Chiều lên: ít nhất i bên trái và j bên phải thì có ít nhất i + j (bão hòa ở cap)
+                if i + j > 0:
+                    clause = [outputs[min(i + j, size) - 1]]
+                    if i > 0:
+                        clause.append(-left[i - 1])
+                    if j > 0:
+                        clause.append(-right[j - 1])
+                    self.clauses.append(clause)
+                # Chiều xuống: ít hơn i + 1 bên trái và ít hơn j + 1 bên phải thì ít hơn i + j + 1
+                if i + j + 1 <= size:
+                    clause = [-outputs[i + j]]
+                    if i < len(left):
+                        clause.append(left[i])
+                    if j < len(right):
+                        clause.append(right[j])
+                    self.clauses.append(clause)
+
+    def represents(self, lower=None, upper=None):
+        """Cận [lower, upper] có biểu diễn được bằng các đầu ra của totalizer không.
+        Khoảng chắc chắn rỗng luôn biểu diễn được (không cần literal nào)"""
+        count = len(self.variables)
+        lower = max(lower or 0, 0)
+        upper = count if upper is None else upper
+        if lower > min(upper, count) or upper < 0:
+            return True
+        return lower <= self.cap and (upper >= count or upper < self.cap)
+
+    def bound_assumptions(self, lower=None, upper=None):
+        """Literal cần giả định để số biến đúng nằm trong [lower, upper].
+        Trả về None nếu khoảng chắc chắn rỗng (lower > upper hoặc lower > số biến)"""
+        count = len(self.variables)
+        if not self.represents(lower, upper):
+            raise ValueError(f"Bounds [{lower}, {upper}] exceed the totalizer cap {self.cap}")
+        lower = max(lower or 0, 0)
+        upper = count if upper is None else upper
+        if lower > min(upper, count) or upper < 0:
+            return None
+
+        assumptions = []
+        if lower > 0:
+            assumptions.append(self.outputs[lower - 1])
+        if upper < count:
+            assumptions.append(-self.outputs[upper])
+        return assumptions
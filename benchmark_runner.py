@@ -0,0 +1,314 @@
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# Đánh dấu dòng kết quả của tiến trình con để tách khỏi mọi thứ khác được in ra
+RESULT_MARKER = "@@BENCHMARK_RESULT@@ "
+
+
+def percentile(sorted_values, fraction):
+    """Phân vị theo nội suy tuyến tính giữa hai điểm gần nhất (giống numpy mặc định)"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def median_confidence_interval(sorted_values, confidence=0.95):
+    """Khoảng tin cậy của trung vị theo thống kê thứ tự (không giả định phân phối chuẩn).
+    Chọn cặp thứ hạng đối xứng hẹp nhất có xác suất phủ theo phân phối nhị thức B(n, 1/2) >= confidence"""
+    n = len(sorted_values)
+    if n == 0:
+        return None, None
+
+    # cdf[k] = P(B <= k)
+    cdf = []
+    total = 0
+    for k in range(n + 1):
+        total += math.comb(n, k)
+        cdf.append(total / 2 ** n)
+
+    for lower in range((n - 1) // 2, -1, -1):
+        upper = n - 1 - lower
+        # B là số mẫu nhỏ hơn trung vị thật: trung vị nằm giữa x[lower] và x[upper] khi lower < B <= upper
+        coverage = cdf[upper] - cdf[lower]
+        if coverage >= confidence:
+            return sorted_values[lower], sorted_values[upper]
+
+    # Quá ít mẫu để đạt độ tin cậy yêu cầu
+    return sorted_values[0], sorted_values[-1]
+
+
+def summarize(samples):
+    """Trung vị, IQR, p95, trung bình và khoảng tin cậy 95% của trung vị (đơn vị giống mẫu)"""
+    values = sorted(samples)
+    if not values:
+        raise ValueError("No samples to summarize")
+    q1 = percentile(values, 0.25)
+    q3 = percentile(values, 0.75)
+    ci_low, ci_high = median_confidence_interval(values)
+    mean = sum(values) / len(values)
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1) if len(values) > 1 else 0.0
+
+    return {
+        "runs": len(values),
+        "min": values[0],
+        "median": percentile(values, 0.5),
+        "q1": q1,
+        "q3": q3,
+        "iqr": q3 - q1,
+        "p95": percentile(values, 0.95),
+        "max": values[-1],
+        "mean": mean,
+        "stdev": math.sqrt(variance),
+        "median_ci_low": ci_low,
+        "median_ci_high": ci_high
+    }
+
+
+def mann_whitney_u(first, second):
+    """Kiểm định Mann-Whitney U hai phía (xấp xỉ chuẩn, hiệu chỉnh tie và liên tục).
+    Trả về (U của mẫu thứ nhất, p-value)"""
+    n1, n2 = len(first), len(second)
+    if n1 == 0 or n2 == 0:
+        return None, 1.0
+
+    combined = sorted([(value, 0) for value in first] + [(value, 1) for value in second])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    index = 0
+    while index < len(combined):
+        end = index
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[index][0]:
+            end += 1
+        # Các giá trị bằng nhau nhận hạng trung bình
+        average_rank = (index + end) / 2 + 1
+        for position in range(index, end + 1):
+            ranks[position] = average_rank
+        tied = end - index + 1
+        tie_term += tied ** 3 - tied
+        index = end + 1
+
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u1 = rank_sum - n1 * (n1 + 1) / 2
+
+    n = n1 + n2
+    mean_u = n1 * n2 / 2
+    variance_u = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance_u <= 0:
+        return u1, 1.0
+
+    z = (abs(u1 - mean_u) - 0.5) / math.sqrt(variance_u)
+    p_value = math.erfc(max(z, 0) / math.sqrt(2))
+    return u1, min(1.0, p_value)
+
+
+def validate_config(config):
+    """Kiểm tra số lần chạy của cấu hình trước khi khởi động tiến trình con"""
+    if config["repeat"] < 1:
+        raise ValueError(f"repeat must be at least 1, got {config['repeat']}")
+    if config["warmup"] < 0:
+        raise ValueError(f"warmup must not be negative, got {config['warmup']}")
+
+
+def config_key(config):
+    return f"{os.path.basename(config['input'])}|{config['cnf_strategy']}|{config['solver_algorithm']}"
+
+
+def run_worker(config):
+    """Chạy trong tiến trình con: khởi động, đo các lần chạy và in kết quả JSON ra stdout gốc"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from GemHunterGrid import GemHunterGrid
+    from GemHunterSolver import GemHunterSolver
+
+    validate_config(config)
+    grid = GemHunterGrid().load_grid_from_file(config["input"])
+    samples = []
+    generation_samples = []
+    solving_samples = []
+    success = None
+
+    with open(os.devnull, "w") as devnull:
+        for run in range(config["warmup"] + config["repeat"]):
+            solver = GemHunterSolver(grid, config["cnf_strategy"], config["solver_algorithm"],
+                                     config.get("solver_options"), quiet=True)
+            # Chế độ quiet: không thông báo nào được định dạng hay in ra trong thời gian đo.
+            # devnull chỉ còn chặn phần in ra của thuật toán plugin không dùng ICNFSolver.log
+            with contextlib.redirect_stdout(devnull):
+                start = time.perf_counter_ns()
+                stats = solver.solve()
+                elapsed = time.perf_counter_ns() - start
+
+            if run < config["warmup"]:
+                continue
+            samples.append(elapsed)
+            generation_samples.append(stats["generation_time"])
+            solving_samples.append(stats["solving_time"])
+            success = stats["success"]
+
+    result = {
+        "config": config,
+        "success": success,
+        "samples_ns": samples,
+        "generation_time_median": summarize(generation_samples)["median"],
+        "solving_time_median": summarize(solving_samples)["median"]
+    }
+    print(RESULT_MARKER + json.dumps(result))
+
+
+def run_config(config, timeout=None):
+    """Chạy một cấu hình trong tiến trình Python mới để không bị ảnh hưởng bởi cache / heap của lần chạy khác"""
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "_worker", json.dumps(config)],
+                               capture_output=True, text=True, timeout=timeout)
+    for line in completed.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            result = json.loads(line[len(RESULT_MARKER):])
+            result["summary_ns"] = summarize(result["samples_ns"])
+            return result
+
+    error = completed.stderr.strip().splitlines()[-1:] or ["no result"]
+    raise RuntimeError(f"Benchmark of {config_key(config)} failed: {error[0]}")
+
+
+def git_revision():
+    try:
+        completed = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)))
+        return completed.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run_benchmarks(inputs, strategies, solvers, warmup=2, repeat=15, timeout=None):
+    """Chạy mọi tổ hợp test case x chiến lược x thuật toán, mỗi tổ hợp trong một tiến trình riêng"""
+    validate_config({"warmup": warmup, "repeat": repeat})
+    results = []
+    for input_file in inputs:
+        for strategy in strategies:
+            for solver_algorithm in solvers:
+                config = {
+                    "input": input_file,
+                    "cnf_strategy": strategy,
+                    "solver_algorithm": solver_algorithm,
+                    "warmup": warmup,
+                    "repeat": repeat
+                }
+                print(f"Benchmarking {config_key(config)} ({warmup} warmup + {repeat} runs)...")
+                try:
+                    result = run_config(config, timeout)
+                except (RuntimeError, subprocess.TimeoutExpired) as e:
+                    print(f"Warning: {e}")
+                    continue
+
+                summary = result["summary_ns"]
+                print(f"  median {summary['median'] / 1e6:.3f} ms, IQR {summary['iqr'] / 1e6:.3f} ms, "
+                      f"p95 {summary['p95'] / 1e6:.3f} ms, 95% CI [{summary['median_ci_low'] / 1e6:.3f}, "
+                      f"{summary['median_ci_high'] / 1e6:.3f}] ms")
+                results.append(result)
+
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+
+def compare_results(baseline, candidate, alpha=0.05):
+    """So sánh hai file kết quả theo từng cấu hình chung: tỉ lệ trung vị và p-value Mann-Whitney"""
+    baseline_results = {config_key(result["config"]): result for result in baseline["results"]}
+    comparisons = []
+
+    for result in candidate["results"]:
+        key = config_key(result["config"])
+        if key not in baseline_results:
+            continue
+
+        before = baseline_results[key]["samples_ns"]
+        after = result["samples_ns"]
+        before_median = summarize(before)["median"]
+        after_median = summarize(after)["median"]
+        _, p_value = mann_whitney_u(before, after)
+
+        comparisons.append({
+            "config": key,
+            "baseline_median_ns": before_median,
+            "candidate_median_ns": after_median,
+            "ratio": after_median / before_median if before_median else None,
+            "p_value": p_value,
+            "significant": p_value < alpha
+        })
+
+    return comparisons
+
+
+def print_comparison(comparisons, baseline, candidate):
+    print(f"Baseline: {baseline.get('revision')} ({baseline.get('timestamp')}), "
+          f"candidate: {candidate.get('revision')} ({candidate.get('timestamp')})")
+    for comparison in comparisons:
+        ratio = comparison["ratio"]
+        change = f"{(ratio - 1) * 100:+.1f}%" if ratio is not None else "n/a"
+        verdict = "significant" if comparison["significant"] else "not significant"
+        print(f"{comparison['config']:<50} {comparison['baseline_median_ns'] / 1e6:10.3f} ms -> "
+              f"{comparison['candidate_median_ns'] / 1e6:10.3f} ms  {change:>8}  "
+              f"p={comparison['p_value']:.4f} ({verdict})")
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == "_worker":
+        run_worker(json.loads(sys.argv[2]))
+        return
+
+    parser = argparse.ArgumentParser(description='Benchmark các cấu hình Thợ săn đá quý trong tiến trình riêng biệt.')
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help='Chạy benchmark và lưu kết quả ra file JSON')
+    run_parser.add_argument('inputs', nargs='+', help='Các file đầu vào')
+    run_parser.add_argument('-c', '--cnf', nargs='+', default=['cardinality'], help='Các chiến lược CNF')
+    run_parser.add_argument('-s', '--solver', nargs='+', default=['pysat'], help='Các thuật toán giải')
+    run_parser.add_argument('--warmup', type=int, default=2, help='Số lần chạy khởi động không tính (mặc định: 2)')
+    run_parser.add_argument('--repeat', type=int, default=15, help='Số lần chạy được đo (mặc định: 15)')
+    run_parser.add_argument('--timeout', type=float, default=None, help='Giới hạn thời gian của mỗi cấu hình (giây)')
+    run_parser.add_argument('-o', '--output', help='File JSON kết quả')
+
+    compare_parser = subparsers.add_parser("compare", help='So sánh hai file kết quả')
+    compare_parser.add_argument('baseline', help='File kết quả gốc')
+    compare_parser.add_argument('candidate', help='File kết quả cần so sánh')
+    compare_parser.add_argument('--alpha', type=float, default=0.05, help='Mức ý nghĩa (mặc định: 0.05)')
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        try:
+            report = run_benchmarks(args.inputs, args.cnf, args.solver, args.warmup, args.repeat, args.timeout)
+        except ValueError as e:
+            run_parser.error(str(e))
+        output = args.output
+        if not output:
+            os.makedirs("benchmark", exist_ok=True)
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            output = os.path.join("benchmark", f"runner_{report['revision'] or 'local'}_{timestamp}.json")
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Benchmark results saved to {output}")
+    else:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        with open(args.candidate) as f:
+            candidate = json.load(f)
+        print_comparison(compare_results(baseline, candidate, args.alpha), baseline, candidate)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
+import argparse
+import contextlib
+import io
 import os
+import signal
 import time
-import matplotlib.pyplot as plt
 
 from GemHunterGrid import GemHunterGrid
 from GemHunterSolver import GemHunterSolver
+from SolverRegistry import CNF_STRATEGIES as CNF_STRATEGY_REGISTRY
 
 
 def ensure_dir(directory):
@@ -12,9 +16,150 @@ def ensure_dir(directory):
         os.makedirs(directory)
 
 
-def solve_with_all_strategies(input_file, output_dir, max_time=300):
-    """Giải bài toán với tất cả các chiến lược và thuật toán"""
-    # Đọc lưới từ file
+# Trạng thái của một ô trong ma trận so sánh
+SOLVED = "solved"
+NO_SOLUTION = "no_solution"
+TIMEOUT = "timeout"
+OOM = "oom"
+ERROR = "error"
+CRASHED = "crashed"
+
+CNF_STRATEGIES = [GemHunterSolver.TRUTH_TABLE, GemHunterSolver.CARDINALITY]
+SOLVER_ALGORITHMS = [GemHunterSolver.BRUTE_FORCE, GemHunterSolver.BACKTRACKING, GemHunterSolver.PYSAT]
+# Thuật toán liệt kê lời giải được đối chiếu với PySAT trên CNF đầy đủ
+ENUMERATION_SOLVERS = [GemHunterSolver.PYSAT_MINICARD, GemHunterSolver.PYSAT_LAZY]
+# Lưới nhỏ có nhiều lời giải; các ô số chỉ được chế độ lười thêm vào khi tinh chỉnh nên biến của chúng
+# có thể chưa có trong mô hình đầu tiên
+ENUMERATION_CHECK_GRID = [['_', 2, '_', 1], [3, '_', '_', '_'], ['_', 'T', '_', 'G'], ['T', 4, 2, '_']]
+# Lưới vô nghiệm: ô số ở góc lớn hơn số ô lân cận (sinh mệnh đề rỗng), lặp lại ở nhiều dải hàng
+GENERATION_CHECK_GRID = [[4, '_', '_'], ['_', '_', '_'], ['_', '_', '_'], ['_', 1, '_'], ['_', '_', '_'],
+                         [4, '_', 4]]
+
+# Thời gian chờ thêm sau max_time trước khi tiến trình con bị giết (giới hạn CPU thường kích hoạt trước)
+KILL_GRACE = 5.0
+
+
+def _apply_limits(cpu_limit, memory_limit_mb):
+    """Giới hạn CPU (giây) và bộ nhớ ảo (MB) của tiến trình hiện tại; bỏ qua nếu hệ điều hành không hỗ trợ"""
+    try:
+        import resource
+    except ImportError:
+        return
+
+    if cpu_limit:
+        # Vượt soft limit thì nhận SIGXCPU, vượt hard limit thì bị SIGKILL
+        cpu_limit = int(cpu_limit) + 1
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu_limit, cpu_limit + int(KILL_GRACE)))
+    if memory_limit_mb:
+        memory_limit = int(memory_limit_mb) * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _matrix_worker(task, connection):
+    """Chạy trong tiến trình con: giải một tổ hợp chiến lược x thuật toán dưới giới hạn CPU / bộ nhớ,
+    lưu lời giải và gửi thống kê (không kèm lưới kết quả) về tiến trình cha"""
+    _apply_limits(task["max_time"], task["memory_limit_mb"])
+    start_time = time.time()
+    result = {"status": ERROR}
+    try:
+        grid = GemHunterGrid().load_grid_from_file(task["input"])
+        solver = GemHunterSolver(grid, task["cnf_strategy"], task["solver_algorithm"])
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            stats = solver.solve()
+
+        result_grid = stats.pop("result_grid", None)
+        if stats["success"]:
+            GemHunterGrid(grid=result_grid).save_grid_to_file(task["output_file"])
+        result = {key: value for key, value in stats.items() if isinstance(value, (bool, int, float, str))}
+        result["status"] = SOLVED if stats["success"] else NO_SOLUTION
+    except MemoryError:
+        result = {"status": OOM, "error": "MemoryError"}
+    except Exception as e:
+        result = {"status": ERROR, "error": str(e)}
+    result.setdefault("total_time", time.time() - start_time)
+
+    connection.send(result)
+    connection.close()
+
+
+def _failed_status(exitcode, elapsed, max_time):
+    """Trạng thái của tiến trình con kết thúc mà không gửi kết quả, suy ra từ tín hiệu đã giết nó"""
+    if exitcode == -getattr(signal, "SIGXCPU", 0):
+        return TIMEOUT
+    if exitcode == -getattr(signal, "SIGKILL", 0):
+        # SIGKILL không do tiến trình cha gửi: hard limit CPU hoặc trình diệt OOM của hệ điều hành
+        return TIMEOUT if elapsed >= max_time else OOM
+    return CRASHED
+
+
+def run_matrix(tasks, workers=None, max_time=300, memory_limit_mb=None):
+    """Chạy các tổ hợp trong tối đa workers tiến trình con song song, mỗi tiến trình có giới hạn CPU,
+    bộ nhớ và bị giết nếu chạy quá max_time + KILL_GRACE giây (thời gian thực).
+    Sinh ra từng kết quả ngay khi nó hoàn thành, kèm trạng thái solved / no_solution / timeout / oom / error / crashed"""
+    import multiprocessing
+    from collections import deque
+    from multiprocessing.connection import wait
+
+    context = multiprocessing.get_context("spawn")
+    workers = workers or os.cpu_count() or 1
+    pending = deque(tasks)
+    running = {}
+
+    while pending or running:
+        while pending and len(running) < workers:
+            task = dict(pending.popleft(), max_time=max_time, memory_limit_mb=memory_limit_mb)
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_matrix_worker, args=(task, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[receiver] = (process, task, time.time())
+
+        ready = wait(list(running), timeout=0.5)
+        now = time.time()
+        for receiver in list(running):
+            process, task, start_time = running[receiver]
+            if receiver in ready:
+                try:
+                    result = receiver.recv()
+                except EOFError:
+                    process.join()
+                    result = {"status": _failed_status(process.exitcode, now - start_time, max_time),
+                              "exitcode": process.exitcode}
+            elif now - start_time > max_time + KILL_GRACE:
+                process.kill()
+                result = {"status": TIMEOUT}
+            else:
+                continue
+
+            process.join()
+            receiver.close()
+            del running[receiver]
+            result.setdefault("success", False)
+            result.setdefault("total_time", now - start_time)
+            result.update(input=task["input"], cnf_strategy=task["cnf_strategy"],
+                          solver_algorithm=task["solver_algorithm"])
+            yield result
+
+
+def matrix_tasks(input_file, output_dir):
+    """Các tổ hợp chiến lược CNF x thuật toán giải cho một test case"""
+    return [{
+        "input": input_file,
+        "cnf_strategy": cnf_strategy,
+        "solver_algorithm": solver_algorithm,
+        "output_file": os.path.join(output_dir, f"{cnf_strategy}_{solver_algorithm}_"
+                                                f"{os.path.basename(input_file).replace('input', 'output')}")
+    } for cnf_strategy in CNF_STRATEGIES for solver_algorithm in SOLVER_ALGORITHMS]
+
+
+def print_result(result):
+    print(f"[{result['status']}] {os.path.basename(result['input'])}: {result['cnf_strategy']} CNF with "
+          f"{result['solver_algorithm']} solver in {result['total_time']:.3f} seconds"
+          + (f" ({result['error']})" if result.get("error") else ""))
+
+
+def solve_with_all_strategies(input_file, output_dir, max_time=300, workers=None, memory_limit_mb=None):
+    """Giải bài toán với tất cả các chiến lược và thuật toán, mỗi tổ hợp trong một tiến trình con có giới hạn"""
     grid = GemHunterGrid().load_grid_from_file(input_file)
     print(f"Loaded grid from {input_file}: {grid.rows}x{grid.cols}")
 
@@ -22,85 +167,77 @@ def solve_with_all_strategies(input_file, output_dir, max_time=300):
     ensure_dir(output_dir)
 
     results = []
+    for result in run_matrix(matrix_tasks(input_file, output_dir), workers, max_time, memory_limit_mb):
+        print_result(result)
+        results.append(result)
+    return results
 
-    # Các chiến lược CNF
-    cnf_strategies = [
-        GemHunterSolver.TRUTH_TABLE,
-        GemHunterSolver.CARDINALITY
-    ]
 
-    # Các thuật toán giải
-    solvers = [
-        GemHunterSolver.BRUTE_FORCE,
-        GemHunterSolver.BACKTRACKING,
-        GemHunterSolver.PYSAT
-    ]
+def check_enumeration(grid, solver_algorithm, reference=GemHunterSolver.PYSAT, limit=1000):
+    """Liệt kê lời giải (chiếu lên biên) bằng solver_algorithm và bằng reference rồi so sánh hai tập lời giải.
+    Trả về None nếu một trong hai lần liệt kê dừng ở limit trước khi hết lời giải (không so sánh được),
+    ngược lại trả về (khớp hay không, số lời giải của reference, số lời giải của solver_algorithm)"""
+    solutions = []
+    for algorithm in [reference, solver_algorithm]:
+        solver = GemHunterSolver(grid.clone(), GemHunterSolver.CARDINALITY, algorithm)
+        with contextlib.redirect_stdout(io.StringIO()):
+            found = {tuple(map(tuple, result_grid))
+                     for result_grid in solver.enumerate_solutions(limit, solver_algorithm=algorithm)}
+        if not solver.enumeration_stats.get("exhausted"):
+            return None
+        solutions.append(found)
 
-    # Thử tất cả các kết hợp
-    for cnf_strategy in cnf_strategies:
-        for solver_algorithm in solvers:
-            print(f"\n=== Testing {cnf_strategy} CNF with {solver_algorithm} solver ===\n")
-
-            # Tạo bộ giải
-            solver = GemHunterSolver(grid, cnf_strategy, solver_algorithm)
-
-            # Thiết lập timeout
-            start_time = time.time()
-            success = False
-            stats = None
-
-            try:
-                # Giải bài toán
-                stats = solver.solve()
-                success = stats["success"]
-
-                # Lưu kết quả nếu thành công
-                if success:
-                    result_grid = GemHunterGrid(grid=stats["result_grid"])
-                    output_file = os.path.join(output_dir,
-                                               f"{cnf_strategy}_{solver_algorithm}_{os.path.basename(input_file).replace('input', 'output')}")
-                    result_grid.save_grid_to_file(output_file)
-                    print(f"Solution saved to {output_file}")
-            except KeyboardInterrupt:
-                print(f"Interrupted by user")
-                stats = {
-                    "success": False,
-                    "interrupted": True,
-                    "cnf_strategy": cnf_strategy,
-                    "solver_algorithm": solver_algorithm,
-                    "total_time": time.time() - start_time
-                }
-            except Exception as e:
-                print(f"Error: {e}")
-                stats = {
-                    "success": False,
-                    "error": str(e),
-                    "cnf_strategy": cnf_strategy,
-                    "solver_algorithm": solver_algorithm,
-                    "total_time": time.time() - start_time
-                }
-
-            # Kiểm tra timeout
-            if time.time() - start_time > max_time:
-                print(f"Timeout after {max_time} seconds")
-                stats = {
-                    "success": False,
-                    "timeout": True,
-                    "cnf_strategy": cnf_strategy,
-                    "solver_algorithm": solver_algorithm,
-                    "total_time": max_time
-                }
-
-            # Thêm vào kết quả
-            if stats:
-                results.append(stats)
+    return solutions[0] == solutions[1], len(solutions[0]), len(solutions[1])
 
-    return results
+
+def check_parallel_generation(grid, cnf_strategy, workers=2, band_rows=1):
+    """Sinh CNF tuần tự và song song theo dải hàng, trả về (giống hệt nhau hay không, số mệnh đề tuần tự,
+    số mệnh đề song song)"""
+    strategy_class = CNF_STRATEGY_REGISTRY.get(cnf_strategy)
+    serial = strategy_class(grid.clone()).generate_cnf()
+    parallel = strategy_class(grid.clone()).generate_cnf(workers=workers, band_rows=band_rows)
+    return serial == parallel, len(serial), len(parallel)
+
+
+def write_comparison_table(results, output_dir, test_case):
+    """Ghi bảng so sánh dạng văn bản, kể cả khi chỉ có một phần kết quả"""
+    ensure_dir(output_dir)
+    grouped_results = {(result["cnf_strategy"], result["solver_algorithm"]): result for result in results}
+    cnf_strategies = sorted(set(r["cnf_strategy"] for r in results))
+    solvers = sorted(set(r["solver_algorithm"] for r in results))
+
+    with open(os.path.join(output_dir, f"comparison_{os.path.basename(test_case).replace('.txt', '')}.txt"), 'w') as f:
+        f.write(f"Performance Comparison - {os.path.basename(test_case)}\n")
+        f.write("=" * 50 + "\n\n")
+
+        f.write(
+            f"{'Strategy':<20} {'Solver':<15} {'Status':<12} {'Clauses':<10} {'Gen Time':<10} {'Solve Time':<12} {'Total Time':<12}\n")
+        f.write("-" * 95 + "\n")
+
+        for cnf in cnf_strategies:
+            for solver in solvers:
+                key = (cnf, solver)
+                if key in grouped_results:
+                    result = grouped_results[key]
+                    f.write(
+                        f"{cnf:<20} {solver:<15} {result.get('status', str(result['success'])):<12} "
+                        f"{result.get('clauses', 'N/A'):<10} {_format_time(result.get('generation_time')):<10} "
+                        f"{_format_time(result.get('solving_time')):<12} {_format_time(result.get('total_time')):<12}\n")
+                else:
+                    f.write(f"{cnf:<20} {solver:<15} {'N/A':<12} {'N/A':<10} {'N/A':<10} {'N/A':<12} {'N/A':<12}\n")
+            f.write("-" * 95 + "\n")
 
 
 def create_comparison_plots(results, output_dir, test_case):
     """Tạo biểu đồ so sánh từ kết quả"""
-    ensure_dir(output_dir)
+    write_comparison_table(results, output_dir, test_case)
+
+    # Chỉ nạp matplotlib khi thực sự vẽ biểu đồ
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("Warning: matplotlib is not installed, skipping plots")
+        return
 
     # Nhóm kết quả theo CNF strategy và solver algorithm
     grouped_results = {}
@@ -165,7 +302,8 @@ def create_comparison_plots(results, output_dir, test_case):
         # Lấy số lượng clauses từ bất kỳ solver nào (vì chúng giống nhau cho cùng một CNF strategy)
         for solver in solvers:
             key = (cnf, solver)
-            if key in grouped_results:
+            # Tổ hợp bị timeout / OOM không biết số mệnh đề
+            if key in grouped_results and "clauses" in grouped_results[key]:
                 result = grouped_results[key]
                 clauses.append(result.get("clauses", 0))
                 cnf_labels.append(cnf)
@@ -183,28 +321,26 @@ def create_comparison_plots(results, output_dir, test_case):
     plt.savefig(plot_file)
     plt.close()
 
-    # Tạo bảng so sánh
-    with open(os.path.join(output_dir, f"comparison_{os.path.basename(test_case).replace('.txt', '')}.txt"), 'w') as f:
-        f.write(f"Performance Comparison - {os.path.basename(test_case)}\n")
-        f.write("=" * 50 + "\n\n")
 
-        f.write(
-            f"{'Strategy':<20} {'Solver':<15} {'Success':<8} {'Clauses':<10} {'Gen Time':<10} {'Solve Time':<12} {'Total Time':<12}\n")
-        f.write("-" * 80 + "\n")
-
-        for cnf in cnf_strategies:
-            for solver in solvers:
-                key = (cnf, solver)
-                if key in grouped_results:
-                    result = grouped_results[key]
-                    f.write(
-                        f"{cnf:<20} {solver:<15} {str(result['success']):<8} {result.get('clauses', 'N/A'):<10} {result.get('generation_time', 'N/A'):<10.4f} {result.get('solving_time', 'N/A'):<12.4f} {result.get('total_time', 'N/A'):<12.4f}\n")
-                else:
-                    f.write(f"{cnf:<20} {solver:<15} {'N/A':<8} {'N/A':<10} {'N/A':<10} {'N/A':<12} {'N/A':<12}\n")
-            f.write("-" * 80 + "\n")
+def _format_time(value):
+    # Tổ hợp bị timeout / OOM không có thời gian của từng giai đoạn
+    return f"{value:.4f}" if isinstance(value, (int, float)) else "N/A"
 
 
 def main():
+    parser = argparse.ArgumentParser(description='So sánh mọi tổ hợp chiến lược CNF x thuật toán giải')
+    parser.add_argument('--workers', type=int, default=None, help='Số tiến trình con chạy song song (mặc định: số CPU)')
+    parser.add_argument('--max-time', type=float, default=600, help='Giới hạn thời gian của mỗi lần giải (giây)')
+    parser.add_argument('--memory-limit', type=int, default=4096,
+                        help='Giới hạn bộ nhớ ảo của mỗi lần giải (MB, 0 là không giới hạn)')
+    parser.add_argument('--check-enumeration', action='store_true',
+                        help='Chỉ đối chiếu tập lời giải liệt kê của các thuật toán không dùng CNF với PySAT')
+    parser.add_argument('--check-generation', action='store_true',
+                        help='Chỉ đối chiếu CNF sinh song song theo dải hàng với CNF sinh tuần tự')
+    parser.add_argument('--enumeration-limit', type=int, default=1000,
+                        help='Số lời giải tối đa khi đối chiếu liệt kê (mặc định: 1000)')
+    args = parser.parse_args()
+
     # Tạo thư mục testcases, results và comparisons nếu chưa tồn tại
     ensure_dir("testcases")
     ensure_dir("results")
@@ -228,18 +364,57 @@ def main():
         "testcases/input_20x20.txt",
     ]
 
+    if args.check_generation:
+        mismatches = 0
+        grids = [("built-in unsatisfiable", GemHunterGrid(grid=GENERATION_CHECK_GRID))]
+        grids.extend((test_case, GemHunterGrid().load_grid_from_file(test_case))
+                     for test_case in test_cases if os.path.exists(test_case))
+        for test_case, grid in grids:
+            for cnf_strategy in CNF_STRATEGY_REGISTRY.names():
+                match, expected, actual = check_parallel_generation(grid, cnf_strategy)
+                mismatches += not match
+                print(f"{test_case} {cnf_strategy}: {'OK' if match else 'MISMATCH'} "
+                      f"({actual} parallel clauses, serial generated {expected})")
+        raise SystemExit(1 if mismatches else 0)
+
+    if args.check_enumeration:
+        mismatches = 0
+        grids = [("built-in 4x4", GemHunterGrid(grid=ENUMERATION_CHECK_GRID))]
+        grids.extend((test_case, GemHunterGrid().load_grid_from_file(test_case))
+                     for test_case in test_cases if os.path.exists(test_case))
+        for test_case, grid in grids:
+            for solver_algorithm in ENUMERATION_SOLVERS:
+                result = check_enumeration(grid, solver_algorithm, limit=args.enumeration_limit)
+                if result is None:
+                    print(f"{test_case} {solver_algorithm}: skipped (more than {args.enumeration_limit} solutions)")
+                    continue
+                match, expected, actual = result
+                mismatches += not match
+                print(f"{test_case} {solver_algorithm}: {'OK' if match else 'MISMATCH'} "
+                      f"({actual} solutions, {GemHunterSolver.PYSAT} found {expected})")
+        raise SystemExit(1 if mismatches else 0)
+
+    tasks = []
     for test_case in test_cases:
         if os.path.exists(test_case):
-            print(f"\n=== Comparing all strategies for {test_case} ===\n")
-
-            # Thiết lập timeout lâu hơn cho các bài toán lớn
-            max_time = 600  # 10 phút
-
-            results = solve_with_all_strategies(test_case, "results", max_time)
-            create_comparison_plots(results, "comparisons", test_case)
+            tasks.extend(matrix_tasks(test_case, "results"))
         else:
             print(f"Warning: Test case {test_case} not found. Skipping...")
 
+    # Mọi test case dùng chung một pool tiến trình con: một tổ hợp chậm không chặn các tổ hợp sau nó
+    print(f"\n=== Running {len(tasks)} configurations on {args.workers or os.cpu_count()} workers "
+          f"(limit {args.max_time:g} seconds, {args.memory_limit or 'unlimited'} MB each) ===\n")
+    results = {}
+    try:
+        for result in run_matrix(tasks, args.workers, args.max_time, args.memory_limit):
+            print_result(result)
+            results.setdefault(result["input"], []).append(result)
+    except KeyboardInterrupt:
+        print("Interrupted by user, writing partial results...")
+
+    for test_case, test_results in results.items():
+        create_comparison_plots(test_results, "comparisons", test_case)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,19 +3,142 @@ import os
 
 from GemHunterGrid import GemHunterGrid
 from GemHunterSolver import GemHunterSolver
+from SolverRegistry import CNF_STRATEGIES, SOLVERS
+
+
+def print_memory_stats(stats):
+    """In đỉnh bộ nhớ của từng giai đoạn nếu có đo"""
+    if "memory_peak" not in stats:
+        return
+
+    for phase in ["encoding", "dedup", "solver_load", "search", "decode"]:
+        if f"{phase}_memory_peak" in stats:
+            print(f"- Memory peak ({phase}): {stats[f'{phase}_memory_peak'] / 1024:.1f} KB")
+        if stats.get(f"{phase}_rss_peak") is not None:
+            print(f"- Peak RSS ({phase}): {stats[f'{phase}_rss_peak'] / 1024 / 1024:.1f} MB")
+        if stats.get(f"{phase}_rss_delta") is not None:
+            print(f"- RSS change ({phase}): {stats[f'{phase}_rss_delta'] / 1024 / 1024:+.1f} MB")
+    if stats.get("rss_peak"):
+        print(f"- Peak RSS: {stats['rss_peak'] / 1024 / 1024:.1f} MB")
+    if "bytes_per_clause" in stats:
+        print(f"- Bytes per clause: {stats['bytes_per_clause']:.1f}")
+    print(f"- Bytes per variable: {stats['bytes_per_variable']:.1f}")
+
+
+def print_checkpoint_stats(stats):
+    """In số lần ghi checkpoint và tỉ lệ thời gian dành cho việc ghi"""
+    if "checkpoints_written" not in stats:
+        return
+
+    overhead = stats["checkpoint_time"] / stats["solving_time"] * 100 if stats["solving_time"] else 0.0
+    print(f"- Checkpoints: {stats['checkpoints_written']} written in {stats['checkpoint_time']:.6f} seconds "
+          f"({overhead:.2f}% of solving time){', resumed' if stats.get('resumed') else ''}")
+
+
+def export_metrics(stats, args):
+    """Xuất số liệu theo lược đồ chung nếu có yêu cầu"""
+    if not args.metrics_jsonl and not args.metrics_prom:
+        return
+
+    from benchmark_runner import git_revision
+    from SolverMetrics import append_jsonl, read_jsonl, solver_metrics, write_prometheus
+
+    metrics = solver_metrics(stats, args.input, git_revision())
+    if args.metrics_jsonl:
+        append_jsonl(metrics, args.metrics_jsonl)
+        print(f"Metrics appended to {args.metrics_jsonl}")
+    if args.metrics_prom:
+        # File .prom bị ghi đè mỗi lần chạy: nếu có log JSONL thì dựng lại từ toàn bộ log
+        # (prometheus_text giữ lần chạy mới nhất cho mỗi bộ nhãn), nếu không chỉ chứa lần chạy này
+        write_prometheus(read_jsonl(args.metrics_jsonl) if args.metrics_jsonl else [metrics], args.metrics_prom)
+        print(f"Metrics written to {args.metrics_prom}")
+
+
+def enumerate_solutions(solver, args):
+    """Liệt kê lời giải theo luồng, lưu lời giải đầu tiên vào file đầu ra"""
+    count = 0
+    # Thuật toán đã được kiểm tra trong main; auto thì GemHunterSolver dùng PySAT
+    for result_grid in solver.enumerate_solutions(args.limit, args.time_limit):
+        count += 1
+        if count == 1:
+            GemHunterGrid(grid=result_grid).save_grid_to_file(args.output)
+        if args.verbose:
+            print(f"\nSolution {count}:")
+            print(GemHunterGrid(grid=result_grid))
+
+    stats = solver.enumeration_stats
+    print(f"\nEnumerated {stats['solutions']:,} solutions over {stats['frontier_variables']} frontier cells "
+          f"({stats['stop_reason']}):")
+    print(f"- Time to generate CNF: {stats['generation_time']:.6f} seconds")
+    print(f"- Enumeration time: {stats['enumeration_time']:.6f} seconds")
+    print(f"- Rate: {stats['solutions_per_second']:,.1f} solutions/second")
+    if count:
+        print(f"First solution saved to {args.output}")
 
 
 def main():
     parser = argparse.ArgumentParser(description='Giải bài toán Thợ săn đá quý.')
     parser.add_argument('input', help='Đường dẫn đến file đầu vào')
     parser.add_argument('-o', '--output', help='Đường dẫn đến file đầu ra')
-    parser.add_argument('-c', '--cnf', choices=['truth_table', 'cardinality'],
+    parser.add_argument('-c', '--cnf', choices=CNF_STRATEGIES.names() + [GemHunterSolver.AUTO],
                         default='cardinality', help='Chiến lược tạo CNF (mặc định: cardinality)')
-    parser.add_argument('-s', '--solver', choices=['brute_force', 'backtracking', 'pysat'],
+    parser.add_argument('-s', '--solver', choices=SOLVERS.names() + [GemHunterSolver.AUTO],
                         default='pysat', help='Thuật toán giải CNF (mặc định: pysat)')
+    parser.add_argument('--enumeration', choices=['product', 'gray_code'], default='product',
+                        help='Thứ tự duyệt phép gán của brute_force (mặc định: product)')
+    parser.add_argument('--backtracking-mode', choices=['chronological', 'cdcl'], default='chronological',
+                        help='Chế độ tìm kiếm của backtracking (mặc định: chronological)')
+    parser.add_argument('--tile-size', type=int, default=64,
+                        help='Kích thước ô lưới con của tiled (mặc định: 64)')
+    parser.add_argument('--tile-workers', type=int, default=None,
+                        help='Số tiến trình giải các ô lưới con của tiled (mặc định: tuần tự)')
+    parser.add_argument('--local-search', choices=['probsat', 'walksat'], default='probsat',
+                        help='Thuật toán của local_search / local_search_native (mặc định: probsat)')
+    parser.add_argument('--noise', type=float, default=0.5, help='Xác suất bước ngẫu nhiên của walksat (mặc định: 0.5)')
+    parser.add_argument('--max-flips', type=int, default=None,
+                        help='Số lần lật tối đa trước mỗi lần khởi động lại của local search')
+    parser.add_argument('--max-restarts', type=int, default=10,
+                        help='Số lần khởi động lại tối đa của local search (mặc định: 10)')
+    parser.add_argument('--seed', type=int, default=None, help='Hạt giống ngẫu nhiên của local search')
+    parser.add_argument('--checkpoint', default=None,
+                        help='File checkpoint của brute_force/backtracking '
+                             '(mặc định khi có --resume hoặc --checkpoint-interval: checkpoints/<solver>_<input>.json)')
+    parser.add_argument('--checkpoint-interval', type=float, default=None,
+                        help='Số giây giữa hai lần ghi checkpoint (mặc định: 60)')
+    parser.add_argument('--resume', action='store_true', help='Tiếp tục từ checkpoint gần nhất nếu có')
+    parser.add_argument('--generation-workers', type=int, default=None,
+                        help='Số tiến trình sinh CNF song song theo dải hàng (mặc định: tuần tự)')
+    parser.add_argument('--track-memory', action='store_true',
+                        help='Đo đỉnh bộ nhớ của từng giai đoạn (chậm hơn)')
+    parser.add_argument('--compact', action='store_true',
+                        help='Giữ lưới ở dạng gọn một byte mỗi ô (cho lưới rất lớn)')
+    parser.add_argument('--verify', action='store_true', help='Kiểm tra lại lời giải với mọi ô số')
+    parser.add_argument('--enumerate', action='store_true',
+                        help='Liệt kê mọi lời giải (chiếu trên các ô biên) thay vì chỉ tìm một lời giải')
+    parser.add_argument('--limit', type=int, default=None, help='Số lời giải tối đa khi liệt kê')
+    parser.add_argument('--time-limit', type=float, default=None, help='Thời gian liệt kê tối đa (giây)')
+    parser.add_argument('--min-traps', type=int, default=None, help='Cận dưới của tổng số bẫy')
+    parser.add_argument('--max-traps', type=int, default=None, help='Cận trên của tổng số bẫy')
+    parser.add_argument('--trap-range', action='store_true',
+                        help='Chỉ tìm số bẫy ít nhất và nhiều nhất trên các lời giải (PySAT tăng dần)')
+    parser.add_argument('--phase-hint', default=None,
+                        help='Lưới kết quả của một bài gần giống, dùng làm pha ưu tiên (pysat, backtracking)')
+    parser.add_argument('--compare-cold-start', action='store_true',
+                        help='Giải lại không có gợi ý pha để so sánh số quyết định / xung đột')
+    parser.add_argument('--compile', action='store_true',
+                        help='Biên dịch lưới thành BDD rồi in số lời giải và các ô chắc chắn an toàn')
+    parser.add_argument('--compiled-cache', default=None, help='Thư mục lưu / đọc lại các lưới đã biên dịch')
+    parser.add_argument('--metrics-jsonl', default=None,
+                        help='Thêm số liệu của lần chạy (lược đồ chung) vào file JSON lines')
+    parser.add_argument('--metrics-prom', default=None,
+                        help='Ghi số liệu ra file văn bản định dạng Prometheus (chỉ lần chạy này, '
+                             'hoặc mọi bộ nhãn trong --metrics-jsonl nếu có)')
     parser.add_argument('-v', '--verbose', action='store_true', help='In thông tin chi tiết')
 
     args = parser.parse_args()
+    if args.enumerate and args.solver != GemHunterSolver.AUTO and \
+            not hasattr(SOLVERS.get(args.solver), "enumerate_solutions"):
+        parser.error(f"--enumerate is not supported by solver {args.solver}")
 
     # Tạo đường dẫn đầu ra nếu không được chỉ định
     if not args.output:
@@ -27,33 +150,121 @@ def main():
 
     # Đọc lưới từ file
     grid = GemHunterGrid().load_grid_from_file(args.input)
+    if args.compact:
+        grid = grid.compact()
 
     if args.verbose:
         print(f"Loaded grid from {args.input}:")
         print(grid)
 
     # Giải bài toán
-    solver = GemHunterSolver(grid, args.cnf, args.solver)
+    solver_options = {}
+    if args.solver == 'brute_force':
+        solver_options["enumeration"] = args.enumeration
+    elif args.solver == 'backtracking':
+        solver_options["mode"] = args.backtracking_mode
+    elif args.solver == 'tiled':
+        solver_options["tile_size"] = args.tile_size
+        solver_options["workers"] = args.tile_workers
+    elif args.solver in ('local_search', 'local_search_native'):
+        solver_options.update(algorithm=args.local_search, noise=args.noise, max_flips=args.max_flips,
+                              max_restarts=args.max_restarts, seed=args.seed)
+    if args.solver in ('brute_force', 'backtracking') and (args.checkpoint or args.resume
+                                                            or args.checkpoint_interval is not None):
+        solver_options["checkpoint_path"] = args.checkpoint or os.path.join(
+            "checkpoints", f"{args.solver}_{os.path.splitext(os.path.basename(args.input))[0]}.json")
+        solver_options["resume"] = args.resume
+        if args.checkpoint_interval is not None:
+            solver_options["checkpoint_interval"] = args.checkpoint_interval
+
+    phase_hint = GemHunterGrid().load_grid_from_file(args.phase_hint) if args.phase_hint else None
+    solver = GemHunterSolver(grid, args.cnf, args.solver, solver_options, args.generation_workers,
+                             args.track_memory, args.verify, (args.min_traps, args.max_traps),
+                             phase_hint=phase_hint, compare_cold_start=args.compare_cold_start)
+    if args.compile:
+        compiled = solver.compile_board(args.compiled_cache)
+        model_count = compiled.model_count()
+        print(f"Compiled board: {compiled.size:,} BDD nodes, {model_count:,} solutions")
+        if model_count:
+            safe_cells = compiled.safe_cells()
+            print(f"- Safe cells ({len(safe_cells)}): {', '.join(f'({i}, {j})' for i, j in safe_cells)}")
+        return
+    if args.trap_range:
+        trap_range = solver.trap_count_range()
+        if trap_range["min_traps"] is None:
+            print("No solution within the trap bounds.")
+        else:
+            # Giá trị vượt totalizer_cap chỉ là cận dưới
+            minimum = f"{'≥' if trap_range['min_traps_at_least'] else ''}{trap_range['min_traps']}"
+            maximum = f"{'≥' if trap_range['max_traps_at_least'] else ''}{trap_range['max_traps']}"
+            print(f"Trap count range: {minimum}..{maximum} "
+                  f"({trap_range['solves']} incremental solves, {trap_range['totalizer_clauses']:,} totalizer clauses, "
+                  f"{trap_range['total_time']:.6f} seconds)")
+        return
+    if args.enumerate:
+        enumerate_solutions(solver, args)
+        return
+
     stats = solver.solve()
+    export_metrics(stats, args)
 
     if stats["success"]:
         # Lưu kết quả
-        result_grid = GemHunterGrid(grid=stats["result_grid"])
+        result_grid = stats["result_grid"]
+        if isinstance(result_grid, list):
+            result_grid = GemHunterGrid(grid=result_grid)
         result_grid.save_grid_to_file(args.output)
 
         print(f"\nFound solution using {args.cnf} CNF strategy and {args.solver} solver:")
         print(f"- Number of clauses: {stats['clauses']}")
         print(f"- Time to generate CNF: {stats['generation_time']:.6f} seconds")
+        generation_stats = stats.get("generation_stats", {})
+        if generation_stats.get("mode") == "parallel":
+            band_times = [band["time"] for band in generation_stats["bands"]]
+            print(f"- Parallel generation: {len(band_times)} bands on {generation_stats['workers']} workers "
+                  f"(slowest band {max(band_times):.6f} seconds, merge {generation_stats['merge_time']:.6f} seconds)")
         print(f"- Time to solve: {stats['solving_time']:.6f} seconds")
         print(f"- Total time: {stats['total_time']:.6f} seconds")
+        print_memory_stats(stats)
+        print_checkpoint_stats(stats)
+        if "verified" in stats:
+            print(f"- Verified: {'yes' if stats['verified'] else 'NO'} ({stats['verification_time']:.6f} seconds)")
+        if "trap_bounds" in stats:
+            lower, upper = stats["trap_bounds"]
+            print(f"- Trap bounds: {'-' if lower is None else lower}..{'-' if upper is None else upper}"
+                  + (f" ({stats['totalizer_clauses']:,} totalizer clauses)" if "totalizer_clauses" in stats else ""))
+        if "phase_hints" in stats:
+            print(f"- Warm start: {stats['phase_hints']:,} phase hints")
+            for key in ["decisions", "conflicts", "backtracks"]:
+                if f"cold_{key}" in stats:
+                    print(f"  - {key.capitalize()}: {stats.get(key, 0):,} warm vs {stats[f'cold_{key}']:,} cold")
+        if "auto_pipeline" in stats:
+            print(f"- Auto pipeline: {stats['auto_pipeline']} (predicted {stats['predicted_cost']:.6f} seconds)")
 
         # In thêm thông tin chi tiết của từng thuật toán
-        if args.solver == 'brute_force':
+        solver_name = stats["solver_algorithm"]
+        if solver_name == 'brute_force':
             print(f"- Checked combinations: {stats.get('checked_combinations', 'N/A'):,}")
             print(f"- Total combinations: {stats.get('total_combinations', 'N/A'):,}")
-        elif args.solver == 'backtracking':
+        elif solver_name == 'backtracking':
             print(f"- Decisions: {stats.get('decisions', 'N/A'):,}")
             print(f"- Backtracks: {stats.get('backtracks', 'N/A'):,}")
+            if args.backtracking_mode == 'cdcl':
+                print(f"- Conflicts: {stats.get('conflicts', 'N/A'):,}")
+                print(f"- Learned clauses: {stats.get('learned_clauses', 'N/A'):,}")
+                print(f"- Restarts: {stats.get('restarts', 'N/A'):,}")
+        elif solver_name == 'pysat_minicard':
+            print(f"- Native cardinality constraints: {stats.get('native_constraints', 'N/A'):,}")
+        elif solver_name == 'tiled':
+            print(f"- Tiles: {stats.get('tiles', 'N/A'):,} of {stats.get('tile_size')}x{stats.get('tile_size')}, "
+                  f"{stats.get('repairs', 0):,} repairs (largest group {stats.get('max_repair_tiles', 1)} tiles)")
+            print(f"- Largest tile CNF: {stats.get('max_tile_clauses', 0):,} clauses")
+        elif solver_name in ('local_search', 'local_search_native'):
+            print(f"- Flips: {stats.get('flips', 0):,} ({stats.get('flips_per_second', 0):,.0f} flips/second, "
+                  f"{stats.get('restarts', 0)} restarts)")
+        elif solver_name == 'frontier_dp':
+            print(f"- DP width: {stats.get('dp_width', 'N/A')}{' (transposed)' if stats.get('transposed') else ''}")
+            print(f"- Max states per row: {stats.get('max_states', 'N/A'):,}")
 
         print(f"Solution saved to {args.output}")
 
@@ -64,6 +275,10 @@ def main():
         print(f"\nCould not find a solution using {args.cnf} CNF strategy and {args.solver} solver.")
         print(f"- Number of clauses: {stats['clauses']}")
         print(f"- Time spent: {stats['total_time']:.6f} seconds")
+        print_memory_stats(stats)
+        print_checkpoint_stats(stats)
+        if stats.get("interrupted"):
+            print("Run again with --resume to continue from the checkpoint.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,30 @@
+import argparse
+
+from PuzzleGenerator import generate_puzzles
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sinh đề Thợ săn đá quý có lời giải duy nhất.')
+    parser.add_argument('rows', type=int, help='Số hàng')
+    parser.add_argument('cols', type=int, help='Số cột')
+    parser.add_argument('-n', '--count', type=int, default=10, help='Số đề cần sinh (mặc định: 10)')
+    parser.add_argument('-d', '--density', type=float, default=0.2, help='Tỉ lệ ô bẫy (mặc định: 0.2)')
+    parser.add_argument('-o', '--output-dir', default='testcases', help='Thư mục lưu đề (mặc định: testcases)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed của đề đầu tiên, các đề sau tăng dần (mặc định: 0)')
+    parser.add_argument('--workers', type=int, default=None, help='Số tiến trình (mặc định: số nhân CPU)')
+    parser.add_argument('--no-minimize', action='store_true', help='Không bỏ các ô số thừa sau pha tham lam')
+    parser.add_argument('--save-solutions', action='store_true', help='Lưu thêm lời giải của từng đề')
+
+    args = parser.parse_args()
+
+    results = generate_puzzles(args.count, args.rows, args.cols, args.density, args.output_dir, args.seed,
+                               not args.no_minimize, args.workers, args.save_solutions)
+    if results:
+        average_clues = sum(stats["clues"] for stats in results) / len(results)
+        total_time = sum(stats["generation_time"] for stats in results)
+        print(f"\nGenerated {len(results)}/{args.count} puzzles "
+              f"(average {average_clues:.1f} clues, {total_time:.6f} seconds of generation)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,5 @@
 import os
 import time
-import matplotlib.pyplot as plt
 
 from GemHunterGrid import GemHunterGrid
 from GemHunterSolver import GemHunterSolver
@@ -43,6 +42,9 @@ def solve_with_strategy(input_file, output_dir, strategy_name):
 
 def create_comparison_plot(test_case, tt_stats, card_stats, plot_dir):
     """Tạo biểu đồ so sánh giữa hai chiến lược"""
+    # Chỉ nạp matplotlib khi thực sự vẽ biểu đồ
+    import matplotlib.pyplot as plt
+
     ensure_dir(plot_dir)
 
     # Thiết lập biểu đồ
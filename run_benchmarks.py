@@ -1,10 +1,15 @@
 import os
+import contextlib
 import datetime
-import pandas as pd
-import matplotlib.pyplot as plt
+import io
+import subprocess
+import sys
 
 from GemHunterGrid import GemHunterGrid
+from BruteForceSolver import BruteForceSolver
 from GemHunterSolver import GemHunterSolver
+from GridFeatures import compute_grid_features
+from PipelineCostModel import DEFAULT_COST_MODEL_PATH, PipelineCostModel
 
 
 def ensure_dir(directory):
@@ -47,8 +52,315 @@ def run_benchmark(input_file, strategies, repeat=3):
     return results
 
 
+def run_enumeration_benchmark(input_file, strategy=GemHunterSolver.CARDINALITY, repeat=3):
+    """So sánh thứ tự duyệt itertools.product và mã Gray của bộ giải brute force"""
+    grid = GemHunterGrid().load_grid_from_file(input_file)
+    results = []
+
+    for enumeration in [BruteForceSolver.PRODUCT, BruteForceSolver.GRAY_CODE]:
+        print(f"Testing {input_file} with brute force ({enumeration} order)...")
+
+        enumeration_results = []
+        for run in range(repeat):
+            solver = GemHunterSolver(grid, strategy, GemHunterSolver.BRUTE_FORCE,
+                                     {"enumeration": enumeration})
+            stats = solver.solve()
+            enumeration_results.append(stats)
+
+        avg_solving_time = sum(r["solving_time"] for r in enumeration_results) / repeat
+        checked = enumeration_results[0]["checked_combinations"]
+
+        results.append({
+            "input": os.path.basename(input_file),
+            "enumeration": enumeration,
+            "grid_size": f"{grid.rows}x{grid.cols}",
+            "success": enumeration_results[0]["success"],
+            "checked_combinations": checked,
+            "solving_time": avg_solving_time,
+            "combinations_per_second": checked / avg_solving_time if avg_solving_time > 0 else 0
+        })
+
+    return results
+
+
+def create_enumeration_report(enumeration_results, output_dir):
+    """Ghi bảng so sánh hai thứ tự duyệt của brute force"""
+    import pandas as pd
+
+    ensure_dir(output_dir)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_file = os.path.join(output_dir, f"enumeration_results_{timestamp}.csv")
+    pd.DataFrame(enumeration_results).to_csv(csv_file, index=False)
+    print(f"Enumeration benchmark results saved to {csv_file}")
+
+
+def run_warm_start_benchmark(grid, name, solver_algorithm=GemHunterSolver.PYSAT, steps=10, reveal=5,
+                              strategy=GemHunterSolver.CARDINALITY, seed=0):
+    """Mô phỏng một ván chơi bắt đầu từ grid: mỗi bước mở thêm reveal ô đá quý của lời giải trước
+    (ô số đúng với lời giải đó), rồi giải trạng thái mới có và không có gợi ý pha từ lời giải của bước trước"""
+    import random
+
+    rng = random.Random(seed)
+    grid = grid.clone()
+    solver = GemHunterSolver(grid, strategy, solver_algorithm, warm_start=True, compare_cold_start=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = solver.solve()
+    results = []
+
+    for step in range(steps):
+        if not stats["success"]:
+            break
+        previous = stats["result_grid"]
+        previous = previous.grid if hasattr(previous, "grid") else previous
+        gems = [(i, j) for i in range(grid.rows) for j in range(grid.cols)
+                if grid.grid[i][j] == "_" and previous[i][j] == "G"]
+        for i, j in rng.sample(gems, min(reveal, len(gems))):
+            grid.grid[i][j] = sum(previous[n_row][n_col] == "T" for n_row, n_col in grid.get_neighbors(i, j))
+
+        print(f"Testing {name} warm start step {step + 1} with {solver_algorithm}...")
+        solver = GemHunterSolver(grid, strategy, solver_algorithm, phase_hint=solver.phase_hint,
+                                 warm_start=True, compare_cold_start=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats = solver.solve()
+        results.append({
+            "input": name,
+            "solver": solver_algorithm,
+            "step": step + 1,
+            "success": stats["success"],
+            "phase_hints": stats.get("phase_hints", 0),
+            "decisions": stats.get("decisions"),
+            "cold_decisions": stats.get("cold_decisions"),
+            "conflicts": stats.get("conflicts"),
+            "cold_conflicts": stats.get("cold_conflicts"),
+            "solving_time": stats["solving_time"],
+            "cold_solving_time": stats.get("cold_solving_time")
+        })
+
+    return results
+
+
+def create_warm_start_report(warm_start_results, output_dir):
+    """Ghi số quyết định / xung đột có và không có gợi ý pha của từng bước"""
+    import pandas as pd
+
+    ensure_dir(output_dir)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_file = os.path.join(output_dir, f"warm_start_results_{timestamp}.csv")
+    pd.DataFrame(warm_start_results).to_csv(csv_file, index=False)
+    print(f"Warm start benchmark results saved to {csv_file}")
+
+
+def run_import_benchmark(modules, repeat=5):
+    """Đo thời gian import của từng module trong một tiến trình Python mới (python -X importtime)"""
+    results = []
+
+    for module in modules:
+        print(f"Measuring import time of {module}...")
+
+        timings = []
+        for run in range(repeat):
+            completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                       capture_output=True, text=True)
+            if completed.returncode != 0:
+                print(f"Warning: Could not import {module}: {completed.stderr.strip().splitlines()[-1:]}")
+                break
+
+            # Dòng có dạng "import time: self [us] | cumulative | imported package"
+            for line in completed.stderr.splitlines():
+                parts = line.split("|")
+                if len(parts) == 3 and parts[2].strip() == module and not parts[2].startswith("  "):
+                    timings.append(int(parts[1]))
+                    break
+
+        if timings:
+            timings.sort()
+            results.append({
+                "module": module,
+                "min_import_time_ms": timings[0] / 1000,
+                "median_import_time_ms": timings[len(timings) // 2] / 1000
+            })
+
+    return results
+
+
+def create_import_report(import_results, output_dir):
+    """Ghi kết quả đo thời gian import"""
+    ensure_dir(output_dir)
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    report_file = os.path.join(output_dir, f"import_times_{timestamp}.txt")
+    with open(report_file, "w") as f:
+        f.write("Import Time Benchmark\n")
+        f.write("=====================\n\n")
+        for result in import_results:
+            f.write(f"{result['module']:<25} min {result['min_import_time_ms']:.2f} ms, "
+                    f"median {result['median_import_time_ms']:.2f} ms\n")
+    print(f"Import time benchmark saved to {report_file}")
+
+
+def measure_memory(input_file, strategy, solver_algorithm=GemHunterSolver.PYSAT):
+    """Giải một lần với theo dõi bộ nhớ, trả về các số đo (không kèm lưới kết quả)"""
+    grid = GemHunterGrid().load_grid_from_file(input_file)
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = GemHunterSolver(grid, strategy, solver_algorithm, track_memory=True).solve()
+
+    result = {
+        "input": os.path.basename(input_file),
+        "strategy": strategy,
+        "solver": solver_algorithm,
+        "grid_size": f"{grid.rows}x{grid.cols}",
+        "cells": grid.rows * grid.cols,
+        "clauses": stats["clauses"],
+        "total_time": stats["total_time"]
+    }
+    result.update((key, value) for key, value in stats.items()
+                  if "memory" in key or key.startswith("bytes_per") or key.endswith(("rss_peak", "rss_delta")))
+    return result
+
+
+def _measure_memory_task(args):
+    return measure_memory(*args)
+
+
+def run_memory_benchmark(test_cases, strategies, solver_algorithm=GemHunterSolver.PYSAT, isolated=True):
+    """Đo bộ nhớ theo từng giai đoạn cho mọi test case và chiến lược.
+    isolated thì mỗi lần chạy nằm trong một tiến trình mới (spawn) để đỉnh RSS của lần trước không ảnh hưởng lần sau"""
+    results = []
+
+    for test_case in test_cases:
+        if not os.path.exists(test_case):
+            print(f"Warning: Test case {test_case} not found. Skipping...")
+            continue
+
+        for strategy in strategies:
+            print(f"Measuring memory of {test_case} with {strategy} strategy...")
+            args = (test_case, strategy, solver_algorithm)
+            if isolated:
+                from concurrent.futures import ProcessPoolExecutor
+                from multiprocessing import get_context
+
+                with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+                    results.append(executor.submit(_measure_memory_task, args).result())
+            else:
+                results.append(measure_memory(*args))
+
+    return results
+
+
+def create_memory_report(memory_results, output_dir):
+    """Ghi CSV, tóm tắt và biểu đồ bộ nhớ theo kích thước lưới"""
+    import pandas as pd
+
+    ensure_dir(output_dir)
+
+    df = pd.DataFrame(memory_results)
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_file = os.path.join(output_dir, f"memory_results_{timestamp}.csv")
+    df.to_csv(csv_file, index=False)
+    print(f"Memory benchmark results saved to {csv_file}")
+
+    phases = ["encoding", "dedup", "solver_load", "search", "decode"]
+    summary_file = os.path.join(output_dir, f"memory_summary_{timestamp}.txt")
+    with open(summary_file, "w") as f:
+        f.write("Memory Summary\n")
+        f.write("==============\n\n")
+
+        for (grid_size, strategy), group in df.groupby(["grid_size", "strategy"], sort=False):
+            row = group.iloc[0]
+            f.write(f"Grid Size: {grid_size}, Strategy: {strategy}, Solver: {row['solver']}\n")
+            for phase in phases:
+                column = f"{phase}_memory_peak"
+                if column in row and pd.notna(row[column]):
+                    f.write(f"- {phase} peak: {row[column] / 1024:.1f} KB\n")
+            if "rss_peak" in row and pd.notna(row["rss_peak"]):
+                f.write(f"- Peak RSS: {row['rss_peak'] / 1024 / 1024:.1f} MB\n")
+            if "bytes_per_clause" in row and pd.notna(row["bytes_per_clause"]):
+                f.write(f"- Bytes per clause: {row['bytes_per_clause']:.1f}\n")
+            if "bytes_per_variable" in row and pd.notna(row["bytes_per_variable"]):
+                f.write(f"- Bytes per variable: {row['bytes_per_variable']:.1f}\n")
+            f.write("\n")
+
+    print(f"Memory summary saved to {summary_file}")
+
+    create_memory_plot(df, output_dir, timestamp)
+
+
+def create_memory_plot(df, output_dir, timestamp):
+    """Biểu đồ đỉnh bộ nhớ theo số ô của lưới cho từng chiến lược"""
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    for strategy, group in df.groupby("strategy"):
+        group = group.sort_values("cells")
+        axes[0].plot(group["cells"], group["memory_peak"] / 1024 / 1024, marker="o", label=strategy)
+        if "rss_peak" in group:
+            axes[1].plot(group["cells"], group["rss_peak"] / 1024 / 1024, marker="o", label=strategy)
+
+    axes[0].set_title("Đỉnh bộ nhớ Python (tracemalloc) theo kích thước lưới")
+    axes[0].set_ylabel("Bộ nhớ (MB)")
+    axes[1].set_title("Đỉnh RSS theo kích thước lưới")
+    axes[1].set_ylabel("RSS (MB)")
+    for ax in axes:
+        ax.set_xlabel("Số ô của lưới")
+        ax.legend(title="Chiến lược")
+    plt.tight_layout()
+
+    memory_plot_file = os.path.join(output_dir, f"memory_comparison_{timestamp}.png")
+    plt.savefig(memory_plot_file)
+    plt.close()
+    print(f"Memory plot saved to {memory_plot_file}")
+
+
+def calibrate_cost_model(test_cases, output_file=DEFAULT_COST_MODEL_PATH, max_predicted_time=30):
+    """Chạy mọi cặp chiến lược + thuật toán trên các test case để hiệu chỉnh mô hình chi phí của chế độ auto.
+    Bỏ qua các cặp mà mô hình hiện tại dự đoán chạy quá max_predicted_time giây"""
+    model = PipelineCostModel.load(output_file)
+    samples = []
+
+    for test_case in test_cases:
+        if not os.path.exists(test_case):
+            print(f"Warning: Test case {test_case} not found. Skipping...")
+            continue
+
+        grid = GemHunterGrid().load_grid_from_file(test_case)
+        features = compute_grid_features(grid)
+
+        for strategy in PipelineCostModel.STRATEGIES:
+            for solver_algorithm in PipelineCostModel.AUTO_SOLVERS:
+                if solver_algorithm in PipelineCostModel.NATIVE_SOLVERS and strategy != PipelineCostModel.STRATEGIES[0]:
+                    # Chiến lược không ảnh hưởng thuật toán làm việc trực tiếp trên lưới: chỉ chạy một lần
+                    continue
+                predicted = model.predict(features, strategy, solver_algorithm)
+                if predicted > max_predicted_time:
+                    print(f"Skipping {strategy} + {solver_algorithm} on {test_case} (predicted {predicted:.1f} seconds)")
+                    continue
+
+                print(f"Calibrating with {strategy} + {solver_algorithm} on {test_case}...")
+                # Không tính thời gian in ra màn hình của các bộ giải
+                with contextlib.redirect_stdout(io.StringIO()):
+                    stats = GemHunterSolver(grid, strategy, solver_algorithm).solve()
+
+                samples.append({
+                    "features": features,
+                    "cnf_strategy": strategy,
+                    "solver_algorithm": solver_algorithm,
+                    "generation_time": stats["generation_time"],
+                    "solving_time": stats["solving_time"]
+                })
+
+    model.calibrate(samples)
+    model.save(output_file)
+    print(f"Cost model calibrated from {len(samples)} runs and saved to {output_file}")
+    return model
+
+
 def create_report(benchmark_results, output_dir):
     """Tạo báo cáo từ kết quả benchmark"""
+    # Chỉ nạp pandas khi thực sự tạo báo cáo
+    import pandas as pd
+
     ensure_dir(output_dir)
 
     # Tạo DataFrame từ kết quả
@@ -84,6 +396,8 @@ def create_report(benchmark_results, output_dir):
 
 def create_benchmark_plots(df, output_dir, timestamp):
     """Tạo các biểu đồ từ kết quả benchmark"""
+    import matplotlib.pyplot as plt
+
     # Biểu đồ số lượng mệnh đề
     plt.figure(figsize=(10, 6))
 
@@ -173,6 +487,49 @@ def main():
     # Tạo báo cáo
     create_report(all_results, "benchmark")
 
+    # So sánh thứ tự duyệt của brute force trên các lưới nhỏ
+    enumeration_cases = [
+        "testcases/input_2x2.txt",  # 2x2
+        "testcases/input_simple.txt",  # 3x3
+        "testcases/input_1.txt"  # 3x4
+    ]
+
+    enumeration_results = []
+    for test_case in enumeration_cases:
+        if os.path.exists(test_case):
+            enumeration_results.extend(run_enumeration_benchmark(test_case))
+        else:
+            print(f"Warning: Test case {test_case} not found. Skipping...")
+
+    create_enumeration_report(enumeration_results, "benchmark")
+
+    # So sánh giải có / không có gợi ý pha trên chuỗi trạng thái liên tiếp của một ván chơi
+    # (đề sinh sẵn có lời giải, ẩn bớt một nửa ô số để trạng thái đầu có nhiều lời giải)
+    from PuzzleGenerator import PuzzleGenerator
+    import random
+
+    puzzle = PuzzleGenerator(25, 25, seed=0).generate(minimize=False)[0]
+    rng = random.Random(0)
+    for i in range(puzzle.rows):
+        for j in range(puzzle.cols):
+            if isinstance(puzzle.grid[i][j], int) and rng.random() < 0.5:
+                puzzle.grid[i][j] = "_"
+    warm_start_results = []
+    for solver_algorithm in [GemHunterSolver.PYSAT, GemHunterSolver.BACKTRACKING]:
+        warm_start_results.extend(run_warm_start_benchmark(puzzle, "generated_25x25", solver_algorithm))
+    create_warm_start_report(warm_start_results, "benchmark")
+
+    # Đo thời gian khởi động của các điểm vào chương trình
+    import_modules = ["GemHunterSolver", "gem_hunter_cli", "main_strategy", "run_benchmarks", "compare_all_solvers"]
+    create_import_report(run_import_benchmark(import_modules), "benchmark")
+
+    # Đo bộ nhớ theo từng giai đoạn, mỗi lần chạy trong một tiến trình riêng
+    memory_cases = test_cases + ["testcases/input_20x20.txt"]
+    create_memory_report(run_memory_benchmark(memory_cases, strategies), "benchmark")
+
+    # Hiệu chỉnh mô hình chi phí cho chế độ auto của GemHunterSolver
+    calibrate_cost_model(test_cases + ["testcases/input_2x2.txt", "testcases/input_20x20.txt"])
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import argparse
+import os
+import time
+
+from GemHunterGrid import GemHunterGrid
+from SolutionValidator import SolutionValidator, format_error
+
+
+def find_input_file(output_file, input_dir):
+    """Tìm file đầu vào tương ứng: '<tiền tố>_output_5x5.txt' -> 'input_5x5.txt' trong input_dir"""
+    name = os.path.basename(output_file)
+    if "output" not in name:
+        return None
+    input_name = name[name.rindex("output"):].replace("output", "input", 1)
+    input_file = os.path.join(input_dir, input_name)
+    return input_file if os.path.exists(input_file) else None
+
+
+def validate_directory(output_dir, input_dir="testcases", max_errors=5):
+    """Kiểm tra mọi file kết quả trong output_dir, trả về danh sách kết quả của từng file"""
+    validator = SolutionValidator()
+    results = []
+
+    for name in sorted(os.listdir(output_dir)):
+        if not name.endswith(".txt"):
+            continue
+
+        output_file = os.path.join(output_dir, name)
+        result_grid = GemHunterGrid().load_grid_from_file(output_file)
+        if result_grid.rows == 0:
+            continue
+
+        input_file = find_input_file(output_file, input_dir)
+        input_grid = GemHunterGrid().load_grid_from_file(input_file).grid if input_file else None
+
+        start_time = time.time()
+        errors = validator.validate(result_grid.grid, input_grid)
+        results.append({
+            "output": output_file,
+            "input": input_file,
+            "valid": not errors,
+            "errors": errors,
+            "validation_time": time.time() - start_time
+        })
+
+        status = "OK" if not errors else f"INVALID ({len(errors)} errors)"
+        source = f" against {input_file}" if input_file else ""
+        print(f"{output_file}{source}: {status}")
+        for error in errors[:max_errors]:
+            print(f"  - {format_error(error)}")
+        if len(errors) > max_errors:
+            print(f"  ... and {len(errors) - max_errors} more")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kiểm tra hàng loạt lời giải Thợ săn đá quý.')
+    parser.add_argument('output_dir', nargs='?', default='results', help='Thư mục chứa các file kết quả (mặc định: results)')
+    parser.add_argument('-i', '--input-dir', default='testcases',
+                        help='Thư mục chứa file đầu vào tương ứng (mặc định: testcases)')
+    parser.add_argument('--max-errors', type=int, default=5, help='Số lỗi tối đa in ra cho mỗi file (mặc định: 5)')
+
+    args = parser.parse_args()
+
+    results = validate_directory(args.output_dir, args.input_dir, args.max_errors)
+    invalid = sum(not result["valid"] for result in results)
+    total_time = sum(result["validation_time"] for result in results)
+    print(f"\nValidated {len(results)} solutions in {total_time:.6f} seconds: "
+          f"{len(results) - invalid} valid, {invalid} invalid")
+
+    # Mã thoát khác 0 để dùng được trong các lần chạy hồi quy
+    raise SystemExit(1 if invalid else 0)
+
+
+if __name__ == "__main__":
+    main()